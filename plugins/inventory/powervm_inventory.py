@@ -43,6 +43,11 @@ description:
     - A group named 'MaagedSystems' gets created with all the Power Server Managed by the HMC
       and Power Server grouping features enables only when `group_lpars_by_managed_system` option set to false
       in the dynamic inventory playbook.
+    - The partitions and Power Servers fetched from the HMCs can be kept in the Ansible inventory cache
+      with the I(cache) options, later inventory loads then rebuild the groups and host variables
+      without contacting the HMCs until I(cache_timeout) expires.
+extends_documentation_fragment:
+    - inventory_cache
 
 options:
     hmc_hosts:
@@ -123,6 +128,16 @@ options:
               depending on the size of your environment and the properties to be fetched.
         default: false
         type: bool
+    lazy_advanced_fields:
+        description:
+            - Builds the inventory from the quick properties only and lets the plays fetch the advanced properties
+              of the partitions they target, through the C(ibm.power_hmc.powervm_advanced) lookup plugin.
+            - Sets the C(powervm_hmc), C(powervm_partition_uuid) and C(powervm_partition_type) variables of every partition,
+              which the lookup plugin uses to locate it. The last example defines a C(powervm_advanced) variable
+              fetching them only for the hosts whose plays read it.
+            - Mutually exclusive with I(advanced_fields).
+        default: false
+        type: bool
     group_lpars_by_managed_system:
         description:
             - Creates a grouping of partitions by managed system name. This is enabled by default.
@@ -145,6 +160,61 @@ options:
             - This is not valid for Power Servers.
         default: omit
         type: str
+    max_concurrency:
+        description:
+            - Maximum number of HMCs queried in parallel, each one by a worker thread with its own REST session.
+            - Partitions and Power Servers are added to the inventory in the order of I(hmc_hosts),
+              whatever the order the HMCs answer in.
+            - Set to 1 to query the HMCs one after the other.
+        default: 4
+        type: int
+    system_concurrency:
+        description:
+            - Maximum number of requests issued in parallel to a single HMC, while fetching the LPARs and VIOS
+              of its Power Servers, with or without I(advanced_fields).
+            - Set to 1 to query the Power Servers of an HMC one after the other.
+        default: 4
+        type: int
+    incremental_refresh:
+        description:
+            - Refreshes the cached inventory incrementally, requires I(cache) to be enabled or I(snapshot_path) to be set.
+            - Every inventory load then fetches the Power Servers list of each HMC along with the quick list of the LPARs
+              and VIOS of every Power Server, and compares them with the ones of the cached inventory, or of the snapshot
+              when nothing is cached. New, removed or renamed partitions and changes of their quick properties, like their
+              state or RMC IP address, mark their Power Server as changed.
+            - With I(advanced_fields), only the LPARs and VIOS of the changed Power Servers get fetched again through the
+              full XML API, the cached partitions of the other ones are kept. Without it the quick lists are the partitions
+              themselves, the refresh then only saves the parsing of the partitions of the unchanged Power Servers.
+        default: false
+        type: bool
+    snapshot_path:
+        description:
+            - Path of an inventory snapshot, a JSON file holding the partitions and Power Servers fetched from the HMCs.
+            - The inventory is loaded from the snapshot while it is younger than I(snapshot_max_age) and was fetched
+              with the same I(hmc_hosts), I(advanced_fields) and I(hostvar_fields) settings. Otherwise the HMCs are queried
+              and the snapshot is replaced with the fetched inventory.
+            - The snapshot can be kept up to date by the refresher script of the collection, started as
+              C(python <collection path>/scripts/powervm_inventory_refresher.py <inventory source> --interval <seconds>).
+              It refreshes the inventory every I(interval) seconds like C(ansible-inventory --flush-cache) does,
+              incrementally with I(incremental_refresh), and updates the inventory cache when I(cache) is enabled.
+            - The snapshot is always replaced as a whole, readers never see a partially written file.
+        default: ""
+        type: str
+    snapshot_max_age:
+        description:
+            - Age in seconds after which the snapshot of I(snapshot_path) is stale and the HMCs are queried instead.
+        default: 600
+        type: int
+    hostvar_fields:
+        description:
+            - Names or glob patterns of the LPAR/VIOS properties kept for every partition. The other properties are dropped
+              while the partitions get parsed, which keeps the memory used by the inventory and the cached inventory small.
+            - The properties used by I(filters), I(compose), I(groups), I(keyed_groups) and I(identify_unknown_by)
+              are always kept, as are the ones the plugin relies on such as C(PartitionName) and C(ResourceMonitoringIPAddress).
+            - By default all the properties are kept.
+        default: []
+        type: list
+        elements: str
 '''
 
 EXAMPLES = '''
@@ -215,6 +285,17 @@ compose:
   HMCIP: AssociatedHMC
   HMCUSERNAME: AssociatedHMCUserName
 
+# Keep the fetched partitions in the inventory cache for an hour, later inventory loads do not contact the HMC
+plugin: ibm.power_hmc.powervm_inventory
+hmc_hosts:
+  - hmc: <hmc_host_name>
+    user: <HMC_Username>
+    password: <HMC_Password>
+cache: true
+cache_plugin: ansible.builtin.jsonfile
+cache_connection: ~/.ansible/power_hmc_inventory_cache
+cache_timeout: 3600
+
 ## Generate an inventory that excludes partitions by ip, name, or the name of managed system on which they run
 plugin: ibm.power_hmc.powervm_inventory
 hmc_hosts:
@@ -268,19 +349,42 @@ groups:
     ProductionLpars: "'production_lpars' in AssociatedGroups"
 system_groups:
     ProductionSystems: "'Production_systems' in AssociatedGroups"
+
+# Generate the inventory from the quick properties only, the advanced properties of a partition
+# are fetched the first time a play reads its powervm_advanced variable, defined in group_vars/all.yml as
+#   powervm_advanced: "{{ lookup('ibm.power_hmc.powervm_advanced', hmc_auth={'username': hmc_user, 'password': hmc_password}) }}"
+# and then read like "{{ powervm_advanced.CurrentProcessors }}"
+plugin: ibm.power_hmc.powervm_inventory
+hmc_hosts:
+  - hmc: <hmc_host_name>
+    user: <HMC_Username>
+    password: <HMC_Password>
+lazy_advanced_fields: true
 '''
 
-import xml.etree.ElementTree as ET
+import fnmatch
+import hashlib
 import json
+import os
 import sys
+import tempfile
+import time
+from operator import itemgetter
+from time import perf_counter
 from ansible.plugins.inventory import BaseInventoryPlugin, Constructable, Cacheable
-from ansible.module_utils.six import string_types, viewitems, reraise
+from ansible.module_utils.six import string_types, reraise
 from ansible.errors import AnsibleParserError
+from ansible.plugins.loader import inventory_loader
 from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_exceptions import HmcError
 from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_rest_client import parse_error_response
 from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_rest_client import HmcRestClient
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_rest_client import iter_feed_entries
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_rest_client import flatten_entry
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_rest_client import map_bounded
 from ansible.config.manager import ensure_type
 from ansible.template import Templar
+from jinja2 import Environment, meta, nodes
+from jinja2.exceptions import TemplateSyntaxError
 
 from ansible.utils.display import Display
 display = Display()
@@ -298,6 +402,154 @@ def init_logger():
         level=logging.DEBUG)
 
 
+# Keys added by the plugin to the quick properties of the Power Servers
+INVENTORY_SYSTEM_KEYS = ('AssociatedGroups', 'AssociatedHMC', 'AssociatedHMCUserName', 'lpars')
+# Suffix of the cache key of the quick properties digests of the cached systems
+SNAPSHOT_DIGESTS_SUFFIX = '_digests'
+# Partition properties the plugin reads itself, kept whatever the hostvar_fields setting
+PARTITION_REQUIRED_FIELDS = ('PartitionName', 'PartitionType', 'PartitionState', 'ResourceMonitoringIPAddress', 'UUID', 'id')
+# Template functions and filters whose result does not only depend on their arguments
+NON_DETERMINISTIC_FILTERS = ('random', 'shuffle', 'random_mac', 'password_hash')
+DETERMINISTIC_GLOBALS = ('range', 'dict')
+# Expressions whose first results were all computed for distinct variables depend on per-host values,
+# they are then evaluated directly rather than memoized
+MEMO_PROBE_SIZE = 64
+# Value of the variables an expression refers to but which are not defined
+UNDEFINED = object()
+
+
+def quick_properties_digest(system, partitions):
+    # Change marker of a Power Server, computed on its quick properties and the quick properties of its partitions
+    quick_properties = dict((key, value) for key, value in system.items() if key not in INVENTORY_SYSTEM_KEYS)
+    return hashlib.sha256(json.dumps([quick_properties, partitions], sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def parse_expression(expression):
+    # Jinja2 syntax tree of an inventory expression, None when it cannot be parsed
+    try:
+        return Environment().parse("{{ %s }}" % expression)
+    except TemplateSyntaxError:
+        return None
+
+
+def template_variables(expression):
+    # Names of the variables an inventory expression refers to, None when it cannot be parsed
+    if not isinstance(expression, string_types):
+        return set()
+    ast = parse_expression(expression)
+    return None if ast is None else meta.find_undeclared_variables(ast)
+
+
+def memoizable_inputs(expression):
+    """
+    Sorted names of the variables the result of an inventory expression depends on, None when
+    the result may differ for the same variables, like for a lookup or a random filter
+    """
+    if not isinstance(expression, string_types):
+        return None
+    ast = parse_expression(expression)
+    if ast is None:
+        return None
+    for call in ast.find_all(nodes.Call):
+        if isinstance(call.node, nodes.Name) and call.node.name not in DETERMINISTIC_GLOBALS:
+            return None
+    for node in ast.find_all((nodes.Filter, nodes.Test)):
+        # ansible.builtin.random and the like are the same filters
+        if node.name.rsplit('.', 1)[-1] in NON_DETERMINISTIC_FILTERS:
+            return None
+    return tuple(sorted(meta.find_undeclared_variables(ast)))
+
+
+def memo_value(value):
+    # Hashable form of a variable value, the type keeps 1, 1.0 and True apart
+    try:
+        hash(value)
+        return (type(value), value)
+    except TypeError:
+        return (type(value), repr(value))
+
+
+def build_filter_predicate(filters):
+    """
+    Returns the predicate telling whether an item holds every key of filters with the same value,
+    the equivalent of viewitems(filters) <= viewitems(item)
+    """
+    if not filters:
+        return lambda item: True
+    keys = tuple(filters)
+    getter = itemgetter(*keys)
+    expected = filters[keys[0]] if len(keys) == 1 else tuple(filters[key] for key in keys)
+
+    def predicate(item):
+        try:
+            return getter(item) == expected
+        except KeyError:
+            return False
+    return predicate
+
+
+def exclusion_set(values):
+    # Set of the excluded values, the list itself when some of them cannot be hashed
+    try:
+        return frozenset(values)
+    except TypeError:
+        return values
+
+
+def is_excluded(value, excluded):
+    try:
+        return value in excluded
+    except TypeError:
+        return False
+
+
+class StageTimer:
+    """
+    Accumulates the time spent in each stage of the inventory generation, every lap is
+    accounted to the stage it names
+    """
+    def __init__(self):
+        self.totals = {}
+        self.last = perf_counter()
+
+    def lap(self, stage):
+        now = perf_counter()
+        self.totals[stage] = self.totals.get(stage, 0.0) + now - self.last
+        self.last = now
+
+    def __str__(self):
+        return ", ".join("%s %.3fs" % (stage, total) for stage, total in self.totals.items())
+
+
+class MemoizingTemplar:
+    """
+    Templar of the plugin whose expression and conditional results are memoized by memoize,
+    see InventoryModule.memoized. Everything else goes to the wrapped templar.
+    """
+    def __init__(self, templar, memoize):
+        self._templar = templar
+        self._memoize = memoize
+        self._variables = {}
+
+    def __getattr__(self, name):
+        return getattr(self._templar, name)
+
+    @property
+    def available_variables(self):
+        return self._templar.available_variables
+
+    @available_variables.setter
+    def available_variables(self, variables):
+        self._variables = variables
+        self._templar.available_variables = variables
+
+    def evaluate_expression(self, expression, *args, **kwargs):
+        return self._memoize(expression, self._variables, lambda: self._templar.evaluate_expression(expression, *args, **kwargs))
+
+    def evaluate_conditional(self, conditional, *args, **kwargs):
+        return self._memoize(conditional, self._variables, lambda: self._templar.evaluate_conditional(conditional, *args, **kwargs))
+
+
 class LparFieldNotFoundError(Exception):
     '''Raised when a field does not exist in the LPAR data.'''
 
@@ -322,6 +574,13 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
 
         self.group_prefix = 'power_hmc_'
         self.template_handle = None
+        self.kept_fields = None
+        self.field_selector = None
+        self.stage_timer = StageTimer()
+        self.system_digests = {}
+        self.expression_inputs = {}
+        self.expression_results = {}
+        self.expression_hits = set()
 
     def verify_file(self, path):
         """
@@ -340,18 +599,81 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
         super().parse(inventory, loader, path, cache)
 
         self.template_handle = Templar(loader=loader)
+        # Constructable evaluates the compose, groups and keyed_groups expressions through the templar
+        if not isinstance(self.templar, MemoizingTemplar):
+            self.templar = MemoizingTemplar(self.templar, self.memoized)
+        self.stage_timer = timer = StageTimer()
         self._configure(path)
-        self._populate_from_systems(self.get_lpars_by_system())
+        timer.lap('configure')
+
+        # A refresh of the inventory (cache is False) skips the snapshot as well
+        snapshot = self.read_snapshot_file(self.snapshot_max_age) if cache else None
+        timer.lap('snapshot')
+        if snapshot is not None:
+            systems = snapshot['systems']
+        else:
+            systems = self.get_systems(path, cache)
+
+        self._populate_from_systems(systems)
+        logger.debug("Inventory of %s generated, time spent per stage: %s", path, timer)
+
+    def get_systems(self, path, cache=True):
+        """
+        Returns the systems of the inventory source at path and their partitions, from the inventory cache
+        or fetched from the HMCs
+        """
+        timer = self.stage_timer
+        cache_key = self.get_cache_key(path)
+        # cache is False when the inventory gets refreshed, the cache is then written but not read
+        user_cache_setting = self.get_option('cache')
+        attempt_to_read_cache = user_cache_setting and cache
+        cache_needs_update = user_cache_setting and not cache
+
+        systems = None
+        fetched = False
+        if attempt_to_read_cache or (user_cache_setting and self.incremental_refresh):
+            try:
+                systems = self._cache[cache_key]
+                logger.debug("Inventory of %s loaded from the cache", path)
+            except KeyError:
+                cache_needs_update = True
+            if systems is not None and self.get_cache_markers(cache_key) is None:
+                # The partitions were cached with other advanced_fields or hostvar_fields settings
+                systems = None
+                cache_needs_update = True
+        if systems is not None and self.incremental_refresh:
+            # The cached inventory is the snapshot the systems of every HMC get compared to
+            systems = self.get_lpars_by_system(self.load_snapshot(cache_key, systems))
+            cache_needs_update = fetched = True
+        elif systems is None:
+            # Without cached inventory, the systems get compared to the ones of the snapshot, whatever its age
+            snapshot = self.read_snapshot_file() if self.incremental_refresh else None
+            if snapshot is not None:
+                snapshot = self.index_snapshot(snapshot['systems'], snapshot['digests'])
+            systems = self.get_lpars_by_system(snapshot)
+            fetched = True
+        timer.lap('fetch')
+        if cache_needs_update:
+            self._cache[cache_key] = systems
+            self._cache[cache_key + SNAPSHOT_DIGESTS_SUFFIX] = dict(self.inventory_settings(), digests=self.system_digests)
+            timer.lap('cache')
+        if fetched and self.snapshot_path and systems:
+            self.write_snapshot_file(systems)
+            timer.lap('snapshot')
+        return systems
 
     def _populate_from_systems(self, systems):
         invalid_identify_unknown_by = False
+        timer = self.stage_timer
         # Ensure there is a system defined to an HMC
         if not systems:
             raise HmcError("There are no systems defined to any valid HMCs provided or no valid connections were established.")
         for system in systems:
             if self.ms_should_be_included(system):
                 for lpar in system["lpars"]:
-                    if self.lpar_should_be_included(lpar):
+                    included = self.lpar_should_be_included(lpar)
+                    timer.lap('filters')
+                    if included:
                         try:
                             # Lookup the IP address for LPAR
                             ip = self.get_ip(lpar)
@@ -395,16 +717,23 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
                         # Only add an ansible_host variable if it differs from the displayname in the inventory
                         if hostname != entry_name:
                             self.inventory.set_variable(entry_name, "ansible_host", hostname)
+                        if self.lazy_advanced_fields:
+                            self.set_partition_reference(entry_name, lpar)
+                        timer.lap('hosts')
                         try:
                             self._set_composite_vars(self.compose, lpar, entry_name, strict=True)
+                            timer.lap('compose')
                             self._add_host_to_composed_groups(self.groups, lpar, entry_name, strict=True)
+                            timer.lap('groups')
                             self._add_host_to_keyed_groups(self.keyed_groups, lpar, entry_name, strict=True)
+                            timer.lap('keyed_groups')
                         except Exception:
+                            timer.lap('failed_hosts')
                             logger.debug("Attribute not found in the lpar")
                             continue
 
-                # Creating a group of managed systems
-                del system['lpars']
+                # Creating a group of managed systems, the fetched systems are left untouched as they may be cached
+                system = dict((key, value) for key, value in system.items() if key != 'lpars')
                 try:
                     ms_ip = system['IPAddress']
                     ms_name = system['SystemName']
@@ -435,101 +764,267 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
                     except Exception:
                         logger.debug("Attribute not found in the Managed System")
                         continue
+                    finally:
+                        timer.lap('systems')
         # Warn the user if the property they are using to use to identify partitions is invalid in some circumstances
         if invalid_identify_unknown_by:
             msg = ("Could not find property %s for some or all unknown partitions, as a result they will not be included." % self.identify_unknown_by)
             display.warning(msg=msg)
             logger.warning(msg)
 
-    def get_lpars_by_system(self):
+    def set_partition_reference(self, host, lpar):
+        # Variables the powervm_advanced lookup plugin locates the partition of the host with
+        self.inventory.set_variable(host, 'powervm_hmc', lpar['AssociatedHMC'])
+        self.inventory.set_variable(host, 'powervm_partition_uuid', lpar.get('UUID', lpar.get('id')))
+        partition_type = 'VIOS' if lpar.get('PartitionType') == 'Virtual IO Server' else 'LPAR'
+        self.inventory.set_variable(host, 'powervm_partition_type', partition_type)
+
+    def get_lpars_by_system(self, snapshot=None):
+        systems_by_hmc = map_bounded(lambda hmc_host: self.get_lpars_by_hmc(hmc_host, snapshot),
+                                     self.hmc_hosts, self.max_concurrency)
+
+        # Systems are merged in the order of hmc_hosts, whatever the order the HMCs answered in,
+        # so that hosts and groups get populated the same way on every run
         systems = []
-        if self.template_handle.is_template(self.get_option('hmc_hosts')):
-            self.hmc_hosts = self.template_handle.template(variable=self.get_option('hmc_hosts'))
+        self.system_digests = {}
+        for hmc_host, (hmc_systems, digests) in zip(self.hmc_hosts, systems_by_hmc):
+            systems.extend(hmc_systems)
+            if digests:
+                self.system_digests[str(hmc_host['hmc'])] = digests
+        return systems
+
+    def load_snapshot(self, cache_key, systems):
+        """
+        Returns the cached systems and the digests of their quick properties indexed by HMC and system UUID,
+        None when the cached inventory was not fetched with the current advanced_fields and hostvar_fields settings
+        """
+        markers = self.get_cache_markers(cache_key)
+        if markers is None:
+            return None
+        return self.index_snapshot(systems, markers['digests'])
+
+    def index_snapshot(self, systems, digests):
+        # Snapshot of get_lpars_by_system, the systems and their digests indexed by HMC and system UUID
+        snapshot = {}
+        for system in systems:
+            hmc = system.get('AssociatedHMC')
+            if hmc not in snapshot:
+                snapshot[hmc] = {'systems': {}, 'digests': digests.get(hmc, {})}
+            snapshot[hmc]['systems'][system.get('UUID')] = system
+        return snapshot
+
+    def inventory_settings(self):
+        # Settings the fetched partitions depend on, stored with the cached inventory and the snapshot
+        return {'advanced_fields': self.advanced_fields, 'hostvar_fields': self.kept_fields}
+
+    def settings_match(self, markers):
+        return all(markers.get(setting) == value for setting, value in self.inventory_settings().items())
+
+    def get_cache_markers(self, cache_key):
+        # Markers of the cached inventory, None when it is missing or was fetched with other settings
+        try:
+            markers = self._cache[cache_key + SNAPSHOT_DIGESTS_SUFFIX]
+        except KeyError:
+            return None
+        if not self.settings_match(markers):
+            return None
+        return markers
+
+    def snapshot_hmcs(self):
+        # HMCs of the snapshot, as templated from hmc_hosts
+        return [str(hmc_host.get('hmc')) if isinstance(hmc_host, dict) else str(hmc_host) for hmc_host in self.hmc_hosts]
 
-        for hmc_host in self.hmc_hosts:
+    def read_snapshot_file(self, max_age=None):
+        """
+        Returns the snapshot at snapshot_path, None when there is none, when it is older than max_age seconds
+        or when it was fetched with other settings
+        """
+        if not self.snapshot_path:
+            return None
+        try:
+            with open(self.snapshot_path) as snapshot_file:
+                snapshot = json.load(snapshot_file)
+        except (IOError, OSError, ValueError) as error:
+            logger.debug("Could not read the inventory snapshot %s: %s", self.snapshot_path, error)
+            return None
+        age = time.time() - snapshot.get('generated', 0)
+        if max_age is not None and age > max_age:
+            logger.debug("Inventory snapshot %s is stale, generated %d seconds ago", self.snapshot_path, age)
+            return None
+        if not self.settings_match(snapshot) or snapshot.get('hmc_hosts') != self.snapshot_hmcs() or not snapshot.get('systems'):
+            logger.debug("Inventory snapshot %s was fetched with other settings", self.snapshot_path)
+            return None
+        logger.debug("Inventory snapshot %s loaded, generated %d seconds ago", self.snapshot_path, age)
+        return snapshot
+
+    def write_snapshot_file(self, systems):
+        """
+        Replaces the snapshot at snapshot_path with systems, through a temporary file renamed over it
+        so that readers get either the former or the new snapshot. Returns the snapshot.
+        """
+        snapshot = dict(self.inventory_settings(), hmc_hosts=self.snapshot_hmcs(), generated=time.time(),
+                        digests=self.system_digests, systems=systems)
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.snapshot_path)), prefix='.powervm_snapshot')
             try:
-                hmc = str(hmc_host['hmc'])
-                hmc_username = str(hmc_host['user'])
-                hmc_pass = str(hmc_host['password'])
-                rest_conn = HmcRestClient(hmc, hmc_username, hmc_pass)
-                try:
-                    managed_systems = json.loads(rest_conn.getManagedSystemsQuick())
-                    associated_groups = rest_conn.fetchTaggedGroupItems()
-                except Exception:
-                    logger.debug("Could not retrieve systems from %s it may not have any defined", hmc)
+                with os.fdopen(fd, 'w') as snapshot_file:
+                    json.dump(snapshot, snapshot_file, default=str)
+                os.replace(tmp_path, self.snapshot_path)
+            except Exception:
+                os.unlink(tmp_path)
+                raise
+        except (IOError, OSError) as error:
+            msg = "Could not write the inventory snapshot %s: %s" % (self.snapshot_path, error)
+            display.warning(msg=msg)
+            logger.warning(msg)
+        return snapshot
+
+    def get_lpars_by_hmc(self, hmc_host, snapshot=None):
+        """
+        Fetches the systems of a single HMC along with their partitions, runs on a worker thread
+        with its own HmcRestClient when max_concurrency allows several HMCs to be queried at once.
+        Systems whose quick properties digest matches the one of the snapshot keep their cached partitions.
+        Returns the systems along with the digests of the systems whose partitions could be fetched.
+        """
+        systems = []
+        digests = {}
+        try:
+            hmc = str(hmc_host['hmc'])
+            hmc_username = str(hmc_host['user'])
+            hmc_pass = str(hmc_host['password'])
+            rest_conn = HmcRestClient(hmc, hmc_username, hmc_pass, pool_size=self.system_concurrency)
+            try:
+                managed_systems = json.loads(rest_conn.getManagedSystemsQuick())
+                associated_groups = rest_conn.fetchTaggedGroupItems()
+            except Exception:
+                logger.debug("Could not retrieve systems from %s it may not have any defined", hmc)
+                return systems, {}
+
+            hmc_snapshot = snapshot.get(hmc) if snapshot else None
+            included_systems = [system for system in managed_systems if system.get("SystemName") not in self.exclude_system]
+            # The quick lists of the LPARs and VIOS of the systems are part of their change marker, so that new, removed
+            # or renamed partitions and state changes are noticed. Without advanced_fields they are the partitions themselves.
+            quick_fetches = []
+            if not self.advanced_fields or self.incremental_refresh:
+                quick_fetches = [(system, partition_type) for system in included_systems for partition_type in ('LPAR', 'VIOS')]
+            quick_lists = dict(zip([(system['UUID'], partition_type) for system, partition_type in quick_fetches], map_bounded(
+                lambda fetch: self.get_quick_partitions(rest_conn, fetch[0], fetch[1]), quick_fetches, self.system_concurrency)))
+
+            unchanged = {}
+            for system in included_systems:
+                lpars_quick = quick_lists.get((system['UUID'], 'LPAR'))
+                vios_quick = quick_lists.get((system['UUID'], 'VIOS'))
+                if lpars_quick is None or vios_quick is None:
+                    # Without a digest the partitions of the system get fetched again on the next refresh
                     continue
+                digests[system['UUID']] = quick_properties_digest(system, lpars_quick + vios_quick)
+                cached_system = hmc_snapshot['systems'].get(system['UUID']) if hmc_snapshot else None
+                if cached_system is not None and hmc_snapshot['digests'].get(system['UUID']) == digests[system['UUID']]:
+                    unchanged[system['UUID']] = cached_system.get('lpars', [])
+            if hmc_snapshot:
+                logger.debug("%d of the %d systems of %s changed since the cached inventory",
+                             len(included_systems) - len(unchanged), len(included_systems), hmc)
 
-                for system in managed_systems:
-                    lpars = []
-                    if system.get("SystemName") not in self.exclude_system:
-                        # Make calls to full XML APIs which have access to a few additional fields
-                        # Note: This call takes nearly 10x as long because it must reach out to each system individually
+            # With advanced_fields, the LPARs and the VIOS of every changed system are fetched concurrently,
+            # up to system_concurrency at a time
+            fetches = [(system, partition_type) for system in included_systems if system['UUID'] not in unchanged
+                       for partition_type in ('LPAR', 'VIOS')] if self.advanced_fields else []
+            partitions = iter(map_bounded(
+                lambda fetch: self.get_advanced_partitions(rest_conn, hmc, hmc_username, fetch[0], fetch[1], associated_groups),
+                fetches, self.system_concurrency))
+
+            for system in managed_systems:
+                lpars = []
+                if system.get("SystemName") not in self.exclude_system:
+                    if system['UUID'] in unchanged:
+                        lpars = self.refresh_associated_groups(unchanged[system['UUID']], associated_groups)
+                    else:
                         if self.advanced_fields:
-                            system_name = system.get("SystemName")
-                            try:
-                                lpar_xml = rest_conn.getLogicalPartitions(system.get("UUID"))
-                                system_lpars = self.parse_lpars_xml(lpar_xml, hmc, hmc_username, system_name, associated_groups)
-                                lpars.extend(system_lpars)
-                            except Exception:
-                                logger.debug("Could not retrieve LPARs from %s it may not have any defined", system_name)
-                            try:
-                                vios_xml = rest_conn.getVirtualIOServers(system.get("UUID"))
-                                system_vios = self.parse_lpars_xml(vios_xml, hmc, hmc_username, system_name, associated_groups)
-                                lpars.extend(system_vios)
-                            except Exception:
-                                logger.debug("Could not retrieve VIOS from %s it may not have any defined", system_name)
-                        # Call the "quick" JSON API
+                            system_lpars = next(partitions)
+                            system_vios = next(partitions)
                         else:
-                            try:
-                                system_lpars = json.loads(rest_conn.getLogicalPartitionsQuick(system.get("UUID")))
-                                for system_lpar in system_lpars:
-                                    system_lpar['AssociatedGroups'] = self.fetch_associated_groups(system_lpar['UUID'], associated_groups)
-                                    system_lpar['AssociatedHMC'] = hmc
-                                    system_lpar['AssociatedHMCUserName'] = hmc_username
-                                    system_lpar['SystemName'] = system.get("SystemName")
-                                lpars.extend(system_lpars)
-                            except Exception:
-                                logger.debug("Could not retrieve LPARs from %s it may not have any defined", system.get("SystemName"))
-                            try:
-                                system_vios = json.loads(rest_conn.getVirtualIOServersQuick(system.get("UUID")))
-                                for vios in system_vios:
-                                    vios['AssociatedGroups'] = self.fetch_associated_groups(vios['UUID'], associated_groups)
-                                    vios['AssociatedHMC'] = hmc
-                                    vios['AssociatedHMCUserName'] = hmc_username
-                                    vios['SystemName'] = system.get("SystemName")
-                                lpars.extend(system_vios)
-                            except Exception:
-                                logger.debug("Could not retrieve VIOS from %s it may not have any defined", system.get("SystemName"))
-                        system['AssociatedGroups'] = self.fetch_associated_groups(system['UUID'], associated_groups)
-                    system['AssociatedHMC'] = hmc
-                    system['AssociatedHMCUserName'] = hmc_username
-                    system["lpars"] = lpars
-                    systems.append(system)
-                # Logoff HMC
-                try:
-                    rest_conn.logoff()
-                except Exception as del_error:
-                    error_msg = parse_error_response(del_error)
-                    logger.debug(error_msg)
-                    traceback = sys.exc_info()[2]
-                    reraise(HmcError, "Error logging off HMC REST Service: %s" % error_msg, traceback)
-            except Exception as error:
-                error_msg = parse_error_response(error)
-                msg = ("Unable to connect to HMC host %s: %s" % (hmc_host, error_msg))
-                display.warning(msg=msg)
-                logger.debug(msg)
-                continue
-        return systems
+                            system_lpars, system_vios = [
+                                self.quick_partitions(quick_lists[(system['UUID'], partition_type)], hmc, hmc_username, system,
+                                                      associated_groups) for partition_type in ('LPAR', 'VIOS')]
+                        if system_lpars is None or system_vios is None:
+                            digests.pop(system['UUID'], None)
+                        lpars = (system_lpars or []) + (system_vios or [])
+                    system['AssociatedGroups'] = self.fetch_associated_groups(system['UUID'], associated_groups)
+                system['AssociatedHMC'] = hmc
+                system['AssociatedHMCUserName'] = hmc_username
+                system["lpars"] = lpars
+                systems.append(system)
+            # Logoff HMC
+            try:
+                rest_conn.logoff()
+            except Exception as del_error:
+                error_msg = parse_error_response(del_error)
+                logger.debug(error_msg)
+                traceback = sys.exc_info()[2]
+                reraise(HmcError, "Error logging off HMC REST Service: %s" % error_msg, traceback)
+        except Exception as error:
+            error_msg = parse_error_response(error)
+            msg = ("Unable to connect to HMC host %s: %s" % (hmc_host, error_msg))
+            display.warning(msg=msg)
+            logger.debug(msg)
+            digests = {}
+        return systems, digests
+
+    def refresh_associated_groups(self, partitions, associated_groups):
+        # Tagged groups are fetched on every refresh, the cached partitions may have joined or left some
+        for partition in partitions:
+            if 'AssociatedGroups' in partition or associated_groups:
+                partition['AssociatedGroups'] = self.fetch_associated_groups(partition.get('UUID', partition.get('id')), associated_groups)
+        return partitions
+
+    def get_advanced_partitions(self, rest_conn, hmc, hmc_username, system, partition_type, associated_groups):
+        """
+        Fetches either the LPARs or the VIOS of a system with their advanced properties, partition_type being LPAR or VIOS.
+        Returns None when they could not be retrieved.
+        """
+        system_name = system.get("SystemName")
+        # Make calls to full XML APIs which have access to a few additional fields
+        # Note: This call takes nearly 10x as long because it must reach out to each system individually
+        fetch = rest_conn.getLogicalPartitions if partition_type == 'LPAR' else rest_conn.getVirtualIOServers
+        try:
+            # The feed is parsed while it is transferred
+            return self.parse_lpars_xml(fetch(system.get("UUID"), stream=True), hmc, hmc_username, system_name, associated_groups)
+        except Exception:
+            logger.debug("Could not retrieve %s from %s it may not have any defined", partition_type, system_name)
+            return None
+
+    def get_quick_partitions(self, rest_conn, system, partition_type):
+        """
+        Fetches the quick properties of either the LPARs or the VIOS of a system, partition_type being LPAR or VIOS.
+        Returns None when they could not be retrieved.
+        """
+        # Call the "quick" JSON API
+        fetch = rest_conn.getLogicalPartitionsQuick if partition_type == 'LPAR' else rest_conn.getVirtualIOServersQuick
+        try:
+            return json.loads(fetch(system.get("UUID")))
+        except Exception:
+            logger.debug("Could not retrieve %s from %s it may not have any defined", partition_type, system.get("SystemName"))
+            return None
+
+    def quick_partitions(self, partitions, hmc, hmc_username, system, associated_groups):
+        # Inventory partitions of the quick properties of get_quick_partitions, None when they could not be retrieved
+        if partitions is None:
+            return None
+        if self.field_selector:
+            partitions = [dict((key, value) for key, value in partition.items() if self.field_selector(key)) for partition in partitions]
+        for partition in partitions:
+            partition['AssociatedGroups'] = self.fetch_associated_groups(partition['UUID'], associated_groups)
+            partition['AssociatedHMC'] = hmc
+            partition['AssociatedHMCUserName'] = hmc_username
+            partition['SystemName'] = system.get("SystemName")
+        return partitions
 
     def parse_lpars_xml(self, xml, hmc, hmcusername, system_name, associated_groups=None):
         if associated_groups is None:
             associated_groups = {}
-        root = ET.fromstring(xml)
-        feed = next(root.iter())
-        entries = feed.findall("{http://www.w3.org/2005/Atom}entry")
         lpars = []
-        for entry in entries:
-            lpar = self.get_tag_text(entry)
+        for entry in iter_feed_entries(xml, strip_namespaces=False):
+            lpar = self.get_tag_text(entry, fields=self.field_selector)
             lpar['AssociatedHMC'] = hmc
             lpar['AssociatedHMCUserName'] = hmcusername
             lpar['SystemName'] = system_name
@@ -557,11 +1052,78 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
             ansible_display_name=dict(type='str', choices=['name', 'ip'], value=config.get("ansible_display_name", "name")),
             ansible_host_type=dict(type='str', choices=['name', 'ip'], value=config.get("ansible_host_type", "ip")),
             advanced_fields=dict(type='bool', value=config.get("advanced_fields", False)),
+            lazy_advanced_fields=dict(type='bool', value=config.get("lazy_advanced_fields", False)),
             group_lpars_by_managed_system=dict(type='bool', value=config.get("group_lpars_by_managed_system", True)),
             identify_unknown_by=dict(type='str', value=config.get("identify_unknown_by", "omit")),
+            max_concurrency=dict(type='int', value=config.get("max_concurrency", 4)),
+            system_concurrency=dict(type='int', value=config.get("system_concurrency", 4)),
+            incremental_refresh=dict(type='bool', value=config.get("incremental_refresh", False)),
+            hostvar_fields=dict(type='list', value=config.get("hostvar_fields", [])),
+            snapshot_path=dict(type='str', value=config.get("snapshot_path", "")),
+            snapshot_max_age=dict(type='int', value=config.get("snapshot_max_age", 600)),
         )
 
         self.validate_and_set_args(args)
+        if self.template_handle.is_template(self.hmc_hosts):
+            self.hmc_hosts = self.template_handle.template(variable=self.hmc_hosts)
+        self.snapshot_path = os.path.expanduser(self.snapshot_path)
+        if self.advanced_fields and self.lazy_advanced_fields:
+            raise AnsibleParserError("advanced_fields and lazy_advanced_fields are mutually exclusive.")
+        self.kept_fields = self.get_kept_fields()
+        self.field_selector = self.build_field_selector(self.kept_fields)
+        self.lpar_filter = build_filter_predicate(self.filters)
+        self.system_filter = build_filter_predicate(self.system_filters)
+        self.excluded_ips = exclusion_set(self.exclude_ip)
+        self.excluded_lpars = exclusion_set(self.exclude_lpar)
+        self.excluded_systems = exclusion_set(self.exclude_system)
+        # Every expression is parsed once, its results are then reused by the hosts it gets the same variables for
+        expressions = list(self.compose.values()) + list(self.groups.values())
+        expressions += list(self.system_compose.values()) + list(self.system_groups.values())
+        for keyed_group in self.keyed_groups + self.system_keyed_groups:
+            if isinstance(keyed_group, dict):
+                expressions.append(keyed_group.get('key'))
+        self.expression_inputs = dict((expression, memoizable_inputs(expression))
+                                      for expression in expressions if isinstance(expression, string_types))
+        self.expression_results = {}
+        self.expression_hits = set()
+
+    def get_kept_fields(self):
+        """
+        Returns the sorted names and glob patterns of the partition properties to keep,
+        None when all of them are kept
+        """
+        if not self.hostvar_fields:
+            return None
+        fields = set(str(field) for field in self.hostvar_fields)
+        fields.update(PARTITION_REQUIRED_FIELDS)
+        fields.update(self.filters)
+        if self.identify_unknown_by.lower() != 'omit':
+            fields.add(self.identify_unknown_by)
+        expressions = list(self.compose.values()) + list(self.groups.values())
+        expressions += [keyed_group.get('key') for keyed_group in self.keyed_groups if isinstance(keyed_group, dict)]
+        for expression in expressions:
+            variables = template_variables(expression)
+            if variables is None:
+                logger.debug("Could not parse the expression %s, all the partition properties are kept", expression)
+                return None
+            fields.update(variables)
+        return sorted(fields)
+
+    def build_field_selector(self, kept_fields):
+        # Predicate telling whether a partition property is kept, the decision is made once per property name
+        if kept_fields is None:
+            return None
+        names = set(field for field in kept_fields if not any(char in field for char in '*?['))
+        patterns = [field for field in kept_fields if field not in names]
+        decisions = dict((name, True) for name in names)
+
+        def selector(field):
+            try:
+                return decisions[field]
+            except KeyError:
+                decisions[field] = any(fnmatch.fnmatchcase(field, pattern) for pattern in patterns)
+                return decisions[field]
+        return selector
 
     def validate_and_set_args(self, args):
         for arg in args:
@@ -585,6 +1147,10 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
                     setattr(self, arg, args[arg].get("value"))
                 else:
                     raise AnsibleParserError("%s must be a boolean value. Current value is: %s" % (arg, args[arg].get("value")))
+            elif args[arg]["type"] == 'int':
+                if isinstance(args[arg].get("value"), bool) or not isinstance(args[arg].get("value"), int) or args[arg].get("value") < 1:
+                    raise AnsibleParserError("%s must be a positive integer. Current value is: %s" % (arg, args[arg].get("value")))
+                setattr(self, arg, args[arg].get("value"))
             elif args[arg]["type"] == 'list':
                 if not isinstance(args[arg].get("value"), list):
                     raise AnsibleParserError("%s is currently %s and needs to be defined as a %s." % (arg, args[arg].get("value"), 'list'))
@@ -620,32 +1186,26 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
     def get_lpar_os_type(self, lpar):
         return lpar["PartitionType"]
 
-    def get_tag_text(self, e):
-        lpar_data = {}
-        for child in e:
-            if child.text is None or child.text.strip() == "":
-                lpar_data.update(self.get_tag_text(child))
-            else:
-                tag = child.tag.split("}")[-1]
-                lpar_data[tag] = child.text
-        return lpar_data
+    def get_tag_text(self, e, intern_keys=True, fields=None):
+        # Flattened text of the partition entry e, see flatten_entry
+        return flatten_entry(e, intern_keys, fields)
 
     def is_lpar_excluded(self, lpar):
-        if "ResourceMonitoringIPAddress" in lpar and lpar["ResourceMonitoringIPAddress"] in self.exclude_ip:
+        if "ResourceMonitoringIPAddress" in lpar and is_excluded(lpar["ResourceMonitoringIPAddress"], self.excluded_ips):
             # LPAR excluded due to IP address
             return True
-        if "PartitionName" in lpar and lpar["PartitionName"] in self.exclude_lpar:
+        if "PartitionName" in lpar and is_excluded(lpar["PartitionName"], self.excluded_lpars):
             # LPAR excluded due to partinion name
             return True
         return False
 
     def matches_filters(self, itm):
         # Our filter should be a subset of our LPAR if the LPAR matches the filter items
-        return viewitems(self.filters) <= viewitems(itm)
+        return self.lpar_filter(itm)
 
     def matches_ms_filters(self, itm):
         # Our filter should be a subset of our managed_system if the managed_system matches the filter items
-        return viewitems(self.system_filters) <= viewitems(itm)
+        return self.system_filter(itm)
 
     def lpar_should_be_included(self, lpar):
         if self.matches_filters(lpar) and not self.is_lpar_excluded(lpar):
@@ -653,20 +1213,89 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
         return False
 
     def is_ms_excluded(self, ms):
-        if "IPAddress" in ms and ms['IPAddress'] in self.exclude_ip:
+        if "IPAddress" in ms and is_excluded(ms['IPAddress'], self.excluded_ips):
             return True
-        if "SystemName" in ms and ms["SystemName"] in self.exclude_system:
+        if "SystemName" in ms and is_excluded(ms["SystemName"], self.excluded_systems):
             return True
         return False
 
+    def memoized(self, expression, variables, evaluate):
+        """
+        Returns evaluate(), computed once per expression and distinct values of the variables it refers to,
+        see memoizable_inputs. The other expressions are evaluated every time, as are the ones which got
+        no hit for their first MEMO_PROBE_SIZE results and the ones giving lists or dicts, which the hosts
+        must not share.
+        """
+        try:
+            inputs = self.expression_inputs.get(expression)
+        except TypeError:
+            inputs = None
+        if inputs is None:
+            return evaluate()
+        key = tuple(memo_value(variables.get(name, UNDEFINED)) for name in inputs)
+        results = self.expression_results.setdefault(expression, {})
+        try:
+            result = results[key]
+        except KeyError:
+            pass
+        else:
+            self.expression_hits.add(expression)
+            return result
+        result = evaluate()
+        if isinstance(result, (list, dict)) or (len(results) >= MEMO_PROBE_SIZE and expression not in self.expression_hits):
+            self.expression_inputs[expression] = None
+            del self.expression_results[expression]
+        else:
+            results[key] = result
+        return result
+
     def ms_should_be_included(self, ms):
         if self.matches_ms_filters(ms) and not self.is_ms_excluded(ms):
             return True
         return False
 
     def fetch_associated_groups(self, id, tagged_groups):
-        grps = []
-        for group_name, group_ele in tagged_groups.items():
-            if id in group_ele:
-                grps.append(group_name)
-        return grps
+        # tagged_groups holds the group names of every tagged UUID, as returned by fetchTaggedGroupItems
+        return list(tagged_groups.get(id, ()))
+
+
+def main(argv=None):
+    """
+    Refresher of the snapshot of an inventory source, see the snapshot_path option.
+    The plugin is loaded by name, the collection loader must be installed, see scripts/powervm_inventory_refresher.py.
+    """
+    import argparse
+    from ansible.inventory.data import InventoryData
+    from ansible.parsing.dataloader import DataLoader
+
+    parser = argparse.ArgumentParser(description="Keeps the snapshot_path snapshot of a powervm_inventory source up to date.")
+    parser.add_argument('source', help="inventory source, a *.power_hmc.yml or *.power_hmc.yaml file")
+    parser.add_argument('--interval', type=int, default=300, help="seconds between two refreshes, 300 by default")
+    parser.add_argument('--once', action='store_true', help="refresh the snapshot once and exit")
+    parser.add_argument('--debug', action='store_true', help="log to %s" % LOG_FILENAME)
+    args = parser.parse_args(argv)
+
+    if args.debug:
+        init_logger()
+    plugin = inventory_loader.get(InventoryModule.NAME)
+    loader = DataLoader()
+    while True:
+        started = time.time()
+        try:
+            # Parsed like ansible-inventory --flush-cache does, which fetches the inventory and replaces the snapshot
+            plugin.parse(InventoryData(), loader, args.source, cache=False)
+            if not plugin.snapshot_path:
+                raise AnsibleParserError("snapshot_path is not set in the inventory source %s." % args.source)
+            if plugin.get_option('cache'):
+                # Done by the inventory manager once a source got parsed, it writes the inventory cache
+                plugin.update_cache_if_changed()
+            logger.info("Snapshot of %s refreshed in %.1f seconds", args.source, time.time() - started)
+        except Exception as error:
+            # A failed refresh leaves the former snapshot in place, it is retried on the next interval
+            logger.debug("Snapshot of %s could not be refreshed: %s", args.source, error)
+            sys.stderr.write("Snapshot of %s could not be refreshed: %s\n" % (args.source, error))
+            if args.once:
+                return 1
+        if args.once:
+            return 0
+        time.sleep(max(0, args.interval - (time.time() - started)))
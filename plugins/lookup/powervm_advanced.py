@@ -0,0 +1,172 @@
+# Copyright: (c) 2018- IBM, Inc
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = '''
+---
+name: powervm_advanced
+author:
+    - agent (agent@local)
+version_added: "1.10.0"
+requirements:
+    - Python >= 3
+short_description: Fetches the advanced properties of LPARs and VIOS on demand
+description:
+    - Returns the advanced properties of partitions, as the C(ibm.power_hmc.powervm_inventory) inventory plugin
+      provides them with I(advanced_fields), fetched from the HMC only when the lookup runs.
+    - Meant for inventories generated with I(lazy_advanced_fields), which set the C(powervm_hmc), C(powervm_partition_uuid)
+      and C(powervm_partition_type) variables the lookup locates the partition of the current host with.
+    - The properties of a partition are fetched once per playbook run, later lookups of the same partition
+      are served from the controller temporary directory of the run.
+options:
+    _terms:
+        description:
+            - UUIDs of the partitions, the partition of the current host when omitted.
+        type: list
+        elements: str
+    hmc_host:
+        description:
+            - The IPaddress or hostname of the HMC managing the partitions.
+        type: str
+        vars:
+            - name: powervm_hmc
+    hmc_auth:
+        description:
+            - Username and Password credential of the HMC.
+        required: true
+        type: dict
+    partition_type:
+        description:
+            - Whether the partitions are LPARs or VIOS.
+        type: str
+        choices: [LPAR, VIOS]
+        default: LPAR
+        vars:
+            - name: powervm_partition_type
+'''
+
+EXAMPLES = '''
+- name: Show the processors of the partition of the current host
+  ansible.builtin.debug:
+    msg: "{{ lookup('ibm.power_hmc.powervm_advanced', hmc_auth=hmc_auth).CurrentProcessors }}"
+  vars:
+    hmc_auth:
+      username: <HMC_Username>
+      password: <HMC_Password>
+
+- name: Fetch the advanced properties of a given VIOS
+  ansible.builtin.set_fact:
+    vios_properties: "{{ lookup('ibm.power_hmc.powervm_advanced', vios_uuid, hmc_host=hmc, hmc_auth=hmc_auth, partition_type='VIOS') }}"
+'''
+
+RETURN = '''
+_raw:
+    description:
+        - The advanced properties of every partition, as a dict of the property names to their value.
+    type: list
+    elements: dict
+'''
+
+import hashlib
+import json
+import os
+import tempfile
+from ansible import constants as C
+from ansible.errors import AnsibleLookupError
+from ansible.plugins.lookup import LookupBase
+import ansible.module_utils.six.moves.urllib.error as urllib_error
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_rest_client import HmcRestClient
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_rest_client import flatten_entry
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_rest_client import parse_error_response
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_exceptions import HmcError
+
+import logging
+logger = logging.getLogger(__name__)
+
+# Properties fetched by this process, the other processes of the run find them in the run directory
+_fetched = {}
+
+
+def memo_path(hmc_host, partition_type, partition_uuid):
+    # File of the properties of a partition, in the controller temporary directory removed at the end of the run
+    key = hashlib.sha256(json.dumps([hmc_host, partition_type, partition_uuid]).encode('utf-8')).hexdigest()
+    return os.path.join(C.DEFAULT_LOCAL_TMP, f'powervm_advanced_{key}.json')
+
+
+def load_memo(path):
+    try:
+        with open(path) as memo_file:
+            return json.load(memo_file)
+    except (IOError, OSError, ValueError):
+        return None
+
+
+def save_memo(path, properties):
+    # Written to a temporary file then renamed, concurrent lookups never read a partial file
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, 'w') as memo_file:
+            json.dump(properties, memo_file)
+        os.rename(tmp_path, path)
+    except (IOError, OSError) as error:
+        logger.debug("Could not save the properties to %s: %s", path, error)
+
+
+class LookupModule(LookupBase):
+
+    def run(self, terms, variables=None, **kwargs):
+        self.set_options(var_options=variables, direct=kwargs)
+        hmc_host = self.get_option('hmc_host')
+        hmc_auth = self.get_option('hmc_auth')
+        partition_type = self.get_option('partition_type')
+        if not terms:
+            terms = [(variables or {}).get('powervm_partition_uuid')]
+        if not hmc_host or not all(terms):
+            raise AnsibleLookupError("hmc_host and the partition UUIDs are required, the powervm_hmc and powervm_partition_uuid "
+                                     "variables are set by the powervm_inventory plugin with lazy_advanced_fields")
+        if not isinstance(hmc_auth, dict) or not hmc_auth.get('username') or not hmc_auth.get('password'):
+            raise AnsibleLookupError("hmc_auth must hold the username and password of the HMC")
+
+        results = {}
+        missing = []
+        for partition_uuid in terms:
+            key = (hmc_host, partition_type, partition_uuid)
+            if key not in _fetched:
+                properties = load_memo(memo_path(*key))
+                if properties is None:
+                    missing.append(partition_uuid)
+                    continue
+                _fetched[key] = properties
+            results[partition_uuid] = _fetched[key]
+        if missing:
+            results.update(self.fetch_properties(hmc_host, hmc_auth, partition_type, missing))
+        return [results[partition_uuid] for partition_uuid in terms]
+
+    def fetch_properties(self, hmc_host, hmc_auth, partition_type, partition_uuids):
+        # The partitions missing from the memo are fetched over a single HMC session, logged on by the client
+        try:
+            rest_conn = HmcRestClient(hmc_host, hmc_auth['username'], hmc_auth['password'])
+        except (HmcError, urllib_error.HTTPError, urllib_error.URLError) as error:
+            raise AnsibleLookupError(f"Could not log on to {hmc_host}: {parse_error_response(error)}")
+        fetched = {}
+        try:
+            for partition_uuid in partition_uuids:
+                if partition_type == 'VIOS':
+                    partition_dom = rest_conn.getVirtualIOServer(partition_uuid, group='Advanced')
+                else:
+                    dummy, partition_dom = rest_conn.getLogicalPartition(None, partition_uuid=partition_uuid, group='Advanced')
+                if partition_dom is None:
+                    raise AnsibleLookupError(f"Could not retrieve the {partition_type} {partition_uuid} from {hmc_host}")
+                key = (hmc_host, partition_type, partition_uuid)
+                fetched[partition_uuid] = _fetched[key] = flatten_entry(partition_dom, intern_keys=False)
+                save_memo(memo_path(*key), fetched[partition_uuid])
+        except (HmcError, urllib_error.HTTPError, urllib_error.URLError) as error:
+            raise AnsibleLookupError(f"Could not retrieve the partitions from {hmc_host}: {parse_error_response(error)}")
+        finally:
+            try:
+                rest_conn.logoff()
+            except Exception as error:
+                logger.debug("Logoff from %s failed: %s", hmc_host, error)
+        return fetched
@@ -1,11 +1,52 @@
 from __future__ import absolute_import, division, print_function
 __metaclass__ = type
+import codecs
 import logging
 import os
+import re
+import select
+import signal
+import subprocess
+import time
+import uuid
+from collections import deque
 from collections import OrderedDict
+from ansible.module_utils.common.text.converters import to_native
 from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_exceptions import HmcError
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_session_cache import ensure_private_dir
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_ssh_pool import NEED_PARAMIKO
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_ssh_pool import get_ssh_pool
 logger = logging.getLogger(__name__)
 
+# SSH connection multiplexing is opt-in, it gets enabled by setting this environment variable to the number
+# of seconds the master connection to an HMC stays open once its last command completed
+SSH_CONTROL_PERSIST_ENV = 'POWER_HMC_SSH_CONTROL_PERSIST'
+SSH_CONTROL_DIR_ENV = 'POWER_HMC_SSH_CONTROL_DIR'
+DEFAULT_SSH_CONTROL_DIR = '~/.ansible/power_hmc_cp'
+# Commands run through the ssh command line by default, 'paramiko' runs them in-process over a pool of
+# authenticated connections per HMC, shared by all the HmcCliConnection of the process
+SSH_BACKEND_ENV = 'POWER_HMC_SSH_BACKEND'
+SSH_BACKENDS = ('openssh', 'paramiko')
+# Streamed commands check their deadline at this interval while they are silent
+STREAM_POLL_INTERVAL = 0.1
+STREAM_CHUNK_SIZE = 32 * 1024
+STREAM_ERROR_LINES = 50
+
+
+def control_persist_from_env():
+    try:
+        control_persist = int(os.environ.get(SSH_CONTROL_PERSIST_ENV) or 0)
+    except ValueError:
+        logger.debug("Ignoring %s, it is not a number of seconds", SSH_CONTROL_PERSIST_ENV)
+        return None
+    return control_persist if control_persist > 0 else None
+
+
+def host_key_checking():
+    # This env 'ANSIBLE_HOST_KEY_CHECKING' only will work in case if it is set as environment variable
+    # All other options like from ansible config file or inventory file wont work
+    return os.environ.get('ANSIBLE_HOST_KEY_CHECKING') not in ['False', 'false', 'FALSE', '0', 'no', 'No', 'NO']
+
 
 def resolve_return_code(rc):
     if rc == 1:
@@ -29,31 +70,97 @@ class HmcCliConnection:
     ##
     # Constructor for HmcCliConnection
     #
-    def __init__(self, module, ip, username, password):
+    def __init__(self, module, ip, username, password, control_persist=None, control_dir=None, backend=None):
         self.ip = ip
         self.pwd = password
         self.user = username
         self.module = module
+        # Commands to the same HMC and user share one authenticated SSH connection, kept open
+        # control_persist seconds after the last command, through a control socket of control_dir
+        self.control_persist = control_persist if control_persist is not None else control_persist_from_env()
+        self.control_dir = control_dir or os.environ.get(SSH_CONTROL_DIR_ENV) or DEFAULT_SSH_CONTROL_DIR
+        self._multiplexing_options = None
+        self.backend = backend or os.environ.get(SSH_BACKEND_ENV) or SSH_BACKENDS[0]
+        if self.backend not in SSH_BACKENDS:
+            raise HmcError("Unsupported SSH backend {0}, expected one of {1}".format(self.backend, ', '.join(SSH_BACKENDS)))
+        if self.backend == 'paramiko' and NEED_PARAMIKO:
+            raise HmcError("Missing prerequisite paramiko package. Hint pip install paramiko")
 
-    def execute(self, cmd):
-        stderr = None
-        stdout = None
+    def multiplexing_options(self):
+        if not self.control_persist:
+            return ''
+        if self._multiplexing_options is None:
+            control_dir = os.path.abspath(os.path.expanduser(self.control_dir))
+            try:
+                private = ensure_private_dir(control_dir)
+            except OSError as error:
+                logger.debug("Unable to create the SSH control socket directory %s: %s", control_dir, error)
+                private = False
+            # %C is a hash of the local host, HMC, port and user, the socket path stays short whatever the HMC name
+            self._multiplexing_options = (" -o ControlMaster=auto -o ControlPersist={0} -o 'ControlPath={1}' ".format(
+                self.control_persist, os.path.join(control_dir, '%C')) if private else '')
+        return self._multiplexing_options
 
+    def openssh_command(self, cmd):
         host_key_ignore = ''
-        # This env 'ANSIBLE_HOST_KEY_CHECKING' only will work in case if it is set as environment variable
-        # All other options like from ansible config file or inventory file wont work
-        if os.environ.get('ANSIBLE_HOST_KEY_CHECKING') in ['False', 'false', 'FALSE', '0', 'no', 'No', 'NO']:
+        if not host_key_checking():
             host_key_ignore = ' -o StrictHostKeyChecking=no '
 
-        logger.debug("COMMAND: %s", cmd)
+        ssh_options = host_key_ignore + self.multiplexing_options()
+
         if self.pwd:
-            ssh_hmc_cmd = "sshpass -p  '{0}' ssh '{1}'@{2} {3} '{4}'".format(self.pwd, self.user, self.ip, host_key_ignore, cmd)
+            ssh_hmc_cmd = "sshpass -p  '{0}' ssh '{1}'@{2} {3} '{4}'".format(self.pwd, self.user, self.ip, ssh_options, cmd)
         else:
-            ssh_hmc_cmd = "ssh '{0}'@{1} {2} '{3}'".format(self.user, self.ip, host_key_ignore, cmd)
+            ssh_hmc_cmd = "ssh '{0}'@{1} {2} '{3}'".format(self.user, self.ip, ssh_options, cmd)
 
         logger.debug(ssh_hmc_cmd)
-        status_code, stdout, stderr = self.module.run_command(ssh_hmc_cmd, use_unsafe_shell=True)
+        return ssh_hmc_cmd
+
+    def run_openssh(self, cmd):
+        return self.module.run_command(self.openssh_command(cmd), use_unsafe_shell=True)
+
+    def run_paramiko(self, cmd):
+        return get_ssh_pool(self.ip, self.user, self.pwd, check_host_key=host_key_checking()).run(cmd)
+
+    def run(self, cmd):
+        if self.backend == 'paramiko':
+            return self.run_paramiko(cmd)
+        return self.run_openssh(cmd)
+
+    def stream_openssh(self, cmd):
+        # Same (status, stdout, stderr) items as HmcSshPool.stream, read from the ssh command line
+        with open(os.devnull, 'rb') as devnull:
+            # In its own process group, interrupting the command kills sshpass and ssh along with the shell
+            process = subprocess.Popen(self.openssh_command(cmd), shell=True, stdin=devnull, stdout=subprocess.PIPE,
+                                       stderr=subprocess.PIPE, preexec_fn=os.setsid)
+        try:
+            fds = [process.stdout.fileno(), process.stderr.fileno()]
+            while fds:
+                readable = select.select(fds, [], [], STREAM_POLL_INTERVAL)[0]
+                if not readable:
+                    yield None, b'', b''
+                for fd in readable:
+                    data = os.read(fd, STREAM_CHUNK_SIZE)
+                    if not data:
+                        fds.remove(fd)
+                    elif fd == process.stdout.fileno():
+                        yield None, data, b''
+                    else:
+                        yield None, b'', data
+            yield process.wait(), b'', b''
+        finally:
+            if process.poll() is None:
+                os.killpg(process.pid, signal.SIGTERM)
+                process.wait()
+            process.stdout.close()
+            process.stderr.close()
+
+    def stream(self, cmd):
+        if self.backend == 'paramiko':
+            return get_ssh_pool(self.ip, self.user, self.pwd, check_host_key=host_key_checking()).stream(cmd)
+        return self.stream_openssh(cmd)
 
+    def check_status(self, status_code, stdout, stderr):
         if status_code != 0:
             stderr = stderr.replace("\n", "").replace("\r", "").replace("\\", "")
             stdout = stdout.replace("\r", "").replace("..|", "\n").replace("../", "\n").replace("..-", "\n").replace("\\", "\n").replace("...", "")
@@ -70,5 +177,100 @@ class HmcCliConnection:
             else:
                 raise HmcError(errMsg)
 
+    def execute(self, cmd):
+        logger.debug("COMMAND: %s", cmd)
+        status_code, stdout, stderr = self.run(cmd)
+        self.check_status(status_code, stdout, stderr)
+
         logger.debug("COMMAND RESULT: %s", stdout)
         return stdout
+
+    def execute_many(self, cmds):
+        """
+        Runs the commands one after the other in a single remote shell invocation and returns their outputs.
+        The shell stops at the first failing command, which raises HmcError like execute with the output of
+        that command and the error output of the invocation. Meant for read-only commands, as the restricted
+        shell of the HMC does not allow the redirections needed to tell the error output of each command apart.
+        """
+        if len(cmds) < 2:
+            return [self.execute(cmd) for cmd in cmds]
+        # Each output is followed by a newline and a delimiter line, the newline keeps the delimiter on
+        # its own line when the output does not end with one
+        delimiter = 'HMC_CMD_DONE_{0}'.format(uuid.uuid4().hex)
+        script = '; '.join('{0} || exit $?; echo; echo {1}'.format(cmd, delimiter) for cmd in cmds)
+        logger.debug("COMMANDS: %s", cmds)
+        status_code, stdout, stderr = self.run(script)
+
+        outputs = stdout.split('\n{0}\n'.format(delimiter))
+        completed, remainder = outputs[:-1], outputs[-1]
+        if status_code != 0:
+            if len(completed) < len(cmds):
+                logger.debug("COMMAND FAILED: %s", cmds[len(completed)])
+            self.check_status(status_code, remainder, stderr)
+        if len(completed) != len(cmds) or remainder:
+            raise HmcError("Unexpected output of the batched commands: {0}".format(stdout))
+
+        logger.debug("COMMANDS RESULT: %s", completed)
+        return completed
+
+    def execute_stream(self, cmd, stop_patterns=None, fail_patterns=None, timeout=None, progress=None):
+        """
+        Runs cmd and yields the lines of its output as they arrive, for the commands running for long.
+        The stream ends once the command exits, after the first line matching one of stop_patterns or
+        when timeout seconds elapsed, the command gets interrupted when it did not exit by then.
+        A line matching one of fail_patterns raises HmcError, as does the command exiting with an error.
+        progress gets called with every line before it is yielded, see progress_reporter.
+        """
+        stop_patterns = [re.compile(pattern) for pattern in stop_patterns or []]
+        fail_patterns = [re.compile(pattern) for pattern in fail_patterns or []]
+        deadline = time.time() + timeout if timeout else None
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        # Only the last lines are kept for the error message, the output of these commands is unbounded
+        last_lines = deque(maxlen=STREAM_ERROR_LINES)
+        stderr = []
+        pending = ''
+
+        logger.debug("STREAMED COMMAND: %s", cmd)
+        chunks = self.stream(cmd)
+        try:
+            for status_code, out, err in chunks:
+                stderr.append(err)
+                lines = (pending + decoder.decode(out, final=status_code is not None)).split('\n')
+                pending = lines.pop()
+                # Prompts do not end with a newline, they stop the stream as soon as they arrive
+                if pending and (status_code is not None or any(pattern.search(pending) for pattern in stop_patterns)):
+                    lines.append(pending)
+                    pending = ''
+                for line in lines:
+                    line = line.rstrip('\r')
+                    last_lines.append(line)
+                    if progress:
+                        progress(line)
+                    if any(pattern.search(line) for pattern in fail_patterns):
+                        raise HmcError(line)
+                    yield line
+                    if any(pattern.search(line) for pattern in stop_patterns):
+                        logger.debug("Stopping %s on: %s", cmd, line)
+                        return
+                if status_code is not None:
+                    self.check_status(status_code, '\n'.join(last_lines), to_native(b''.join(stderr), errors='surrogate_or_strict'))
+                    return
+                if deadline and time.time() > deadline:
+                    logger.debug("Stopping %s after %s seconds", cmd, timeout)
+                    return
+        finally:
+            chunks.close()
+
+
+def progress_reporter(module=None, warn_patterns=None):
+    """
+    Returns a progress callback for execute_stream, which logs every line and turns
+    the lines matching one of warn_patterns into warnings of module.
+    """
+    warn_patterns = [re.compile(pattern) for pattern in warn_patterns or []]
+
+    def report(line):
+        logger.info(line)
+        if module and any(pattern.search(line) for pattern in warn_patterns):
+            module.warn(line)
+    return report
@@ -0,0 +1,391 @@
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+import base64
+import io
+import socket
+import ssl
+import threading
+import zlib
+from ansible.module_utils.six.moves import http_client
+from ansible.module_utils.six.moves.urllib.parse import unquote, urlsplit
+from ansible.module_utils.six.moves.urllib.request import getproxies, proxy_bypass
+from ansible.module_utils.common.text.converters import to_bytes, to_native
+import ansible.module_utils.six.moves.urllib.error as urllib_error
+
+import logging
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 4
+USER_AGENT = 'ansible-httpget'
+# Atom feeds are highly compressible XML, ask the HMC for compressed responses
+ACCEPT_ENCODING = 'gzip, deflate'
+READ_CHUNK_SIZE = 64 * 1024
+
+# Errors raised by a keep-alive connection which the HMC already closed on its side.
+# A request failing with one of these on a reused connection is retried once on a fresh connection,
+# provided it could not have reached the HMC or replaying it is harmless.
+STALE_CONNECTION_ERRORS = (http_client.BadStatusLine, http_client.CannotSendRequest,
+                           http_client.ResponseNotReady, socket.error)
+IDEMPOTENT_METHODS = ('GET', 'HEAD')
+
+_pools = {}
+# Number of clients using the pools of each HMC, see retain_connection_pools
+_clients = {}
+_pools_lock = threading.Lock()
+
+
+class HmcResponse:
+    """
+    Fully read HTTP response, exposes the subset of the open_url response object used by HmcRestClient.
+    The decoded body is held in memory, large feeds are better read through HmcConnectionPool.stream.
+    """
+    def __init__(self, url, code, reason, headers, body):
+        self.url = url
+        self.code = code
+        self.status = code
+        self.reason = reason
+        self.headers = headers
+        self._body = body
+
+    def read(self):
+        return self._body
+
+    def info(self):
+        return self.headers
+
+    def getheader(self, name, default=None):
+        return self.headers.get(name, default)
+
+
+class ContentDecoder:
+    """
+    Incremental decoder of a gzip or deflate encoded response body, decode() is given the chunks read off the
+    connection and returns the content they decompress to, so that decompression overlaps the transfer.
+    Responses without content encoding pass through untouched.
+    """
+    def __init__(self, encoding=None):
+        self.encoding = (encoding or 'identity').strip().lower()
+        if self.encoding in ('gzip', 'x-gzip'):
+            self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif self.encoding == 'deflate':
+            self._decompressor = zlib.decompressobj()
+        else:
+            self._decompressor = None
+        self.wire_bytes = 0
+        self.content_bytes = 0
+
+    def decode(self, data):
+        if not data:
+            return b''
+        if self._decompressor is None:
+            decoded = data
+        elif self.encoding == 'deflate' and not self.wire_bytes:
+            try:
+                decoded = self._decompressor.decompress(data)
+            except zlib.error:
+                # Some servers send raw deflate data without the zlib header
+                self._decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+                decoded = self._decompressor.decompress(data)
+        else:
+            decoded = self._decompressor.decompress(data)
+        self.wire_bytes += len(data)
+        self.content_bytes += len(decoded)
+        return decoded
+
+    def flush(self):
+        if self._decompressor is None:
+            return b''
+        decoded = self._decompressor.flush()
+        self.content_bytes += len(decoded)
+        return decoded
+
+
+class HmcConnectionPool:
+    """
+    Pool of keep-alive HTTPS connections towards a single HMC.
+    At most pool_size requests are in flight at a time, idle connections are reused
+    so that only the first request pays for the TCP and TLS handshake.
+    """
+    def __init__(self, host, port=443, pool_size=DEFAULT_POOL_SIZE, validate_certs=False):
+        self.host = host
+        self.port = port
+        self.pool_size = pool_size
+        self.validate_certs = validate_certs
+        self._idle = []
+        self._busy = set()
+        self._aborted = False
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(pool_size)
+        # Bytes received from the HMC and bytes of content they decompressed to
+        self.wire_bytes = 0
+        self.content_bytes = 0
+
+    def _ssl_context(self):
+        if self.validate_certs:
+            return ssl.create_default_context()
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT) if hasattr(ssl, 'PROTOCOL_TLS_CLIENT') else ssl.SSLContext(ssl.PROTOCOL_SSLv23)
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+        return context
+
+    def _proxy(self):
+        # HTTPS proxy the HMC is reached through, resolved from https_proxy and no_proxy like open_url does
+        proxy = getproxies().get('https')
+        if not proxy or proxy_bypass(self.host):
+            return None
+        if '://' not in proxy:
+            proxy = 'http://' + proxy
+        return urlsplit(proxy)
+
+    def _new_connection(self, timeout):
+        proxy = self._proxy()
+        if proxy is None:
+            logger.debug("Opening new connection to %s:%s", self.host, self.port)
+            return http_client.HTTPSConnection(self.host, self.port, timeout=timeout, context=self._ssl_context())
+        logger.debug("Opening new connection to %s:%s through proxy %s:%s", self.host, self.port, proxy.hostname, proxy.port)
+        conn = http_client.HTTPSConnection(proxy.hostname, proxy.port or 80, timeout=timeout, context=self._ssl_context())
+        tunnel_headers = {}
+        if proxy.username:
+            credentials = f"{unquote(proxy.username)}:{unquote(proxy.password or '')}"
+            tunnel_headers['Proxy-Authorization'] = 'Basic ' + to_native(base64.b64encode(to_bytes(credentials)))
+        conn.set_tunnel(self.host, self.port, headers=tunnel_headers)
+        return conn
+
+    def _checkout(self, timeout):
+        with self._lock:
+            if self._idle:
+                conn = self._idle.pop()
+                conn.timeout = timeout
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+                self._busy.add(conn)
+                return conn, True
+            conn = self._new_connection(timeout)
+            self._busy.add(conn)
+            return conn, False
+
+    def _checkin(self, conn):
+        with self._lock:
+            self._busy.discard(conn)
+            self._idle.append(conn)
+
+    def _discard(self, conn):
+        with self._lock:
+            self._busy.discard(conn)
+        conn.close()
+
+    def _send(self, method, url, headers, data, timeout):
+        """
+        Sends a request over a pooled connection, the caller holds one of the slots of the pool.
+        Returns the connection and its response, whose body is left to be read through _read_body.
+        """
+        split_url = urlsplit(url)
+        path = split_url.path
+        if split_url.query:
+            path = f"{path}?{split_url.query}"
+        req_headers = {'User-Agent': USER_AGENT, 'Accept-Encoding': ACCEPT_ENCODING}
+        req_headers.update(headers or {})
+        body = to_bytes(data, nonstring='passthru') if data is not None else None
+
+        retry = True
+        while True:
+            if self._aborted:
+                raise urllib_error.URLError(f"Connection pool to {self.host} aborted")
+            conn, reused = self._checkout(timeout)
+            sent = False
+            try:
+                conn.request(method, path, body=body, headers=req_headers)
+                sent = True
+                return conn, conn.getresponse()
+            except socket.timeout as error:
+                self._discard(conn)
+                raise urllib_error.URLError(error)
+            except STALE_CONNECTION_ERRORS as error:
+                self._discard(conn)
+                # Once sent, a job submission or an update may have been carried out by the HMC, it is not replayed
+                if reused and retry and (not sent or method.upper() in IDEMPOTENT_METHODS):
+                    logger.debug("Reused connection to %s was closed by peer, retrying", self.host)
+                    retry = False
+                    continue
+                raise urllib_error.URLError(error)
+            except Exception:
+                self._discard(conn)
+                raise
+
+    def _read_body(self, conn, resp):
+        """
+        Generator of the decoded chunks of the body of resp as they are read off conn. The connection goes back
+        to the pool once the body was fully read, it is closed when the generator gets closed before that.
+        """
+        decoder = ContentDecoder(resp.getheader('Content-Encoding'))
+        try:
+            while True:
+                chunk = resp.read(READ_CHUNK_SIZE)
+                if not chunk:
+                    break
+                decoded = decoder.decode(chunk)
+                if decoded:
+                    yield decoded
+            decoded = decoder.flush()
+        except (socket.timeout,) + STALE_CONNECTION_ERRORS as error:
+            self._discard(conn)
+            raise urllib_error.URLError(error)
+        except zlib.error as error:
+            self._discard(conn)
+            raise urllib_error.URLError(f"Corrupt {decoder.encoding} encoded response: {error}")
+        except BaseException:
+            # Includes the GeneratorExit of a caller giving up on the rest of the body
+            self._discard(conn)
+            raise
+
+        if resp.will_close:
+            self._discard(conn)
+        else:
+            self._checkin(conn)
+        self._count(decoder)
+        if decoded:
+            yield decoded
+
+    def request(self, method, url, headers=None, data=None, timeout=300):
+        self._slots.acquire()
+        try:
+            conn, resp = self._send(method, url, headers, data, timeout)
+            resp_body = b''.join(self._read_body(conn, resp))
+        finally:
+            self._slots.release()
+
+        resp_headers = resp.msg
+        if resp.status >= 400:
+            raise urllib_error.HTTPError(url, resp.status, resp.reason, resp_headers, io.BytesIO(resp_body))
+        return HmcResponse(url, resp.status, resp.reason, resp_headers, resp_body)
+
+    def stream(self, method, url, headers=None, data=None, timeout=300):
+        """
+        Generator of the decoded chunks of the response body as they arrive, meant for large feeds which are
+        parsed while they are transferred, see iter_feed_entries. The request is sent on the first iteration,
+        errors are raised as by request. The connection and its slot are held until the body was fully read
+        or the generator gets closed.
+        """
+        self._slots.acquire()
+        try:
+            conn, resp = self._send(method, url, headers, data, timeout)
+            chunks = self._read_body(conn, resp)
+            try:
+                if resp.status >= 400:
+                    raise urllib_error.HTTPError(url, resp.status, resp.reason, resp.msg, io.BytesIO(b''.join(chunks)))
+                for chunk in chunks:
+                    yield chunk
+            finally:
+                chunks.close()
+        finally:
+            self._slots.release()
+
+    def _count(self, decoder):
+        with self._lock:
+            self.wire_bytes += decoder.wire_bytes
+            self.content_bytes += decoder.content_bytes
+
+    def bytes_saved(self):
+        return self.content_bytes - self.wire_bytes
+
+    def abort(self):
+        """
+        Interrupts the requests in flight, which then fail with an URLError, and closes the idle connections.
+        Meant for long polls which would otherwise keep their connection busy till the HMC answers.
+        """
+        with self._lock:
+            self._aborted = True
+            busy = list(self._busy)
+            idle, self._idle = self._idle, []
+        for conn in busy:
+            # Shutting the socket down wakes up the thread blocked reading it, which then closes the connection
+            sock = conn.sock
+            if sock is not None:
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except socket.error:
+                    pass
+        for conn in idle:
+            conn.close()
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+def get_connection_pool(url, pool_size=DEFAULT_POOL_SIZE):
+    """
+    Returns the connection pool shared by all clients talking to the HMC referenced by url with the same pool_size
+    """
+    split_url = urlsplit(url)
+    key = (split_url.hostname, split_url.port or 443, pool_size)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = HmcConnectionPool(key[0], key[1], pool_size=pool_size)
+            _pools[key] = pool
+        return pool
+
+
+def _stats(pools):
+    wire_bytes = sum(pool.wire_bytes for pool in pools)
+    content_bytes = sum(pool.content_bytes for pool in pools)
+    return {'wire_bytes': wire_bytes, 'content_bytes': content_bytes, 'bytes_saved': content_bytes - wire_bytes}
+
+
+def transfer_stats(host=None):
+    """
+    Returns the bytes received by the connection pools towards host (all of them by default), the bytes
+    of content they decompressed to and the difference, that is the bandwidth saved by compression
+    """
+    with _pools_lock:
+        pools = [pool for key, pool in _pools.items() if host is None or key[0] == host]
+    return _stats(pools)
+
+
+def retain_connection_pools(host):
+    """
+    Registers a client of the connection pools towards host, release_connection_pools closes them
+    once the last of their clients is done with them
+    """
+    with _pools_lock:
+        _clients[host] = _clients.get(host, 0) + 1
+
+
+def release_connection_pools(host):
+    """
+    Unregisters a client of the connection pools towards host, the pools are closed when it was the last one
+    """
+    with _pools_lock:
+        clients = _clients.pop(host, 0) - 1
+        if clients > 0:
+            _clients[host] = clients
+            return
+        pools = _take_pools(host)
+    _close_pools(pools, host)
+
+
+def close_connection_pools(host=None):
+    """
+    Closes the connection pools towards host (all of them by default) and logs the bandwidth they saved.
+    Clients talking to host afterwards get a new pool.
+    """
+    with _pools_lock:
+        pools = _take_pools(host)
+    _close_pools(pools, host)
+
+
+def _take_pools(host):
+    # Removes the pools towards host from the shared ones, the caller holds _pools_lock
+    return [_pools.pop(key) for key in list(_pools) if host is None or key[0] == host]
+
+
+def _close_pools(pools, host):
+    stats = _stats(pools)
+    if stats['content_bytes']:
+        logger.debug("Received %d bytes from %s for %d bytes of content, %d bytes saved by compression",
+                     stats['wire_bytes'], host or 'all HMCs', stats['content_bytes'], stats['bytes_saved'])
+    for pool in pools:
+        pool.close()
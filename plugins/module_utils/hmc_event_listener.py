@@ -0,0 +1,154 @@
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+import os
+import threading
+import time
+from ansible.module_utils.six.moves.urllib.parse import urlsplit
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_connection_pool import HmcConnectionPool
+
+import logging
+logger = logging.getLogger(__name__)
+
+# Event feed is opt-in, it gets enabled by setting this environment variable to true
+EVENT_FEED_ENV = 'POWER_HMC_EVENT_FEED'
+# HMC holds the event GET request until an event is available, give up on the request after this many seconds
+EVENT_POLL_TIMEOUT = 120
+# Keys of the events seen within this many seconds are remembered, so that a waiter
+# registered right after the event got dispatched does not miss it
+EVENT_MEMORY_IN_SEC = 600
+# Events which invalidate the state of every object known to the client
+WAKE_ALL_EVENTS = ('CACHE_CLEARED', 'INVALID_URI')
+
+
+def event_feed_enabled():
+    return os.environ.get(EVENT_FEED_ENV, '').lower() in ('true', 'yes', '1')
+
+
+def event_keys(event_data):
+    # Every path segment of the event URI is a key, this covers the job ID and the object UUID waiters use.
+    # The object type is a key too, but waiting on it wakes up on events about any object of the type.
+    path = urlsplit(event_data).path if event_data else ''
+    return set(segment for segment in path.split('/') if segment)
+
+
+class HmcEventListener:
+    """
+    Long polls the event feed of an HMC REST session from a background thread and wakes up
+    whatever is waiting on a job ID or object UUID. When the event feed is not available
+    waiters fall back to plain sleeping, so the callers keep polling as before.
+    """
+    def __init__(self, rest_conn, poll_timeout=EVENT_POLL_TIMEOUT):
+        self.rest_conn = rest_conn
+        self.poll_timeout = poll_timeout
+        # The long poll runs over its own connection, stop() aborts it so that it never outlives the session
+        self._pool = HmcConnectionPool(rest_conn.hmc_ip, pool_size=1)
+        self.available = False
+        self._waiters = {}
+        self._seen = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._start_lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        with self._start_lock:
+            if self._thread is None:
+                # Waiters rely on the feed until the background thread finds it unavailable,
+                # in which case they are woken up and fall back to polling
+                self.available = True
+                self._thread = threading.Thread(target=self._run, name=f"hmc-events-{self.rest_conn.hmc_ip}")
+                self._thread.daemon = True
+                self._thread.start()
+        return self.available
+
+    def stop(self):
+        self._stop.set()
+        self._pool.abort()
+        self._wake_all()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                events = self._fetch_events()
+            except Exception as error:
+                if self._stop.is_set():
+                    return
+                logger.debug("Event feed of %s not available, falling back to polling: %s", self.rest_conn.hmc_ip, error)
+                self.available = False
+                self._wake_all()
+                return
+            self._dispatch(events)
+
+    def _fetch_events(self):
+        return self.rest_conn.getEvents(self.poll_timeout, pool=self._pool)
+
+    def _dispatch(self, events):
+        now = time.time()
+        with self._lock:
+            for event_type, event_data in events:
+                logger.debug("Event %s: %s", event_type, event_data)
+                if event_type in WAKE_ALL_EVENTS:
+                    for waiters in self._waiters.values():
+                        for waiter in waiters:
+                            waiter.set()
+                    continue
+                for key in event_keys(event_data):
+                    self._seen[key] = now
+                    for waiter in self._waiters.get(key, ()):
+                        waiter.set()
+            for key in [key for key, seen in self._seen.items() if now - seen > EVENT_MEMORY_IN_SEC]:
+                del self._seen[key]
+
+    def _wake_all(self):
+        with self._lock:
+            for waiters in self._waiters.values():
+                for waiter in waiters:
+                    waiter.set()
+
+    def wait(self, key, timeout, since=None):
+        """
+        Blocks for up to timeout seconds or until an event about key arrives.
+        Returns True when woken up by an event, also when the event arrived after since (a timestamp)
+        but before the call. Sleeps the whole timeout when the event feed is not available.
+        """
+        if not self.available:
+            time.sleep(timeout)
+            return False
+        waiter = threading.Event()
+        with self._lock:
+            if since is not None and key in self._seen and self._seen[key] >= since:
+                return True
+            self._waiters.setdefault(key, []).append(waiter)
+        try:
+            return waiter.wait(timeout) and self.available
+        finally:
+            with self._lock:
+                self._waiters[key].remove(waiter)
+                if not self._waiters[key]:
+                    del self._waiters[key]
+
+
+_listeners = {}
+_listeners_lock = threading.Lock()
+
+
+def get_event_listener(rest_conn):
+    """
+    Returns the event listener of the REST session of rest_conn, starting it on first use.
+    There is a single listener per HMC session.
+    """
+    key = (rest_conn.hmc_ip, rest_conn.session)
+    with _listeners_lock:
+        listener = _listeners.get(key)
+        if listener is None:
+            listener = HmcEventListener(rest_conn)
+            _listeners[key] = listener
+    listener.start()
+    return listener
+
+
+def stop_event_listener(rest_conn):
+    with _listeners_lock:
+        listener = _listeners.pop((rest_conn.hmc_ip, rest_conn.session), None)
+    if listener:
+        listener.stop()
@@ -8,22 +8,42 @@ __metaclass__ = type
 import time
 import re
 import subprocess
-import multiprocessing
 from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_command_stack import HmcCommandStack
 from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_cli_client import HmcCliConnection
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_cli_client import progress_reporter
 from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_exceptions import HmcError
 from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_exceptions import ParameterError
 import logging
 logger = logging.getLogger(__name__)
 
+# The console of a partition being installed gets followed till the OS prompts for login
+CONSOLE_LOG_TIMEOUT = 360
+CONSOLE_LOGIN_PROMPT = [r'login:\s*$']
+# Lines of the long-running commands turned into module warnings while they run
+PROGRESS_WARN_PATTERNS = [r'(?i)\bwarning\b']
+
 
 class Hmc():
 
-    def __init__(self, hmcconn):
+    def __init__(self, hmcconn, change_waiter=None):
         self.hmcconn = hmcconn
         self.cmdClass = HmcCommandStack()
         self.CMD = self.cmdClass.HMC_CMD
         self.OPT = self.cmdClass.HMC_CMD_OPT
+        # Optional callable(key, timeout) which returns as soon as the HMC reports a change on the object
+        # of UUID key, like HmcRestClient.waitForChange backed by the REST event feed
+        self.change_waiter = change_waiter
+
+    def _executeStreamed(self, cmd):
+        # Runs a long-running command, its output gets logged line by line while it runs and is returned like execute does
+        progress = progress_reporter(getattr(self.hmcconn, 'module', None), PROGRESS_WARN_PATTERNS)
+        return ''.join(line + '\n' for line in self.hmcconn.execute_stream(cmd, progress=progress))
+
+    def _waitForChange(self, uuid, timeout):
+        if self.change_waiter and uuid:
+            self.change_waiter(uuid, timeout)
+        else:
+            time.sleep(timeout)
 
     def listHMCVersion(self):
         versionDict = {}
@@ -150,7 +170,7 @@ class Hmc():
             self.OPT['GETUPGFILES']['-R'][serverType.upper()] + \
             self.cmdClass.configBuilder('GETUPGFILES', configDict)
 
-        result = self.hmcconn.execute(hmcCmd)
+        result = self._executeStreamed(hmcCmd)
         return result
 
     def saveUpgrade(self, drive, configDict=None):
@@ -160,14 +180,14 @@ class Hmc():
         if configDict:
             hmcCmd += self.cmdClass.configBuilder('SAVEUPGDATA', configDict)
 
-        self.hmcconn.execute(hmcCmd)
+        self._executeStreamed(hmcCmd)
 
     def updateHMC(self, locationType, configDict=None):
         hmcCmd = self.CMD['UPDHMC'] + \
             self.OPT['UPDHMC']['-T'][locationType.upper()] + \
             self.cmdClass.configBuilder('UPDHMC', configDict)
 
-        result = self.hmcconn.execute(hmcCmd)
+        result = self._executeStreamed(hmcCmd)
         return result
 
     def listHMCPTF(self, locationType, configDict=None):
@@ -307,14 +327,14 @@ class Hmc():
         res = dict((k.lower(), v) for k, v in res_dict.items())
         return res
 
-    def checkManagedSysState(self, cecName, expectedStates, timeoutInMin=12):
+    def checkManagedSysState(self, cecName, expectedStates, timeoutInMin=12, uuid=None):
         POLL_INTERVAL_IN_SEC = 30
         WAIT_UNTIL_IN_SEC = timeoutInMin * 60
 
         # Polling logic to make sure CEC state changed as expectedState
-        waited = 0
+        deadline = time.time() + WAIT_UNTIL_IN_SEC
         stateSuccess = False
-        while waited < WAIT_UNTIL_IN_SEC:
+        while time.time() < deadline:
             res = self.getManagedSystemDetails(cecName)
             cec_state = res.get('state')
             if cec_state in expectedStates:
@@ -322,10 +342,9 @@ class Hmc():
                 stateSuccess = True
                 break
             logger.debug(cec_state)
-            waited += POLL_INTERVAL_IN_SEC
 
-            # waiting for 30 seconds
-            time.sleep(POLL_INTERVAL_IN_SEC)
+            # waiting for 30 seconds or until the HMC reports a change of the managed system
+            self._waitForChange(uuid, POLL_INTERVAL_IN_SEC)
 
         return stateSuccess
 
@@ -377,7 +396,7 @@ class Hmc():
                     migrlparCmd += " " + self.OPT['MIGRLPAR']['-I'] + '\\' + '"multiple_shared_proc_pool_names=' + str(pool) + '\\' + '"'
                 elif '/' in str(pool):
                     migrlparCmd += " " + self.OPT['MIGRLPAR']['-I'] + '\\' + '"multiple_shared_proc_pool_ids=' + str(pool) + '\\' + '"'
-        self.hmcconn.execute(migrlparCmd)
+        self._executeStreamed(migrlparCmd)
 
     def _configMandatoryLparSettings(self, delta_config=None):
         lparMandatConfig = {'PROFILE_NAME': 'default_profile',
@@ -490,7 +509,7 @@ class Hmc():
             self.OPT['LPAR_NETBOOT']['-C'] + lparIP +\
             self.OPT['LPAR_NETBOOT']['-K'] + submask +\
             " " + viosName + " " + profName + " " + systemName
-        result = self.hmcconn.execute(lpar_netboot)
+        result = self._executeStreamed(lpar_netboot)
         return self._parseIODetailsFromNetboot(result)
 
     def installOSFromNIM(self, loc_code, nimIP, gateway, lparIP, vlanID, vlanPrio, submask, viosName, profName, systemName, lparMac=None):
@@ -517,28 +536,30 @@ class Hmc():
             self.OPT['LPAR_NETBOOT']['-K'] + submask +\
             os_command +\
             " " + viosName + " " + profName + " " + systemName
-        self.hmcconn.execute(lpar_netboot)
+        self._executeStreamed(lpar_netboot)
 
-    def getconsolelog(self, module, lpar_hmc, userid, hmc_password, systemName, lparName):
+    def getconsolelog(self, module, lpar_hmc, userid, hmc_password, systemName, lparName, timeout=None, stop_patterns=None):
+        # Logs the console of the partition, returns whether it stopped on one of stop_patterns
         conn = HmcCliConnection(module, lpar_hmc, userid, hmc_password)
         cmd = 'rmvterm -m ' + systemName + ' -p ' + lparName
         conn.execute(cmd)
         cmd = 'mkvterm -m ' + systemName + ' -p ' + lparName
-        stdout = conn.execute(cmd)
-        try:
-            for line in stdout:
-                logger.debug(line.strip())
-                logger.debug("\n")
-        except UnicodeDecodeError:
+        line = None
+        for line in conn.execute_stream(cmd, stop_patterns=stop_patterns, timeout=timeout, progress=progress_reporter()):
             pass
+        return line is not None and any(re.search(pattern, line) for pattern in stop_patterns or [])
 
     def checkconsolelog(self, module, lpar_ip, lpar_hmc, userid, hmc_password, systemName, lparName):
         logger.info("Installation will take approximatly 10-12 mins to complete.")
-        process = multiprocessing.Process(target=self.getconsolelog, args=(module, lpar_hmc, userid, hmc_password, systemName, lparName))
-        process.start()
-        time.sleep(360)
-        process.terminate()
-        process.join()
+        waitUntil = time.time() + CONSOLE_LOG_TIMEOUT
+        try:
+            if self.getconsolelog(module, lpar_hmc, userid, hmc_password, systemName, lparName,
+                                  timeout=CONSOLE_LOG_TIMEOUT, stop_patterns=CONSOLE_LOGIN_PROMPT):
+                return
+        except HmcError as error:
+            logger.debug("Unable to follow the console of %s: %s", lparName, error)
+        # Without the login prompt the installation is still given the whole console wait
+        time.sleep(max(0, waitUntil - time.time()))
 
     def getPartitionRefcode(self, system_name, name):
         filter_config = dict(LPAR_NAMES=name)
@@ -685,18 +706,18 @@ class Hmc():
     def checkForOSToBootUpFully(self, system_name, name, timeoutInMin=60):
         POLL_INTERVAL_IN_SEC = 30
         WAIT_UNTIL_IN_SEC = timeoutInMin * 60 - 600
-        waited = 0
         rmcActive = False
         ref_code = None
         # wait for 10 mins before polling
         time.sleep(600)
-        while waited < WAIT_UNTIL_IN_SEC:
+        deadline = time.time() + WAIT_UNTIL_IN_SEC
+        while time.time() < deadline:
             conf_dict = self.getPartitionConfig(system_name, name)
             if conf_dict['rmc_state'] == 'active':
                 rmcActive = True
                 break
-            waited += POLL_INTERVAL_IN_SEC
-            time.sleep(POLL_INTERVAL_IN_SEC)
+            # waiting for 30 seconds or until the HMC reports a change of the partition
+            self._waitForChange(conf_dict.get('uuid'), POLL_INTERVAL_IN_SEC)
         if not rmcActive:
             res = self.getPartitionRefcode(system_name, name)
             ref_code = res['REFCODE']
@@ -707,7 +728,7 @@ class Hmc():
             self.OPT['UPDLIC']['-M'] + system_name +\
             self.OPT['UPDLIC']['-O']['ACCEPT']
 
-        return self.hmcconn.execute(updlic_cmd)
+        return self._executeStreamed(updlic_cmd)
 
     def update_managed_system(self, system_name, upgrade=False, repo='ibmwebsite', level='latest', remote_repo=None):
         if upgrade:
@@ -732,7 +753,7 @@ class Hmc():
             if ssh_key:
                 updlic_cmd += self.OPT['UPDLIC']['-K'] + ssh_key
 
-        self.hmcconn.execute(updlic_cmd)
+        self._executeStreamed(updlic_cmd)
 
     def get_firmware_level(self, system_name):
         lslic_cmd = self.CMD['LSLIC'] +\
@@ -788,16 +809,22 @@ class Hmc():
 
         return lines
 
-    def list_all_lpars_details(self, sys_name, filter=None):
-        lines = []
+    def _lpars_details_command(self, sys_name, filter=None):
         lssyscfgCmd = self.CMD['LSSYSCFG'] +\
             self.OPT['LSSYSCFG']['-R']['LPAR'] +\
             self.OPT['LSSYSCFG']['-M'] + sys_name
         if filter:
             lssyscfgCmd += self.OPT['LSSYSCFG']['-F'] + filter
+        return lssyscfgCmd
 
-        raw_result = self.hmcconn.execute(lssyscfgCmd)
-        raw_result = raw_result.replace("Power Off", "Off")
-        lines = raw_result.split()
+    def _parse_lpars_details(self, raw_result):
+        return raw_result.replace("Power Off", "Off").split()
 
-        return lines
+    def list_all_lpars_details(self, sys_name, filter=None):
+        raw_result = self.hmcconn.execute(self._lpars_details_command(sys_name, filter))
+        return self._parse_lpars_details(raw_result)
+
+    def list_lpars_details_of_systems(self, sys_names, filter=None):
+        # list_all_lpars_details of every managed system, listed over a single SSH round-trip
+        raw_results = self.hmcconn.execute_many([self._lpars_details_command(sys_name, filter) for sys_name in sys_names])
+        return [self._parse_lpars_details(raw_result) for raw_result in raw_results]
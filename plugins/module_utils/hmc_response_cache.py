@@ -0,0 +1,159 @@
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+import copy
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_session_cache import ensure_private_dir
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_session_cache import write_private_file
+
+import logging
+logger = logging.getLogger(__name__)
+
+# Response cache is opt-in, it gets enabled by setting this environment variable to its memory budget in MB
+RESPONSE_CACHE_SIZE_ENV = 'POWER_HMC_RESPONSE_CACHE_SIZE'
+# Pointing this environment variable to a directory enables the cache as well, with the default memory budget
+# unless set, and persists the entries to the directory
+RESPONSE_CACHE_DIR_ENV = 'POWER_HMC_RESPONSE_CACHE_DIR'
+DEFAULT_RESPONSE_CACHE_SIZE_IN_MB = 64
+
+
+class HmcCachedEntry:
+    def __init__(self, etag, body):
+        self.etag = etag
+        self.body = body
+        self.dom = None
+
+
+class HmcResponseCache:
+    """
+    LRU cache of HMC GET responses keyed by HMC, user, URL and Accept header.
+    Entries hold the ETag and the body of the response along with the DOM parsed from it,
+    so that a 304 Not Modified answer to a conditional GET skips both the transfer and the parsing.
+    The cache is bounded by the total size of the cached bodies, entries can also be persisted to cache_dir
+    to be revalidated by later module invocations.
+    """
+    def __init__(self, max_bytes=DEFAULT_RESPONSE_CACHE_SIZE_IN_MB * 1024 * 1024, cache_dir=None):
+        self.max_bytes = max_bytes
+        self.cache_dir = os.path.abspath(os.path.expanduser(cache_dir)) if cache_dir else None
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        digest = hashlib.sha256(json.dumps(list(key)).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.xml")
+
+    def _load(self, key):
+        try:
+            path = self._path(key)
+            if os.stat(path).st_uid != os.getuid():
+                return None
+            with open(path, 'rb') as cache_file:
+                meta = json.loads(cache_file.readline().decode('utf-8'))
+                body = cache_file.read()
+        except (IOError, OSError, ValueError):
+            return None
+        if meta.get('key') != list(key):
+            return None
+        return HmcCachedEntry(meta['etag'], body)
+
+    def _persist(self, key, entry):
+        try:
+            if ensure_private_dir(self.cache_dir):
+                meta = json.dumps({'key': list(key), 'etag': entry.etag}).encode('utf-8')
+                write_private_file(self._path(key), meta + b'\n' + entry.body)
+        except (IOError, OSError) as error:
+            logger.debug("Unable to persist the cached response of %s: %s", key[2], error)
+
+    def _add(self, key, entry):
+        old_entry = self._entries.pop(key, None)
+        if old_entry is not None:
+            self.size -= len(old_entry.body)
+        self._entries[key] = entry
+        self.size += len(entry.body)
+        while self.size > self.max_bytes and self._entries:
+            dummy, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted.body)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries[key] = self._entries.pop(key)
+                return entry
+            if not self.cache_dir:
+                return None
+            entry = self._load(key)
+            if entry is not None and len(entry.body) <= self.max_bytes:
+                self._add(key, entry)
+            return entry
+
+    def put(self, key, etag, body):
+        if len(body) > self.max_bytes:
+            return
+        entry = HmcCachedEntry(etag, body)
+        with self._lock:
+            self._add(key, entry)
+        if self.cache_dir:
+            self._persist(key, entry)
+
+    def dom(self, key, body, parse):
+        """
+        Returns a private copy of the DOM parsed from the cached body of key, callers are free to modify it
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or entry.body is not body:
+            return parse(body)
+        if entry.dom is None:
+            entry.dom = parse(body)
+        return copy.deepcopy(entry.dom)
+
+    def invalidate_url(self, hmc, url):
+        # Drops the cached responses of a resource modified through url, ETag revalidation
+        # would catch the change as well but the stale body does not need to stay in memory
+        resource_url = url.split('?', 1)[0].split('/do/', 1)[0]
+        with self._lock:
+            keys = [key for key in self._entries if key[0] == hmc and key[2].split('?', 1)[0] == resource_url]
+        for key in keys:
+            self.invalidate(key)
+
+    def invalidate(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.size -= len(entry.body)
+        if self.cache_dir:
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def response_cache_from_env():
+    """
+    Returns the response cache shared by all the clients of the process, None when not enabled
+    """
+    global _shared_cache
+    size = os.environ.get(RESPONSE_CACHE_SIZE_ENV)
+    cache_dir = os.environ.get(RESPONSE_CACHE_DIR_ENV)
+    if not size and not cache_dir:
+        return None
+    try:
+        size_in_mb = int(size or DEFAULT_RESPONSE_CACHE_SIZE_IN_MB)
+    except ValueError:
+        logger.debug("Ignoring %s, it is not a number of MB", RESPONSE_CACHE_SIZE_ENV)
+        size_in_mb = DEFAULT_RESPONSE_CACHE_SIZE_IN_MB
+    if size_in_mb <= 0:
+        return None
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = HmcResponseCache(size_in_mb * 1024 * 1024, cache_dir)
+        return _shared_cache
@@ -1,12 +1,33 @@
 from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 import time
+import socket
 import json
-from ansible.module_utils.urls import open_url
+import threading
 import ansible.module_utils.six.moves.urllib.error as urllib_error
+from ansible.module_utils.six.moves.urllib.parse import urlsplit
+try:
+    from concurrent.futures import ThreadPoolExecutor
+except ImportError:
+    ThreadPoolExecutor = None
+from ansible.module_utils.six.moves import intern
 from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_exceptions import HmcError
 from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_exceptions import Error
 from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_exceptions import ParameterError
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_connection_pool import get_connection_pool
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_connection_pool import DEFAULT_POOL_SIZE
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_connection_pool import HmcResponse
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_connection_pool import READ_CHUNK_SIZE
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_connection_pool import release_connection_pools
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_connection_pool import retain_connection_pools
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_session_cache import session_cache_from_env
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_event_listener import event_feed_enabled
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_event_listener import get_event_listener
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_event_listener import stop_event_listener
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_response_cache import response_cache_from_env
+from ansible_collections.ibm.power_hmc.plugins.module_utils import hmc_xpath
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_xpath import compiled_xpath
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_xpath import parse_xml
 import re
 import xml.etree.ElementTree as ET
 NEED_LXML = False
@@ -31,21 +52,233 @@ VIOS_NS = 'VirtualIOServer xmlns:VirtualIOServer="http://www.ibm.com/xmlns/\
 systems/power/firmware/uom/mc/2012_10/" xmlns="http://www.ibm.com/xmlns/systems/power\
 /firmware/uom/mc/2012_10/" xmlns:ns2="http://www.w3.org/XML/1998/namespace/k2"'
 
+ATOM_NS = 'http://www.w3.org/2005/Atom'
+# Mappings of the VIOS feed entries, relative to the namespace stripped entry
+VIOS_FC_MAPPING_PATH = 'content/VirtualIOServer/VirtualFibreChannelMappings/VirtualFibreChannelMapping'
+VIOS_SCSI_MAPPING_PATH = 'content/VirtualIOServer/VirtualSCSIMappings/VirtualSCSIMapping'
+# Physical ports of an SRIOVAdapter, of the converged ethernet, ethernet and RoCE kinds
+SRIOV_PHYSICAL_PORT_PATHS = ('ConvergedEthernetPhysicalPorts/SRIOVConvergedNetworkAdapterPhysicalPort',
+                             'EthernetPhysicalPorts/SRIOVEthernetPhysicalPort',
+                             'SRIOVRoCEPhysicalPorts/SRIOVRoCEPhysicalPort')
+# Members of a Group, the partitions then the managed systems then the VIOS
+GROUP_MEMBER_LINK_PATHS = ('AssociatedLogicalPartitions/link', 'AssociatedManagedSystems/link', 'AssociatedVirtualIOServers/link')
 
-def xml_strip_namespace(xml_str):
-    parser = etree.XMLParser(recover=True, encoding='utf-8')
-    root = etree.fromstring(xml_str, parser)
-    for elem in root.getiterator():
+JOB_POLL_INITIAL_INTERVAL = 0.5
+JOB_POLL_MAX_INTERVAL = 30
+JOB_POLL_BACKOFF_FACTOR = 2
+
+
+def poll_intervals(initial=JOB_POLL_INITIAL_INTERVAL, maximum=JOB_POLL_MAX_INTERVAL, factor=JOB_POLL_BACKOFF_FACTOR):
+    # Endless sequence of sleep intervals growing exponentially from initial up to maximum
+    interval = initial
+    while True:
+        yield interval
+        interval = min(interval * factor, maximum)
+
+
+def _strip_tags(root):
+    for elem in root.iter():
         if not hasattr(elem.tag, 'find'):
             continue
         i = elem.tag.find('}')
         if i >= 0:
             elem.tag = elem.tag[i + 1:]
 
+
+def strip_namespace(root):
+    _strip_tags(root)
     objectify.deannotate(root, cleanup_namespaces=True)
     return root
 
 
+def xml_strip_namespace(xml_str):
+    return strip_namespace(parse_xml(xml_str))
+
+
+def iter_feed_entries(source, chunk_size=READ_CHUNK_SIZE, strip_namespaces=True):
+    """
+    Streams the Atom entries of a feed, source being the feed bytes or an iterable of byte chunks.
+    Entries are yielded one at a time with the namespaces stripped from their tags and get cleared
+    once the caller moves on to the next one, so only a single entry is held in memory at a time.
+    Query yielded entries with relative paths (.//Tag) or through etree.ElementTree(entry).
+    Callers walking the entries themselves can skip the strip pass with strip_namespaces=False.
+    Fed with the chunks of a streamed REST response, the entries are parsed while the feed is still
+    being transferred and the feed is never held in memory as a whole.
+    """
+    if source is None:
+        return
+    chunks = source
+    if isinstance(source, bytes):
+        chunks = (source[i:i + chunk_size] for i in range(0, len(source), chunk_size))
+    parser = etree.XMLPullParser(events=('end',), tag='{{{0}}}entry'.format(ATOM_NS),
+                                 recover=True, remove_comments=True, remove_pis=True)
+
+    def entries():
+        for dummy, entry in parser.read_events():
+            if strip_namespaces:
+                _strip_tags(entry)
+            yield entry
+            entry.clear()
+            # Drop the entries already processed, the feed root keeps a reference to them
+            while entry.getprevious() is not None:
+                del entry.getparent()[0]
+
+    fed = False
+    for chunk in chunks:
+        parser.feed(chunk)
+        fed = True
+        for entry in entries():
+            yield entry
+    if not fed:
+        # Empty feed, such as a streamed response without content
+        return
+    parser.close()
+    for entry in entries():
+        yield entry
+
+
+def flatten_entry(entry, intern_keys=True, fields=None):
+    """
+    Flattens the elements of entry holding text into a single dict of their tag to their text, the other
+    elements are walked through. The walk is iterative and tags are stripped of their namespace, with
+    intern_keys the tags are interned so that the dicts of all the partitions share the same key strings.
+    fields is an optional predicate on the stripped tags, the elements it rejects are left out.
+    """
+    entry_data = {}
+    children = [iter(entry)]
+    while children:
+        for child in children[-1]:
+            text = child.text
+            if text is None or text.strip() == "":
+                children.append(iter(child))
+                break
+            tag = child.tag
+            tag = tag[tag.find("}") + 1:]
+            if fields is not None and not fields(tag):
+                continue
+            entry_data[intern(tag) if intern_keys else tag] = text
+        else:
+            children.pop()
+    return entry_data
+
+
+def _child_text(elem, path):
+    # Text of the element reached from elem through the direct children of path, None when missing
+    child = elem.find(path)
+    return None if child is None else child.text
+
+
+def index_fc_mappings(vios_entries, vios_dict):
+    """
+    Single pass over the VirtualFibreChannelMapping elements of VIOS feed entries, as yielded by
+    iter_feed_entries, reading only the direct children of each mapping. vios_dict maps the VIOS
+    partition IDs to their names. Returns the client adapter details indexed by client partition ID.
+    """
+    vfcs_by_lpar = {}
+    for vios_entry in vios_entries:
+        for vios_fc in vios_entry.iterfind(VIOS_FC_MAPPING_PATH):
+            client_adapter = vios_fc.find('ClientAdapter')
+            if client_adapter is None:
+                continue
+            try:
+                vfc_dict = {'PortName': _child_text(vios_fc, 'ServerAdapter/PhysicalPort/PortName'),
+                            'vios': vios_dict[int(client_adapter.find('ConnectingPartitionID').text)],
+                            'LocationCode': _child_text(vios_fc, 'ServerAdapter/PhysicalPort/LocationCode'),
+                            'WWPNs': _child_text(client_adapter, 'WWPNs'),
+                            'ClientVirtualSlotNumber': _child_text(client_adapter, 'VirtualSlotNumber'),
+                            'ServerVirtualSlotNumber': _child_text(client_adapter, 'ConnectingVirtualSlotNumber')}
+            except (AttributeError, KeyError, TypeError, ValueError):
+                logger.debug("Skipping the incomplete fibre channel mapping of partition %s", _child_text(client_adapter, 'LocalPartitionID'))
+                continue
+            vfcs_by_lpar.setdefault(_child_text(client_adapter, 'LocalPartitionID'), []).append(vfc_dict)
+    return vfcs_by_lpar
+
+
+def index_scsi_mappings(vios_entries, vios_dict):
+    """
+    Single pass over the VirtualSCSIMapping elements of VIOS feed entries, as yielded by
+    iter_feed_entries, reading only the direct children of each mapping. vios_dict maps the VIOS
+    partition IDs to their names. Returns the client adapter details indexed by client partition ID,
+    physical volumes mapped through several VIOS are merged on their volume UDID.
+    """
+    vscsis_by_lpar = {}
+    vscsis_by_udid = {}
+    for vios_entry in vios_entries:
+        for vios_scsi in vios_entry.iterfind(VIOS_SCSI_MAPPING_PATH):
+            # This code is to handle stale adapters
+            client_adapter = vios_scsi.find('ClientAdapter')
+            if client_adapter is None:
+                continue
+            part_id = _child_text(client_adapter, 'LocalPartitionID')
+            try:
+                physical_volume = vios_scsi.find('Storage/PhysicalVolume')
+                # Adds the PVs
+                if physical_volume is not None and physical_volume.find('VolumeUniqueID') is not None:
+                    volumeUniqueID = physical_volume.find('VolumeUniqueID').text
+                    vios_id = int(client_adapter.find('RemoteLogicalPartitionID').text)
+                    vol_dict = {"vios": vios_dict[vios_id], 'name': physical_volume.find('VolumeName').text}
+                    vscsi_dict = vscsis_by_udid.get((part_id, volumeUniqueID))
+                    if vscsi_dict is not None:
+                        vscsi_dict['Volume'].append(vol_dict)
+                        continue
+                    vscsi_dict = {'VolumeUniqueID': volumeUniqueID,
+                                  'Volume': [vol_dict],
+                                  'ClientVirtualSlotNumber': client_adapter.find('VirtualSlotNumber').text,
+                                  'ServerVirtualSlotNumber': client_adapter.find('RemoteSlotNumber').text,
+                                  'TargetDeviceName': vios_scsi.find('TargetDevice/*/TargetName').text,
+                                  'VolumeCapacity': physical_volume.find('VolumeCapacity').text}
+                    vscsis_by_udid[(part_id, volumeUniqueID)] = vscsi_dict
+                # Adds the VOD
+                elif vios_scsi.find('TargetDevice/VirtualOpticalTargetDevice') is not None:
+                    vscsi_dict = {'ClientVirtualSlotNumber': client_adapter.find('VirtualSlotNumber').text,
+                                  'ServerVirtualSlotNumber': client_adapter.find('RemoteSlotNumber').text,
+                                  'TargetName': vios_scsi.find('TargetDevice/VirtualOpticalTargetDevice/TargetName').text}
+                    if vios_scsi.find('Storage') is not None:
+                        vscsi_dict['MediaName'] = vios_scsi.find('Storage/*/MediaName').text
+                        vscsi_dict['MountType'] = vios_scsi.find('Storage/*/MountType').text
+                        vscsi_dict['Size'] = vios_scsi.find('Storage/*/Size').text
+                else:
+                    continue
+            except (AttributeError, KeyError, TypeError, ValueError):
+                logger.debug("Skipping the incomplete SCSI mapping of partition %s", part_id)
+                continue
+            vscsis_by_lpar.setdefault(part_id, []).append(vscsi_dict)
+    return vscsis_by_lpar
+
+
+def check_job_status(doc):
+    """
+    Evaluates the status of a job from its job response document, as parsed by parse_xml.
+    Returns True once the job completed successfully, False while it is still pending
+    and raises HmcError when the job failed.
+    """
+    jobStatus = hmc_xpath.JOB_STATUS(doc)[0]
+    logger.debug("jobStatus: %s", jobStatus)
+
+    if jobStatus == 'COMPLETED_OK':
+        return True
+
+    if jobStatus == 'COMPLETED_WITH_ERROR':
+        resp_msg = hmc_xpath.JOB_PARAMETER(doc, name='result')
+        if resp_msg:
+            logger.debug("debugger: %s", resp_msg[0])
+            raise HmcError(resp_msg[0].strip('\n'))
+        else:
+            err_msg = "Failed: Job completed with error"
+            raise HmcError(err_msg)
+
+    # With short poll intervals the job might not even be picked up by the HMC yet
+    if jobStatus not in ('RUNNING', 'NOT_STARTED'):
+        err_msg_l = hmc_xpath.JOB_ERROR_MESSAGE(doc) or hmc_xpath.JOB_PARAMETER(doc, name='ExceptionText')
+        if not err_msg_l:
+            err_msg = 'Job failed.'
+        else:
+            err_msg = err_msg_l[0]
+        raise HmcError(err_msg)
+
+    return False
+
+
 def parse_error_response(error):
     if isinstance(error, urllib_error.HTTPError):
         xml_str = error.read().decode()
@@ -53,10 +286,9 @@ def parse_error_response(error):
             logger.debug(error.url)
             error_msg = "HTTP Error {0}: {1}".format(error.code, error.reason)
         else:
-            dom = xml_strip_namespace(xml_str)
-            error_msg_l = dom.xpath("//Message")
+            error_msg_l = hmc_xpath.ERROR_MESSAGE(parse_xml(xml_str))
             if error_msg_l:
-                error_msg = error_msg_l[0].text
+                error_msg = error_msg_l[0]
                 if "Failed to unmarshal input payload" in error_msg:
                     error_msg = "Current HMC version might not support some of input settings or invalid input"
             else:
@@ -172,12 +404,12 @@ def add_taggedIO_details(lpar_template_dom):
                 <alternateConsole kxe="false" kb="CUD">NONE</alternateConsole>
             </iBMiPartitionTaggedIO>'''
 
-    ioConfigurationTag = lpar_template_dom.xpath("//ioConfiguration/isUseCapturedPhysicalIOInformationEnabled")[0]
+    ioConfigurationTag = compiled_xpath("//ioConfiguration/isUseCapturedPhysicalIOInformationEnabled")(lpar_template_dom)[0]
     ioConfigurationTag.addnext(etree.XML(taggedIO_payload))
 
 
 def lookup_physical_io(rest_conn, server_dom, drcname):
-    physical_io_list = server_dom.xpath("//AssociatedSystemIOConfiguration/IOSlots/IOSlot")
+    physical_io_list = compiled_xpath("//AssociatedSystemIOConfiguration/IOSlots/IOSlot")(server_dom)
     drcname_occurences = server_dom.xpath("//AssociatedSystemIOConfiguration/IOSlots/"
                                           + "IOSlot/RelatedIOAdapter/IOAdapter/"
                                           + "DynamicReconfigurationConnectorName[contains(text(),'" + drcname + "')]")
@@ -199,7 +431,7 @@ def lookup_physical_io(rest_conn, server_dom, drcname):
 
     for each in physical_io_list:
         each_eletree = etree.ElementTree(each)
-        if drcname == each_eletree.xpath("//RelatedIOAdapter/IOAdapter/DynamicReconfigurationConnectorName")[0].text:
+        if drcname == compiled_xpath("//RelatedIOAdapter/IOAdapter/DynamicReconfigurationConnectorName")(each_eletree)[0].text:
             return each_eletree
 
     return None
@@ -213,8 +445,8 @@ def add_physical_io(rest_conn, server_dom, lpar_template_dom, drcnames):
         if not io_adapter_dom:
             raise Error("Not able to find the matching IO Adapter on the Server")
 
-        drc_index = io_adapter_dom.xpath("//IOAdapter/AdapterID")[0].text
-        location_code = io_adapter_dom.xpath("//IOAdapter/DynamicReconfigurationConnectorName")[0].text
+        drc_index = compiled_xpath("//IOAdapter/AdapterID")(io_adapter_dom)[0].text
+        location_code = compiled_xpath("//IOAdapter/DynamicReconfigurationConnectorName")(io_adapter_dom)[0].text
         logger.debug("Location_code %s", location_code)
 
         profileioslot_payload += '''<ProfileIOSlot schemaVersion="V1_0">
@@ -231,53 +463,243 @@ def add_physical_io(rest_conn, server_dom, lpar_template_dom, drcnames):
                     </Metadata>
                     {0}
                   </profileIOSlots>'''.format(profileioslot_payload)
-    ioConfigurationTag = lpar_template_dom.xpath("//ioConfiguration/Metadata")[0]
+    ioConfigurationTag = compiled_xpath("//ioConfiguration/Metadata")(lpar_template_dom)[0]
     ioConfigurationTag.addnext(etree.XML(profileioslots_payload))
 
 
+def map_bounded(func, items, max_concurrency=DEFAULT_POOL_SIZE):
+    """
+    Calls func on every item, at most max_concurrency calls at a time, and returns the results in the order
+    of items. Requests to many VIOSes or systems then cost about the slowest one instead of their sum.
+    The first exception raised by a call is raised once all the calls completed.
+    """
+    items = list(items)
+    max_workers = min(max_concurrency, len(items))
+    if max_workers > 1 and ThreadPoolExecutor is not None:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(func, items))
+    return [func(item) for item in items]
+
+
 class HmcRestClient:
 
-    def __init__(self, hmc_ip, username, password):
+    def __init__(self, hmc_ip, username, password, pool_size=DEFAULT_POOL_SIZE, session_cache=None,
+                 job_poll_interval=JOB_POLL_INITIAL_INTERVAL, job_poll_max_interval=JOB_POLL_MAX_INTERVAL, event_feed=None,
+                 response_cache=None):
         if NEED_LXML:
             raise Error("Missing prerequisite lxml package. Hint pip install lxml")
         self.hmc_ip = hmc_ip
         self.username = username
         self.password = password
+        # All the requests towards the HMC are sent over a shared pool of keep-alive connections,
+        # pool_size limits the number of connections opened in parallel to the HMC
+        self.pool_size = pool_size
+        # Optional on-disk cache which lets module invocations share one session with the HMC
+        self.session_cache = session_cache if session_cache is not None else session_cache_from_env()
+        self._expired_sessions = set()
+        self._session_lock = threading.Lock()
+        # Job status is polled after job_poll_interval seconds, the interval then grows
+        # exponentially up to job_poll_max_interval seconds
+        self.job_poll_interval = job_poll_interval
+        self.job_poll_max_interval = job_poll_max_interval
+        # When enabled, job completion is detected through the HMC event feed instead of polling alone
+        self.event_feed = event_feed if event_feed is not None else event_feed_enabled()
+        # GET responses carrying an ETag are cached and revalidated with If-None-Match,
+        # an unchanged feed then costs neither the transfer nor the parsing
+        self.response_cache = response_cache if response_cache is not None else response_cache_from_env()
+
+        # The connection pools of the HMC are shared with the other clients, they are closed on the logoff of the last one
+        self._pool_host = urlsplit("https://{0}/".format(self.hmc_ip)).hostname
+        retain_connection_pools(self._pool_host)
+
+        self.session = None
+        try:
+            if self.session_cache:
+                expired_session = self.session_cache.take_expired(self.hmc_ip, self.username)
+                if expired_session:
+                    self._discard_session(expired_session)
+                self.session = self.session_cache.load(self.hmc_ip, self.username)
+            if not self.session:
+                self.session = self.logon()
+                if self.session_cache:
+                    self.session_cache.store(self.hmc_ip, self.username, self.session)
+        except Exception:
+            self._release_connection_pools()
+            raise
+        logger.debug(self.session)
 
+    def _request(self, url, headers=None, method='GET', data=None, timeout=300):
+        if not self.response_cache:
+            return self._send(url, headers, method, data, timeout)
+        if method != 'GET':
+            self.response_cache.invalidate_url(self.hmc_ip, url)
+            return self._send(url, headers, method, data, timeout)
+
+        cache_key = (self.hmc_ip, self.username, url, headers.get('Accept') if headers else None)
+        entry = self.response_cache.get(cache_key)
+        if entry is not None:
+            headers = dict(headers or {})
+            headers['If-None-Match'] = entry.etag
+        resp = self._send(url, headers, method, data, timeout)
+        if resp.code == 304 and entry is not None:
+            logger.debug("Response of %s not modified, using the cached one", url)
+            resp = HmcResponse(url, 200, 'OK', resp.headers, entry.body)
+            resp.cache_key = cache_key
+        elif resp.code == 200 and resp.getheader('ETag'):
+            self.response_cache.put(cache_key, resp.getheader('ETag'), resp.read())
+            resp.cache_key = cache_key
+        return resp
+
+    def _dom(self, resp):
+        # Parses the response, the DOM of a cached response is parsed once and then copied
+        cache_key = getattr(resp, 'cache_key', None)
+        if cache_key is None:
+            return xml_strip_namespace(resp.read())
+        return self.response_cache.dom(cache_key, resp.read(), xml_strip_namespace)
+
+    def _send(self, url, headers=None, method='GET', data=None, timeout=300):
+        pool = get_connection_pool(url, self.pool_size)
+        if headers and headers.get('X-API-Session') in self._expired_sessions:
+            headers = dict(headers)
+            headers['X-API-Session'] = self.session
+        try:
+            return pool.request(method, url, headers=headers, data=data, timeout=timeout)
+        except urllib_error.HTTPError as error:
+            headers, data = self._renew_session(error, url, headers, data)
+            return pool.request(method, url, headers=headers, data=data, timeout=timeout)
+
+    def _stream(self, url, headers=None, timeout=300):
+        """
+        Generator of the decoded chunks of a GET response as they are read off the connection, to be parsed
+        while the feed is transferred with iter_feed_entries. With the response cache enabled the response
+        is read whole instead, the cache needs it to be revalidated later on.
+        """
+        if self.response_cache:
+            resp = self._request(url, headers=headers, timeout=timeout)
+            if resp.code == 200:
+                yield resp.read()
+            return
+        pool = get_connection_pool(url, self.pool_size)
+        if headers and headers.get('X-API-Session') in self._expired_sessions:
+            headers = dict(headers)
+            headers['X-API-Session'] = self.session
+        chunks = pool.stream('GET', url, headers=headers, timeout=timeout)
+        try:
+            try:
+                chunk = next(chunks, None)
+            except urllib_error.HTTPError as error:
+                headers, dummy = self._renew_session(error, url, headers, None)
+                chunks = pool.stream('GET', url, headers=headers, timeout=timeout)
+                chunk = next(chunks, None)
+            while chunk is not None:
+                yield chunk
+                chunk = next(chunks, None)
+        finally:
+            chunks.close()
+
+    def _renew_session(self, error, url, headers, data):
+        # A cached session might have been expired or logged off on the HMC, logon again and
+        # return the headers and the data to replay the request with the new session
+        expired_session = headers.get('X-API-Session') if headers else None
+        if error.code != 401 or not self.session_cache or not expired_session or url.endswith('/rest/api/web/Logon'):
+            raise error
+        logger.debug("Session rejected by HMC %s, logging on again", self.hmc_ip)
+        with self._session_lock:
+            if self.session == expired_session:
+                self._relogon()
+        headers = dict(headers)
+        headers['X-API-Session'] = self.session
+        if isinstance(data, bytes):
+            data = data.replace(expired_session.encode('utf-8'), self.session.encode('utf-8'))
+        elif data is not None:
+            data = data.replace(expired_session, self.session)
+        return headers, data
+
+    def _relogon(self):
+        self.session_cache.invalidate(self.hmc_ip, self.username, self.session)
+        self._expired_sessions.add(self.session)
         self.session = self.logon()
-        logger.debug(self.session)
+        self.session_cache.store(self.hmc_ip, self.username, self.session)
 
     def logon(self):
         header = {'Content-Type': 'application/vnd.ibm.powervm.web+xml; type=LogonRequest'}
 
         url = "https://{0}/rest/api/web/Logon".format(self.hmc_ip)
 
-        resp = open_url(url,
-                        headers=header,
-                        method='PUT',
-                        data=_logonPayload(self.username, self.password),
-                        validate_certs=False,
-                        force_basic_auth=True,
-                        timeout=300)
+        resp = self._request(url,
+                             headers=header,
+                             method='PUT',
+                             data=_logonPayload(self.username, self.password),
+                             timeout=300)
         logger.debug(resp.code)
 
-        response = resp.read()
-        doc = xml_strip_namespace(response)
-        session = doc.xpath('X-API-Session')[0].text
-        return session
+        session = hmc_xpath.SESSION_TOKEN(parse_xml(resp.read()))[0]
+        return str(session)
+
+    def getEvents(self, timeout=120, pool=None):
+        # HMC holds the request until events are queued for the session. Sent straight to the pool,
+        # a session rejected once logged off ends the event feed rather than logging on again
+        url = "https://{0}/rest/api/uom/Event".format(self.hmc_ip)
+        header = {'X-API-Session': self.session,
+                  'Accept': 'application/atom+xml'}
+        pool = pool or get_connection_pool(url, self.pool_size)
+        resp = pool.request('GET', url, headers=header, timeout=timeout)
+        if resp.code == 204:
+            return []
+        events_root = parse_xml(resp.read())
+        return [(str(hmc_xpath.EVENT_TYPE(event)), str(hmc_xpath.EVENT_DATA(event))) for event in hmc_xpath.EVENTS(events_root)]
+
+    def event_listener(self):
+        if not self.event_feed:
+            return None
+        return get_event_listener(self)
+
+    def waitForChange(self, key, timeout, since=None):
+        # Waits for an HMC event about key (job ID, object UUID or type), or sleeps for timeout without event feed
+        listener = self.event_listener()
+        if listener and listener.available:
+            return listener.wait(key, timeout, since)
+        time.sleep(timeout)
+        return False
 
     def logoff(self):
+        stop_event_listener(self)
+        url = "https://{0}/rest/api/web/Logon".format(self.hmc_ip)
+        try:
+            # Leave the session open while it is shared through the session cache, it is logged off
+            # by the first client which finds it expired
+            if self.session_cache and self.session_cache.is_fresh(self.hmc_ip, self.username, self.session):
+                logger.debug("Session is shared through the session cache, skipping logoff")
+                return
+
+            header = {'Content-Type': 'application/vnd.ibm.powervm.web+xml; type=LogonRequest',
+                      'Authorization': 'Basic Og==',
+                      'X-API-Session': self.session}
+
+            self._request(url,
+                          headers=header,
+                          method='DELETE',
+                          timeout=300)
+        finally:
+            self._release_connection_pools()
+
+    def _release_connection_pools(self):
+        # Done with the HMC, once no other client uses them its keep-alive connections get closed and the bandwidth saved is logged
+        if self._pool_host is not None:
+            release_connection_pools(self._pool_host)
+            self._pool_host = None
+
+    def _discard_session(self, session):
+        # Best effort logoff of a session which expired in the session cache, sent straight
+        # to the pool as a rejected session must not trigger a new logon
         header = {'Content-Type': 'application/vnd.ibm.powervm.web+xml; type=LogonRequest',
                   'Authorization': 'Basic Og==',
-                  'X-API-Session': self.session}
+                  'X-API-Session': session}
         url = "https://{0}/rest/api/web/Logon".format(self.hmc_ip)
-
-        open_url(url,
-                 headers=header,
-                 method='DELETE',
-                 validate_certs=False,
-                 force_basic_auth=True,
-                 timeout=300)
+        try:
+            get_connection_pool(url, self.pool_size).request('DELETE', url, headers=header, timeout=60)
+        except (urllib_error.URLError, socket.error) as error:
+            logger.debug("Logoff of the expired session from %s failed: %s", self.hmc_ip, error)
 
     def fetchJobStatus(self, jobId, template=False, timeout_in_min=30):
 
@@ -289,51 +711,31 @@ class HmcRestClient:
         header = {'X-API-Session': self.session, 'Accept': "application/atom+xml"}
         result = None
 
-        jobStatus = ''
-        timeout_counter = 0
-        while True:
-            time.sleep(30)
-            timeout_counter += 1
-            resp = open_url(url,
-                            headers=header,
-                            method='GET',
-                            validate_certs=False,
-                            force_basic_auth=True,
-                            timeout=300).read()
-            doc = xml_strip_namespace(resp)
-
-            jobStatus = doc.xpath('//Status')[0].text
-            logger.debug("jobStatus: %s", jobStatus)
-
-            if jobStatus == 'COMPLETED_OK':
+        deadline = time.time() + timeout_in_min * 60
+        listener = self.event_listener()
+        last_poll = None
+        for interval in poll_intervals(self.job_poll_interval, self.job_poll_max_interval):
+            if listener and listener.available and last_poll is not None:
+                # Job status changes get reported on the event feed, poll again as soon as one arrives
+                # and otherwise only every job_poll_max_interval seconds as a safety net
+                listener.wait(jobId, self.job_poll_max_interval, since=last_poll)
+            else:
+                time.sleep(interval)
+            last_poll = time.time()
+            resp = self._request(url,
+                                 headers=header,
+                                 method='GET',
+                                 timeout=300).read()
+            doc = parse_xml(resp)
+            if check_job_status(doc):
                 logger.debug(resp)
-                result = doc
+                # Callers query the result parameters of the job by their plain names
+                result = strip_namespace(doc)
                 break
 
-            if jobStatus == 'COMPLETED_WITH_ERROR':
-                logger.debug("jobStatus: %s", jobStatus)
-                resp_msg = None
-                resp_msg = doc.xpath("//ParameterName[text()='result']/following-sibling::ParameterValue")
-                if resp_msg:
-                    logger.debug("debugger: %s", resp_msg[0].text)
-                    raise HmcError(resp_msg[0].text.strip('\n'))
-                else:
-                    err_msg = "Failed: Job completed with error"
-                    raise HmcError(err_msg)
-
-            if jobStatus != 'RUNNING':
-                logger.debug("jobStatus: %s", jobStatus)
-                err_msg_l = doc.xpath("//ResponseException//Message")
-                err_msg_l = doc.xpath("//ParameterName[text()='ExceptionText']/following-sibling::ParameterValue") if not err_msg_l else err_msg_l
-                if not err_msg_l:
-                    err_msg = 'Job failed.'
-                else:
-                    err_msg = err_msg_l[0].text
-                raise HmcError(err_msg)
-
-            if timeout_counter == timeout_in_min * 2:
-                job_name = doc.xpath("//OperationName")[0].text.strip()
-                logger.debug("%s job stuck in %s state. Timed out!!", job_name, jobStatus)
+            if time.time() >= deadline:
+                job_name = hmc_xpath.JOB_OPERATION_NAME(doc)[0].strip()
+                logger.debug("%s job stuck in %s state. Timed out!!", job_name, hmc_xpath.JOB_STATUS(doc)[0])
                 raise HmcError("Job: {0} timed out!!".format(job_name))
 
         return result
@@ -342,48 +744,42 @@ class HmcRestClient:
         url = "https://{0}/rest/api/uom/ManagedSystem/search/(SystemName=='{1}')".format(self.hmc_ip, system_name)
         header = {'X-API-Session': self.session,
                   'Accept': 'application/vnd.ibm.powervm.uom+xml; type=ManagedSystem'}
-        response = open_url(url,
-                            headers=header,
-                            method='GET',
-                            validate_certs=False,
-                            force_basic_auth=True,
-                            timeout=300)
+        response = self._request(url,
+                                 headers=header,
+                                 method='GET',
+                                 timeout=300)
         if response.code == 204:
             return None, None
 
-        managedsystem_root = xml_strip_namespace(response.read())
+        managedsystem_root = self._dom(response)
 
-        uuid = managedsystem_root.xpath("//AtomID")[0].text
-        return uuid, managedsystem_root.xpath("//ManagedSystem")[0]
+        uuid = compiled_xpath("//AtomID")(managedsystem_root)[0].text
+        return uuid, compiled_xpath("//ManagedSystem")(managedsystem_root)[0]
 
     def getManagedSystems(self):
         url = "https://{0}/rest/api/uom/ManagedSystem".format(self.hmc_ip)
         header = {'X-API-Session': self.session,
                   'Accept': 'application/vnd.ibm.powervm.uom+xml; type=ManagedSystem'}
 
-        response = open_url(url,
-                            headers=header,
-                            method='GET',
-                            validate_certs=False,
-                            force_basic_auth=True,
-                            timeout=3600)
+        response = self._request(url,
+                                 headers=header,
+                                 method='GET',
+                                 timeout=3600)
 
         if response.code == 204:
             return None, None
 
-        managedsystems_root = xml_strip_namespace(response.read())
+        managedsystems_root = self._dom(response)
         return managedsystems_root
 
     def getManagedSystemsQuick(self):
         url = "https://{0}/rest/api/uom/ManagedSystem/quick/All".format(self.hmc_ip)
         header = {'X-API-Session': self.session,
                   'Accept': '*/*'}
-        resp = open_url(url,
-                        headers=header,
-                        method='GET',
-                        validate_certs=False,
-                        force_basic_auth=True,
-                        timeout=300)
+        resp = self._request(url,
+                             headers=header,
+                             method='GET',
+                             timeout=300)
         if resp.code != 200:
             logger.debug("Get of Managed Systems failed. Respsonse code: %d", resp.code)
             return None
@@ -394,19 +790,17 @@ class HmcRestClient:
         url = "https://{0}/rest/api/uom/ManagedSystem/{1}/quick".format(self.hmc_ip, system_uuid)
         header = {'X-API-Session': self.session,
                   'Accept': '*/*'}
-        resp = open_url(url,
-                        headers=header,
-                        method='GET',
-                        validate_certs=False,
-                        force_basic_auth=True,
-                        timeout=300)
+        resp = self._request(url,
+                             headers=header,
+                             method='GET',
+                             timeout=300)
         if resp.code != 200:
             logger.debug("Get of Logical Partition failed. Respsonse code: %d", resp.code)
             return None
         response = resp.read()
         return response
 
-    def getLogicalPartition(self, system_uuid, partition_name=None, partition_uuid=None):
+    def getLogicalPartition(self, system_uuid, partition_name=None, partition_uuid=None, group=None):
         lpar_uuid = None
         if partition_uuid is None:
             lpar_quick_list = []
@@ -426,36 +820,36 @@ class HmcRestClient:
             lpar_uuid = partition_uuid
 
         url = "https://{0}/rest/api/uom/LogicalPartition/{1}".format(self.hmc_ip, lpar_uuid)
+        if group:
+            url = "{0}?group={1}".format(url, group)
         header = {'X-API-Session': self.session,
                   'Accept': 'application/vnd.ibm.powervm.uom+xml; type=LogicalPartition'}
 
-        resp = open_url(url,
-                        headers=header,
-                        method='GET',
-                        validate_certs=False,
-                        force_basic_auth=True,
-                        timeout=300)
+        resp = self._request(url,
+                             headers=header,
+                             method='GET',
+                             timeout=300)
         if resp.code != 200:
             logger.debug("Get of Logical Partition failed. Respsonse code: %d", resp.code)
             return None, None
 
-        response = resp.read()
-        partition_dom = xml_strip_namespace(response)
+        partition_dom = self._dom(resp)
         if partition_dom:
             return lpar_uuid, partition_dom
 
         return None, None
 
-    def getLogicalPartitions(self, system_uuid):
+    def getLogicalPartitions(self, system_uuid, stream=False):
+        # With stream the feed is returned as the chunks read off the connection, see iter_feed_entries
         url = "https://{0}/rest/api/uom/ManagedSystem/{1}/LogicalPartition?group=Advanced".format(self.hmc_ip, system_uuid)
         header = {'X-API-Session': self.session,
                   'Accept': 'application/vnd.ibm.powervm.uom+xml; type=LogicalPartition'}
-        resp = open_url(url,
-                        headers=header,
-                        method='GET',
-                        validate_certs=False,
-                        force_basic_auth=True,
-                        timeout=3600)
+        if stream:
+            return self._stream(url, headers=header, timeout=3600)
+        resp = self._request(url,
+                             headers=header,
+                             method='GET',
+                             timeout=3600)
         if resp.code != 200:
             logger.debug("Get of Logical Partitions failed. Respsonse code: %d", resp.code)
             return None
@@ -466,12 +860,10 @@ class HmcRestClient:
         url = "https://{0}/rest/api/uom/ManagedSystem/{1}/LogicalPartition/quick/All".format(self.hmc_ip, system_uuid)
         header = {'X-API-Session': self.session,
                   'Accept': '*/*'}
-        resp = open_url(url,
-                        headers=header,
-                        method='GET',
-                        validate_certs=False,
-                        force_basic_auth=True,
-                        timeout=300)
+        resp = self._request(url,
+                             headers=header,
+                             method='GET',
+                             timeout=300)
         if resp.code != 200:
             logger.debug("Get of Logical Partitions failed. Respsonse code: %d", resp.code)
             return None
@@ -482,12 +874,10 @@ class HmcRestClient:
         url = "https://{0}/rest/api/uom/LogicalPartition/{1}/quick".format(self.hmc_ip, partition_uuid)
         header = {'X-API-Session': self.session,
                   'Accept': '*/*'}
-        resp = open_url(url,
-                        headers=header,
-                        method='GET',
-                        validate_certs=False,
-                        force_basic_auth=True,
-                        timeout=300)
+        resp = self._request(url,
+                             headers=header,
+                             method='GET',
+                             timeout=300)
         if resp.code != 200:
             logger.debug("Get of Logical Partition failed. Respsonse code: %d", resp.code)
             return None
@@ -498,12 +888,10 @@ class HmcRestClient:
         url = "https://{0}/rest/api/pcm/ManagedSystem/{1}/preferences".format(self.hmc_ip, system_uuid)
         header = {'X-API-Session': self.session,
                   'Content-Type': 'application/xml'}
-        resp = open_url(url,
-                        headers=header,
-                        method='GET',
-                        validate_certs=False,
-                        force_basic_auth=True,
-                        timeout=3600)
+        resp = self._request(url,
+                             headers=header,
+                             method='GET',
+                             timeout=3600)
         if resp.code != 200:
             logger.debug("Get of preferences failed. Respsonse code: %d", resp.code)
             return None
@@ -514,12 +902,10 @@ class HmcRestClient:
         url = "https://{0}/rest/api/pcm/ManagedSystem/{1}/preferences".format(self.hmc_ip, system_uuid)
         header = {'X-API-Session': self.session,
                   'Content-Type': 'application/xml'}
-        resp = open_url(url,
-                        headers=header,
-                        method='GET',
-                        validate_certs=False,
-                        force_basic_auth=True,
-                        timeout=3600)
+        resp = self._request(url,
+                             headers=header,
+                             method='GET',
+                             timeout=3600)
         if resp.code != 200:
             logger.debug("Get of preferences failed. Respsonse code: %d", resp.code)
             return None
@@ -538,11 +924,11 @@ class HmcRestClient:
         existing_enabled = []
         existing_disabled = []
         flag = False
-        path = doc.xpath("//ManagedSystemPcmPreference")[0]
+        path = compiled_xpath("//ManagedSystemPcmPreference")(doc)[0]
         for item in preference_map:
-            if path.xpath(preference_map[item])[0].text == "true":
+            if compiled_xpath(preference_map[item])(path)[0].text == "true":
                 existing_enabled.append(item)
-            elif path.xpath(preference_map[item])[0].text == "false":
+            elif compiled_xpath(preference_map[item])(path)[0].text == "false":
                 existing_disabled.append(item)
         if disable == 'true':
             # LTM and CM is dependent on AM"
@@ -552,7 +938,7 @@ class HmcRestClient:
             if (set(existing_disabled) != set(preference) and (set(preference).issubset(set(existing_disabled)) is False)):
                 flag = True
                 for item in preference:
-                    path.xpath(preference_map[item])[0].text = "false"
+                    compiled_xpath(preference_map[item])(path)[0].text = "false"
         else:
             if "AM" in metrics and ("LTM" not in metrics or "EM" not in metrics):
                 metrics.append("LTM")
@@ -561,7 +947,7 @@ class HmcRestClient:
             if (set(existing_enabled) != set(preference) and (set(preference).issubset(set(existing_enabled)) is False)):
                 flag = True
                 for item in preference:
-                    path.xpath(preference_map[item])[0].text = "true"
+                    compiled_xpath(preference_map[item])(path)[0].text = "true"
         if flag is True:
             payload_content = etree.tostring(path)
             payload_content = payload_content.decode("utf-8").replace("ManagedSystemPcmPreference", PCM_TEMPLATE_NS, 1)
@@ -569,13 +955,11 @@ class HmcRestClient:
             payload_content = etree.fromstring(payload_content)
             payload_content = etree.tostring(payload_content, encoding='unicode')
             logger.debug(payload_content)
-            resp = open_url(url,
-                            headers=header,
-                            method='POST',
-                            data=payload_content,
-                            validate_certs=False,
-                            force_basic_auth=True,
-                            timeout=3600)
+            resp = self._request(url,
+                                 headers=header,
+                                 method='POST',
+                                 data=payload_content,
+                                 timeout=3600)
             if resp.code != 200:
                 logger.debug("Get of preferences failed. Respsonse code: %d", resp.code)
                 return None
@@ -583,23 +967,24 @@ class HmcRestClient:
                 # response = resp.read()
                 output = dict()
                 for item in preference_map:
-                    if (path.xpath(preference_map[item])[0].text == "true"):
+                    if (compiled_xpath(preference_map[item])(path)[0].text == "true"):
                         value = "Enabled"
                     else:
                         value = "Disabled"
                     output[preference_map[item]] = value
                 return output
 
-    def getVirtualIOServers(self, system_uuid, group='Advanced'):
+    def getVirtualIOServers(self, system_uuid, group='Advanced', stream=False):
+        # With stream the feed is returned as the chunks read off the connection, see iter_feed_entries
         url = "https://{0}/rest/api/uom/ManagedSystem/{1}/VirtualIOServer?group={2}".format(self.hmc_ip, system_uuid, group)
         header = {'X-API-Session': self.session,
                   'Accept': 'application/vnd.ibm.powervm.uom+xml; type=VirtualIOServer'}
-        resp = open_url(url,
-                        headers=header,
-                        method='GET',
-                        validate_certs=False,
-                        force_basic_auth=True,
-                        timeout=3600)
+        if stream:
+            return self._stream(url, headers=header, timeout=3600)
+        resp = self._request(url,
+                             headers=header,
+                             method='GET',
+                             timeout=3600)
         if resp.code != 200:
             logger.debug("Get of Virtual IO Servers failed. Respsonse code: %d", resp.code)
             return None
@@ -610,12 +995,10 @@ class HmcRestClient:
         url = "https://{0}/rest/api/uom/ManagedSystem/{1}/VirtualIOServer/quick/All".format(self.hmc_ip, system_uuid)
         header = {'X-API-Session': self.session,
                   'Accept': '*/*'}
-        resp = open_url(url,
-                        headers=header,
-                        method='GET',
-                        validate_certs=False,
-                        force_basic_auth=True,
-                        timeout=300)
+        resp = self._request(url,
+                             headers=header,
+                             method='GET',
+                             timeout=300)
         if resp.code != 200:
             logger.debug("Get of Virtual IO Servers failed. Respsonse code: %d", resp.code)
             return None
@@ -631,17 +1014,15 @@ class HmcRestClient:
         else:
             url = "https://{0}/rest/api/uom/VirtualIOServer/{1}".format(self.hmc_ip, vios_uuid)
 
-        resp = open_url(url,
-                        headers=header,
-                        method='GET',
-                        validate_certs=False,
-                        force_basic_auth=True,
-                        timeout=3600)
+        resp = self._request(url,
+                             headers=header,
+                             method='GET',
+                             timeout=3600)
 
         if resp.code != 200:
             logger.debug("Get of Virtual IO Server failed. Respsonse code: %d", resp.code)
             return None
-        response = xml_strip_namespace(resp.read())
+        response = self._dom(resp)
         return response
 
     def deleteLogicalPartition(self, partition_uuid):
@@ -649,21 +1030,19 @@ class HmcRestClient:
         header = {'X-API-Session': self.session,
                   'Accept': 'application/vnd.ibm.powervm.uom+xml; type=LogicalPartition'}
 
-        open_url(url,
-                 headers=header,
-                 method='DELETE',
-                 validate_certs=False,
-                 force_basic_auth=True,
-                 timeout=300)
+        self._request(url,
+                      headers=header,
+                      method='DELETE',
+                      timeout=300)
 
     def updateLparNameAndIDToDom(self, template_xml, config_dict):
         if 'lpar_id' in config_dict:
-            template_xml.xpath("//partitionId")[0].text = config_dict['lpar_id']
+            compiled_xpath("//partitionId")(template_xml)[0].text = config_dict['lpar_id']
         else:
-            lpar_id_tag = template_xml.xpath("//partitionId")[0]
+            lpar_id_tag = compiled_xpath("//partitionId")(template_xml)[0]
             lpar_id_tag.getparent().remove(lpar_id_tag)
-        template_xml.xpath("//currMaxVirtualIOSlots")[0].text = config_dict['max_virtual_slots']
-        template_xml.xpath("//partitionName")[0].text = config_dict['vm_name']
+        compiled_xpath("//currMaxVirtualIOSlots")(template_xml)[0].text = config_dict['max_virtual_slots']
+        compiled_xpath("//partitionName")(template_xml)[0].text = config_dict['vm_name']
 
     def updateProcMemSettingsToDom(self, template_xml, config_dict):
         shared_config_tag = None
@@ -686,28 +1065,28 @@ class HmcRestClient:
                                                           config_dict['min_proc'], config_dict['proc'],
                                                           config_dict['max_proc'], config_dict['shared_proc_pool'])
 
-            shared_config_tag = template_xml.xpath("//sharedProcessorConfiguration")[0]
+            shared_config_tag = compiled_xpath("//sharedProcessorConfiguration")(template_xml)[0]
             if shared_config_tag:
                 shared_config_tag.getparent().remove(shared_config_tag)
-            sharingMode_tag = template_xml.xpath("//sharingMode")[0]
+            sharingMode_tag = compiled_xpath("//sharingMode")(template_xml)[0]
             sharingMode_tag.addnext(etree.XML(shared_payload))
 
-            dedi_tag = template_xml.xpath("//dedicatedProcessorConfiguration")[0]
+            dedi_tag = compiled_xpath("//dedicatedProcessorConfiguration")(template_xml)[0]
             if dedi_tag:
                 dedi_tag.getparent().remove(dedi_tag)
 
-            template_xml.xpath("//currHasDedicatedProcessors")[0].text = 'false'
-            template_xml.xpath("//currSharingMode")[0].text = config_dict['proc_mode']
+            compiled_xpath("//currHasDedicatedProcessors")(template_xml)[0].text = 'false'
+            compiled_xpath("//currSharingMode")(template_xml)[0].text = config_dict['proc_mode']
         else:
-            template_xml.xpath("//minProcessors")[0].text = config_dict['min_proc']
-            template_xml.xpath("//desiredProcessors")[0].text = config_dict['proc']
-            template_xml.xpath("//maxProcessors")[0].text = config_dict['max_proc']
+            compiled_xpath("//minProcessors")(template_xml)[0].text = config_dict['min_proc']
+            compiled_xpath("//desiredProcessors")(template_xml)[0].text = config_dict['proc']
+            compiled_xpath("//maxProcessors")(template_xml)[0].text = config_dict['max_proc']
 
-        template_xml.xpath("//currMinMemory")[0].text = config_dict['min_mem']
-        template_xml.xpath("//currMemory")[0].text = config_dict['mem']
-        template_xml.xpath("//currMaxMemory")[0].text = config_dict['max_mem']
+        compiled_xpath("//currMinMemory")(template_xml)[0].text = config_dict['min_mem']
+        compiled_xpath("//currMemory")(template_xml)[0].text = config_dict['mem']
+        compiled_xpath("//currMaxMemory")(template_xml)[0].text = config_dict['max_mem']
         if config_dict['proc_comp_mode']:
-            template_xml.xpath("//currProcessorCompatibilityMode")[0].text = config_dict['proc_comp_mode']
+            compiled_xpath("//currProcessorCompatibilityMode")(template_xml)[0].text = config_dict['proc_comp_mode']
 
     def updatePartitionTemplate(self, uuid, template_xml):
         templateUrl = "https://{0}/rest/api/templates/PartitionTemplate/{1}".format(self.hmc_ip, uuid)
@@ -718,24 +1097,20 @@ class HmcRestClient:
         partiton_template_xmlstr = partiton_template_xmlstr.decode("utf-8").replace("PartitionTemplate", LPAR_TEMPLATE_NS, 1)
         logger.debug(partiton_template_xmlstr)
 
-        resp = open_url(templateUrl,
-                        headers=header,
-                        data=partiton_template_xmlstr,
-                        method='POST',
-                        validate_certs=False,
-                        force_basic_auth=True,
-                        timeout=300).read()
+        resp = self._request(templateUrl,
+                             headers=header,
+                             data=partiton_template_xmlstr,
+                             method='POST',
+                             timeout=300).read()
         logger.debug(resp.decode("utf-8"))
 
     def quickGetPartition(self, lpar_uuid):
         header = {'X-API-Session': self.session}
         url = "https://{0}/rest/api/uom/LogicalPartition/{1}/quick".format(self.hmc_ip, lpar_uuid)
-        resp = open_url(url,
-                        headers=header,
-                        method='GET',
-                        validate_certs=False,
-                        force_basic_auth=True,
-                        timeout=300)
+        resp = self._request(url,
+                             headers=header,
+                             method='GET',
+                             timeout=300)
 
         lpar_quick_dom = resp.read()
         lpar_dict = json.loads(lpar_quick_dom)
@@ -745,20 +1120,15 @@ class HmcRestClient:
         header = {'X-API-Session': self.session}
         url = "https://{0}/rest/api/templates/PartitionTemplate?draft=false&detail=table".format(self.hmc_ip)
 
-        resp = open_url(url,
-                        headers=header,
-                        method='GET',
-                        validate_certs=False,
-                        force_basic_auth=True,
-                        timeout=300)
-        if resp.code == 200:
-            response = resp.read()
-        else:
+        resp = self._request(url,
+                             headers=header,
+                             method='GET',
+                             timeout=300)
+        if resp.code != 200:
             return None
 
-        root = xml_strip_namespace(response)
-        element = root.xpath("//partitionTemplateName[text()='{0}']/preceding-sibling::Metadata//AtomID".format(name))
-        uuid = element[0].text if element else None
+        element = hmc_xpath.TEMPLATE_UUID_BY_NAME(parse_xml(resp.read()), name=name)
+        uuid = str(element[0]) if element else None
         return uuid
 
     def getPartitionTemplate(self, uuid=None, name=None):
@@ -773,19 +1143,15 @@ class HmcRestClient:
 
         templateUrl = "https://{0}/rest/api/templates/PartitionTemplate/{1}".format(self.hmc_ip, uuid)
         logger.debug(templateUrl)
-        resp = open_url(templateUrl,
-                        headers=header,
-                        method='GET',
-                        validate_certs=False,
-                        force_basic_auth=True,
-                        timeout=300)
-        if resp.code == 200:
-            response = resp.read()
-        else:
+        resp = self._request(templateUrl,
+                             headers=header,
+                             method='GET',
+                             timeout=300)
+        if resp.code != 200:
             return None
 
-        partiton_template_root = xml_strip_namespace(response)
-        return partiton_template_root.xpath("//PartitionTemplate")[0]
+        partiton_template_root = self._dom(resp)
+        return compiled_xpath("//PartitionTemplate")(partiton_template_root)[0]
 
     def copyPartitionTemplate(self, from_name, to_name):
         header = {'X-API-Session': self.session,
@@ -794,24 +1160,22 @@ class HmcRestClient:
         partiton_template_doc = self.getPartitionTemplate(name=from_name)
         if not partiton_template_doc:
             raise HmcError("Not able to fetch the template")
-        partiton_template_doc.xpath("//partitionTemplateName")[0].text = to_name
+        compiled_xpath("//partitionTemplateName")(partiton_template_doc)[0].text = to_name
         templateNamespace = 'PartitionTemplate xmlns="http://www.ibm.com/xmlns/systems/power/firmware/templates/mc/2012_10/" \
                              xmlns:ns2="http://www.w3.org/XML/1998/namespace/k2"'
         partiton_template_xmlstr = etree.tostring(partiton_template_doc)
         partiton_template_xmlstr = partiton_template_xmlstr.decode("utf-8").replace("PartitionTemplate", templateNamespace, 1)
 
         templateUrl = "https://{0}/rest/api/templates/PartitionTemplate".format(self.hmc_ip)
-        resp = open_url(templateUrl,
-                        headers=header,
-                        data=partiton_template_xmlstr,
-                        method='PUT',
-                        validate_certs=False,
-                        force_basic_auth=True,
-                        timeout=300)
+        resp = self._request(templateUrl,
+                             headers=header,
+                             data=partiton_template_xmlstr,
+                             method='PUT',
+                             timeout=300)
         # This is to handle the case of unauthorized access, instead of getting error http code seems to be 200
         response = resp.read()
         response_dom = xml_strip_namespace(response)
-        error_msg_l = response_dom.xpath("//Message")
+        error_msg_l = compiled_xpath("//Message")(response_dom)
         if error_msg_l:
             error_msg = error_msg_l[0].text
             raise HmcError(error_msg)
@@ -824,16 +1188,14 @@ class HmcRestClient:
         partiton_template_doc = self.getPartitionTemplate(name=template_name)
         if not partiton_template_doc:
             raise HmcError("Not able to fetch the partition template")
-        template_uuid = partiton_template_doc.xpath("//AtomID")[0].text
+        template_uuid = compiled_xpath("//AtomID")(partiton_template_doc)[0].text
 
         templateUrl = "https://{0}/rest/api/templates/PartitionTemplate/{1}".format(self.hmc_ip, template_uuid)
         logger.debug(templateUrl)
-        open_url(templateUrl,
-                 headers=header,
-                 method='DELETE',
-                 validate_certs=False,
-                 force_basic_auth=True,
-                 timeout=300)
+        self._request(templateUrl,
+                      headers=header,
+                      method='DELETE',
+                      timeout=300)
 
     def checkPartitionTemplate(self, template_name, cec_uuid):
         header = _jobHeader(self.session)
@@ -841,7 +1203,7 @@ class HmcRestClient:
         partiton_template_doc = self.getPartitionTemplate(name=template_name)
         if not partiton_template_doc:
             raise HmcError("Not able to fetch the partition template")
-        template_uuid = partiton_template_doc.xpath("//AtomID")[0].text
+        template_uuid = compiled_xpath("//AtomID")(partiton_template_doc)[0].text
         check_url = "https://{0}/rest/api/templates/PartitionTemplate/{1}/do/check".format(self.hmc_ip, template_uuid)
 
         reqdOperation = {'OperationName': 'Check',
@@ -852,17 +1214,13 @@ class HmcRestClient:
                      'TargetUuid': cec_uuid}
 
         payload = _job_RequestPayload(reqdOperation, jobParams)
-        resp = open_url(check_url,
-                        headers=header,
-                        data=payload,
-                        method='PUT',
-                        validate_certs=False,
-                        force_basic_auth=True,
-                        timeout=300).read()
-
-        checkjob_resp = xml_strip_namespace(resp)
+        resp = self._request(check_url,
+                             headers=header,
+                             data=payload,
+                             method='PUT',
+                             timeout=300).read()
 
-        jobID = checkjob_resp.xpath('//JobID')[0].text
+        jobID = str(hmc_xpath.JOB_ID(parse_xml(resp))[0])
 
         return self.fetchJobStatus(jobID, template=True)
 
@@ -880,16 +1238,13 @@ class HmcRestClient:
                      'TargetUuid': cec_uuid}
 
         payload = _job_RequestPayload(reqdOperation, jobParams)
-        resp = open_url(url,
-                        headers=header,
-                        data=payload,
-                        method='PUT',
-                        validate_certs=False,
-                        force_basic_auth=True,
-                        timeout=300).read()
-
-        deploy_resp = xml_strip_namespace(resp)
-        jobID = deploy_resp.xpath('//JobID')[0].text
+        resp = self._request(url,
+                             headers=header,
+                             data=payload,
+                             method='PUT',
+                             timeout=300).read()
+
+        jobID = str(hmc_xpath.JOB_ID(parse_xml(resp))[0])
         return self.fetchJobStatus(jobID, template=True)
 
     def transformPartitionTemplate(self, draft_uuid, cec_uuid):
@@ -906,16 +1261,13 @@ class HmcRestClient:
 
         payload = _job_RequestPayload(reqdOperation, jobParams)
 
-        resp = open_url(url,
-                        headers=header,
-                        data=payload,
-                        method='PUT',
-                        validate_certs=False,
-                        force_basic_auth=True,
-                        timeout=300).read()
+        resp = self._request(url,
+                             headers=header,
+                             data=payload,
+                             method='PUT',
+                             timeout=300).read()
 
-        transform_resp = xml_strip_namespace(resp)
-        jobID = transform_resp.xpath('//JobID')[0].text
+        jobID = str(hmc_xpath.JOB_ID(parse_xml(resp))[0])
         return self.fetchJobStatus(jobID, template=True)
 
     def poweroffPartition(self, vm_uuid, restart, shutdown_option):
@@ -955,16 +1307,13 @@ class HmcRestClient:
 
         payload = _job_RequestPayload(reqdOperation, jobParams)
 
-        resp = open_url(url,
-                        headers=header,
-                        data=payload,
-                        method='PUT',
-                        validate_certs=False,
-                        force_basic_auth=True,
-                        timeout=300).read()
+        resp = self._request(url,
+                             headers=header,
+                             data=payload,
+                             method='PUT',
+                             timeout=300).read()
 
-        shutdown_resp = xml_strip_namespace(resp)
-        jobID = shutdown_resp.xpath('//JobID')[0].text
+        jobID = str(hmc_xpath.JOB_ID(parse_xml(resp))[0])
         return self.fetchJobStatus(jobID, timeout_in_min=10)
 
     def poweronPartition(self, vm_uuid, prof_uuid, keylock, iIPLsource, os_type):
@@ -992,16 +1341,13 @@ class HmcRestClient:
 
         payload = _job_RequestPayload(reqdOperation, jobParams)
 
-        resp = open_url(url,
-                        headers=header,
-                        data=payload,
-                        method='PUT',
-                        validate_certs=False,
-                        force_basic_auth=True,
-                        timeout=300).read()
+        resp = self._request(url,
+                             headers=header,
+                             data=payload,
+                             method='PUT',
+                             timeout=300).read()
 
-        activate_resp = xml_strip_namespace(resp)
-        jobID = activate_resp.xpath('//JobID')[0].text
+        jobID = str(hmc_xpath.JOB_ID(parse_xml(resp))[0])
         return self.fetchJobStatus(jobID, timeout_in_min=10)
 
     def getPartitionProfiles(self, vm_uuid):
@@ -1009,18 +1355,16 @@ class HmcRestClient:
         header = {'X-API-Session': self.session,
                   'Accept': 'application/vnd.ibm.powervm.uom+xml; type=LogicalPartitionProfile'}
 
-        response = open_url(url,
-                            headers=header,
-                            method='GET',
-                            validate_certs=False,
-                            force_basic_auth=True,
-                            timeout=300)
+        response = self._request(url,
+                                 headers=header,
+                                 method='GET',
+                                 timeout=300)
 
         if response.code == 204:
             return None
 
-        lparProfiles_root = xml_strip_namespace(response.read())
-        lparProfiles = lparProfiles_root.xpath('//LogicalPartitionProfile')
+        lparProfiles_root = self._dom(response)
+        lparProfiles = compiled_xpath('//LogicalPartitionProfile')(lparProfiles_root)
         return lparProfiles
 
     def add_vscsi_payload(self, pv_tup):
@@ -1071,7 +1415,7 @@ class HmcRestClient:
         </Metadata>
         {0}
         </virtualSCSIClientAdapters>'''.format(vscsi_clients)
-        suspendEnableTag = lpar_template_dom.xpath("//suspendEnable")[0]
+        suspendEnableTag = compiled_xpath("//suspendEnable")(lpar_template_dom)[0]
         suspendEnableTag.addprevious(etree.XML(vscsi_client_payload))
 
     def getFreePhyVolume(self, vios_uuid):
@@ -1086,36 +1430,31 @@ class HmcRestClient:
 
         payload = _job_RequestPayload(reqdOperation, jobParams, "V1_3_0")
 
-        resp = open_url(url,
-                        headers=header,
-                        data=payload,
-                        method='PUT',
-                        validate_certs=False,
-                        force_basic_auth=True,
-                        timeout=300).read()
+        resp = self._request(url,
+                             headers=header,
+                             data=payload,
+                             method='PUT',
+                             timeout=300).read()
 
-        resp = xml_strip_namespace(resp)
-        jobID = resp.xpath('//JobID')[0].text
+        jobID = str(hmc_xpath.JOB_ID(parse_xml(resp))[0])
 
         pv_resp = self.fetchJobStatus(jobID)
         logger.debug("Free Physical Volume job response")
         logger.debug(pv_resp)
-        pv_xml = pv_resp.xpath("//Results//ParameterName[text()='result']//following-sibling::ParameterValue")[0].text
+        pv_xml = compiled_xpath("//Results//ParameterName[text()='result']//following-sibling::ParameterValue")(pv_resp)[0].text
         pv_xml = pv_xml.encode()
         resp = xml_strip_namespace(pv_xml)
-        list_pv_elem = resp.xpath("//PhysicalVolume")
+        list_pv_elem = compiled_xpath("//PhysicalVolume")(resp)
         return list_pv_elem
 
     def getVirtualNetworksQuick(self, system_uuid):
         url = "https://{0}/rest/api/uom/ManagedSystem/{1}/VirtualNetwork/quick/All".format(self.hmc_ip, system_uuid)
         header = {'X-API-Session': self.session,
                   'Accept': '*/*'}
-        resp = open_url(url,
-                        headers=header,
-                        method='GET',
-                        validate_certs=False,
-                        force_basic_auth=True,
-                        timeout=300)
+        resp = self._request(url,
+                             headers=header,
+                             method='GET',
+                             timeout=300)
         if resp.code != 200:
             logger.debug("Get of Logical Partitions failed. Respsonse code: %d", resp.code)
             return None
@@ -1159,23 +1498,23 @@ class HmcRestClient:
         </clientNetworkAdapters>'''.format(vn_payload)
 
         vnw_payload_xml = etree.XML(vnw_payload)
-        client_nw_adapter_tag = template_xml.xpath("//ioConfiguration")[0]
+        client_nw_adapter_tag = compiled_xpath("//ioConfiguration")(template_xml)[0]
         client_nw_adapter_tag.addnext(vnw_payload_xml)
 
     def vios_fetch_fcports_info(self, viosuuid):
         vios_dom = self.getVirtualIOServer(viosuuid)
-        phys_fc_ports = vios_dom.xpath("//PhysicalFibreChannelPort")
+        phys_fc_ports = compiled_xpath("//PhysicalFibreChannelPort")(vios_dom)
         fc_ports = []
         available_ports = None
         for each in phys_fc_ports:
             # check if <AvailablePorts> is present for respective fc adapter
-            available_ports = each.xpath("AvailablePorts")
+            available_ports = compiled_xpath("AvailablePorts")(each)
             if not available_ports:
                 logger.debug("Skipping since not NPIV capable")
                 continue
             fcport = {}
-            fcport['LocationCode'] = each.xpath("LocationCode")[0].text
-            fcport['PortName'] = each.xpath("PortName")[0].text
+            fcport['LocationCode'] = compiled_xpath("LocationCode")(each)[0].text
+            fcport['PortName'] = compiled_xpath("PortName")(each)[0].text
             fc_ports.append(fcport)
         return fc_ports
 
@@ -1196,15 +1535,15 @@ class HmcRestClient:
             if 'wwpn_pair' in fc:
                 wwpn_str = ' '.join(fc['wwpn_pair'].split(';'))
                 wwpn_xml = '<wwpns kb="CUD" kxe="false">{0}</wwpns>'.format(wwpn_str)
-                fc_client_adpt_dom.xpath("//locationCode")[0].addnext(etree.XML(wwpn_xml))
+                compiled_xpath("//locationCode")(fc_client_adpt_dom)[0].addnext(etree.XML(wwpn_xml))
             if 'client_adapter_id' in fc:
                 caid_str = fc['client_adapter_id']
                 caid_xml = '<VirtualSlotNumber kb="CUD" kxe="false">{0}</VirtualSlotNumber>'.format(caid_str)
-                fc_client_adpt_dom.xpath("//locationCode")[0].addprevious(etree.XML(caid_xml))
+                compiled_xpath("//locationCode")(fc_client_adpt_dom)[0].addprevious(etree.XML(caid_xml))
             if 'server_adapter_id' in fc:
                 said_str = fc['server_adapter_id']
                 said_xml = '<remoteAdapterID kb="CUD" kxe="false">{0}</remoteAdapterID>'.format(said_str)
-                fc_client_adpt_dom.xpath("//connectingPartitionName")[0].addnext(etree.XML(said_xml))
+                compiled_xpath("//connectingPartitionName")(fc_client_adpt_dom)[0].addnext(etree.XML(said_xml))
 
             fc_clients += ET.tostring(fc_client_adpt_dom).decode("utf-8")
 
@@ -1215,7 +1554,7 @@ class HmcRestClient:
             {0}
             </virtualFibreChannelClientAdapters>'''.format(fc_clients)
 
-        suspendEnableTag = lpar_template_dom.xpath("//suspendEnable")[0]
+        suspendEnableTag = compiled_xpath("//suspendEnable")(lpar_template_dom)[0]
         suspendEnableTag.addprevious(etree.XML(virtualFibreChannelClientAdapters))
 
     def fetchFCDetailsFromVIOS(self, system_uuid, lpar_id, vios_list):
@@ -1225,23 +1564,8 @@ class HmcRestClient:
         vios_dict = {vios['PartitionID']: vios['PartitionName'] for vios in vios_list}
 
         try:
-            vios_fc_xml = xml_strip_namespace(self.getVirtualIOServers(system_uuid, 'ViosFCMapping'))
-            vios_fcs = vios_fc_xml.xpath('//VirtualFibreChannelMapping')
-            for vios_fc_raw in vios_fcs:
-                vfc_dict = {}
-                vios_fc = etree.ElementTree(vios_fc_raw)
-                if vios_fc.find('//ClientAdapter') is None:
-                    continue
-                part_id = vios_fc.xpath('//ClientAdapter/LocalPartitionID')[0].text
-                if str(lpar_id) == str(part_id):
-                    vios_id = int(vios_fc.xpath('//ClientAdapter/ConnectingPartitionID')[0].text)
-                    vfc_dict['PortName'] = vios_fc.xpath('//ServerAdapter/PhysicalPort/PortName')[0].text
-                    vfc_dict['vios'] = vios_dict[vios_id]
-                    vfc_dict['LocationCode'] = vios_fc.xpath('//ServerAdapter/PhysicalPort/LocationCode')[0].text
-                    vfc_dict['WWPNs'] = vios_fc.xpath('//ClientAdapter/WWPNs')[0].text
-                    vfc_dict['ClientVirtualSlotNumber'] = vios_fc.xpath('//ClientAdapter/VirtualSlotNumber')[0].text
-                    vfc_dict['ServerVirtualSlotNumber'] = vios_fc.xpath('//ClientAdapter/ConnectingVirtualSlotNumber')[0].text
-                    vfcs.append(vfc_dict)
+            vios_entries = iter_feed_entries(self.getVirtualIOServers(system_uuid, 'ViosFCMapping', stream=True))
+            vfcs = index_fc_mappings(vios_entries, vios_dict).get(str(lpar_id), [])
         except Exception:
             pass
 
@@ -1254,44 +1578,8 @@ class HmcRestClient:
         vios_dict = {vios['PartitionID']: vios['PartitionName'] for vios in vios_list}
 
         try:
-            vios_scsi_xml = xml_strip_namespace(self.getVirtualIOServers(system_uuid, 'ViosSCSIMapping'))
-            vios_scsis = vios_scsi_xml.xpath('//VirtualSCSIMapping')
-            for vios_scsi_raw in vios_scsis:
-                vscsi_dict = {}
-                vios_scsi = etree.ElementTree(vios_scsi_raw)
-                # This code is to handle stale adapters
-                if len(vios_scsi.xpath('//ClientAdapter')) < 1:
-                    continue
-                part_id = vios_scsi.xpath('//ClientAdapter/LocalPartitionID')[0].text
-                if str(lpar_id) == str(part_id):
-                    # Adds the PVs
-                    if len(vios_scsi.xpath('//Storage/PhysicalVolume/VolumeUniqueID')) >= 1:
-                        volumeUniqueID = vios_scsi.xpath('//Storage/PhysicalVolume/VolumeUniqueID')[0].text
-                        vscsi_dict['VolumeUniqueID'] = volumeUniqueID
-                        vios_id = int(vios_scsi.xpath('//ClientAdapter/RemoteLogicalPartitionID')[0].text)
-                        vol_dict = {"vios": vios_dict[vios_id], 'name': vios_scsi.xpath('//Storage/PhysicalVolume/VolumeName')[0].text}
-                        vscsi_dict['Volume'] = [vol_dict]
-                        flag = False
-                        for vscsi in vscsis:
-                            if 'VolumeUniqueID' in vscsi and vscsi['VolumeUniqueID'] == volumeUniqueID:
-                                vscsi['Volume'].append(vol_dict)
-                                flag = True
-                        if not flag:
-                            vscsi_dict['ClientVirtualSlotNumber'] = vios_scsi.xpath('//ClientAdapter/VirtualSlotNumber')[0].text
-                            vscsi_dict['ServerVirtualSlotNumber'] = vios_scsi.xpath('//ClientAdapter/RemoteSlotNumber')[0].text
-                            vscsi_dict['TargetDeviceName'] = vios_scsi.xpath('//TargetDevice//TargetName')[0].text
-                            vscsi_dict['VolumeCapacity'] = vios_scsi.xpath('//Storage/PhysicalVolume/VolumeCapacity')[0].text
-                            vscsis.append(vscsi_dict)
-                    # Adds the VOD
-                    elif len(vios_scsi.xpath('//TargetDevice/VirtualOpticalTargetDevice')) >= 1:
-                        vscsi_dict['ClientVirtualSlotNumber'] = vios_scsi.xpath('//ClientAdapter/VirtualSlotNumber')[0].text
-                        vscsi_dict['ServerVirtualSlotNumber'] = vios_scsi.xpath('//ClientAdapter/RemoteSlotNumber')[0].text
-                        vscsi_dict['TargetName'] = vios_scsi.xpath('//TargetDevice/VirtualOpticalTargetDevice/TargetName')[0].text
-                        if len(vios_scsi.xpath('//Storage')) >= 1:
-                            vscsi_dict['MediaName'] = vios_scsi.xpath('//Storage//MediaName')[0].text
-                            vscsi_dict['MountType'] = vios_scsi.xpath('//Storage//MountType')[0].text
-                            vscsi_dict['Size'] = vios_scsi.xpath('//Storage//Size')[0].text
-                        vscsis.append(vscsi_dict)
+            vios_entries = iter_feed_entries(self.getVirtualIOServers(system_uuid, 'ViosSCSIMapping', stream=True))
+            vscsis = index_scsi_mappings(vios_entries, vios_dict).get(str(lpar_id), [])
         except Exception:
             pass
         return vscsis
@@ -1300,17 +1588,15 @@ class HmcRestClient:
         url = "https://{0}/rest/api/uom/ManagedSystem/{1}/SharedProcessorPool".format(self.hmc_ip, system_uuid)
         header = {'X-API-Session': self.session,
                   'Accept': '*/*'}
-        resp = open_url(url,
-                        headers=header,
-                        method='GET',
-                        validate_certs=False,
-                        force_basic_auth=True,
-                        timeout=300)
+        resp = self._request(url,
+                             headers=header,
+                             method='GET',
+                             timeout=300)
         if resp.code != 200:
             logger.debug("Get of Shared Processor Pool failed. Respsonse code: %d", resp.code)
             return None
-        sharedProcPool_root = xml_strip_namespace(resp.read())
-        sharedProcPool = sharedProcPool_root.xpath('//entry')
+        sharedProcPool_root = self._dom(resp)
+        sharedProcPool = compiled_xpath('//entry')(sharedProcPool_root)
         return sharedProcPool
 
     def validateSharedProcessorPoolNameAndID(self, system_uuid, user_spp):
@@ -1319,8 +1605,8 @@ class HmcRestClient:
         spp_id = None
         for spp_raw in spps:
             spp = etree.ElementTree(spp_raw)
-            v = spp.xpath('//PoolName')[0].text
-            k = spp.xpath('//PoolID')[0].text
+            v = compiled_xpath('//PoolName')(spp)[0].text
+            k = compiled_xpath('//PoolID')(spp)[0].text
             spp_dict[k] = v
         if user_spp.isdigit():
             if user_spp in spp_dict:
@@ -1377,7 +1663,7 @@ class HmcRestClient:
         </Metadata>
                 {0}
         </DedicatedVirtualNICs>'''.format(payload)
-        dedicatedvnicstag = lpar_template_dom.xpath('//DedicatedVirtualNICs')[0]
+        dedicatedvnicstag = compiled_xpath('//DedicatedVirtualNICs')(lpar_template_dom)[0]
         dedicatedvnicstag.getparent().replace(dedicatedvnicstag, etree.XML(vnic_payload))
 
     def get_vnic_backing_devices_payload(self, backing_devices, sriov_dvc_col, vios_name_list):
@@ -1471,26 +1757,20 @@ class HmcRestClient:
 
     def create_sriov_collection(self, sriov_adapters_dom):
         sriov_col_li = []
-        for sriov_adapter_dom_raw in sriov_adapters_dom:
-            sriov_adapter_dom = etree.ElementTree(sriov_adapter_dom_raw)
+        for sriov_adapter_dom in sriov_adapters_dom:
             try:
-                sriov_adapter_id = sriov_adapter_dom.xpath('//SRIOVAdapterID')[0].text
-                sriov_ce_pps = sriov_adapter_dom.xpath('//ConvergedEthernetPhysicalPorts//SRIOVConvergedNetworkAdapterPhysicalPort')
-                sriov_et_pps = sriov_adapter_dom.xpath('//EthernetPhysicalPorts//SRIOVEthernetPhysicalPort')
-                sriov_rc_pps = sriov_adapter_dom.xpath('//SRIOVRoCEPhysicalPorts//SRIOVRoCEPhysicalPort')
-                sriov_pps = sriov_ce_pps + sriov_et_pps + sriov_rc_pps
-                for sriov_pp_raw in sriov_pps:
-                    sriov_pp = etree.ElementTree(sriov_pp_raw)
-                    sriov_dict = {}
-                    maxELP = int(sriov_pp.xpath("//ConfiguredMaxEthernetLogicalPorts")[0].text)
-                    cELP = int(sriov_pp.xpath("//ConfiguredEthernetLogicalPorts")[0].text)
+                sriov_adapter_id = sriov_adapter_dom.find('SRIOVAdapterID').text
+                sriov_pps = [sriov_pp for path in SRIOV_PHYSICAL_PORT_PATHS for sriov_pp in sriov_adapter_dom.iterfind(path)]
+                for sriov_pp in sriov_pps:
+                    maxELP = int(sriov_pp.find('ConfiguredMaxEthernetLogicalPorts').text)
+                    cELP = int(sriov_pp.find('ConfiguredEthernetLogicalPorts').text)
                     if maxELP - cELP == 0:
                         continue
-                    sriov_dict['RelatedSRIOVAdapterID'] = sriov_adapter_id
-                    sriov_dict['LocationCode'] = sriov_pp.xpath("//LocationCode")[0].text
-                    sriov_dict['RelatedSRIOVPhysicalPortID'] = sriov_pp.xpath("//PhysicalPortID")[0].text
-                    sriov_dict['LinkStatus'] = sriov_pp.xpath("//LinkStatus")[0].text
-                    sriov_dict['AllocatedCapacity'] = sriov_pp.xpath("//AllocatedCapacity")[0].text.strip('%')
+                    sriov_dict = {'RelatedSRIOVAdapterID': sriov_adapter_id,
+                                  'LocationCode': sriov_pp.find('LocationCode').text,
+                                  'RelatedSRIOVPhysicalPortID': sriov_pp.find('PhysicalPortID').text,
+                                  'LinkStatus': sriov_pp.find('LinkStatus').text,
+                                  'AllocatedCapacity': sriov_pp.find('AllocatedCapacity').text.strip('%')}
                     sriov_col_li.append(sriov_dict)
             except Exception:
                 continue
@@ -1499,30 +1779,27 @@ class HmcRestClient:
     def generic_get(self, url):
         header = {'X-API-Session': self.session,
                   'Accept': '*/*'}
-        resp = open_url(url,
-                        headers=header,
-                        method='GET',
-                        validate_certs=False,
-                        force_basic_auth=True,
-                        timeout=3600)
+        resp = self._request(url,
+                             headers=header,
+                             method='GET',
+                             timeout=3600)
         if resp.code != 200:
             logger.debug("Get operation failed. Respsonse code: %d", resp.code)
             return None
-        response = resp.read()
-        gen_response = xml_strip_namespace(response)
+        gen_response = self._dom(resp)
         return gen_response
 
     def isDedicatedProcConfig(self, partition_dom):
-        return True if partition_dom.xpath('//HasDedicatedProcessors')[0].text == 'true' else False
+        return True if compiled_xpath('//HasDedicatedProcessors')(partition_dom)[0].text == 'true' else False
 
     def updateProc(self, partition_dom, isDedicated, proc=None, proc_unit=None):
         if isDedicated:
-            partition_dom.xpath('//DedicatedProcessorConfiguration/DesiredProcessors')[0].text = proc
+            compiled_xpath('//DedicatedProcessorConfiguration/DesiredProcessors')(partition_dom)[0].text = proc
         else:
             if proc:
-                partition_dom.xpath('//SharedProcessorConfiguration/DesiredVirtualProcessors')[0].text = proc
+                compiled_xpath('//SharedProcessorConfiguration/DesiredVirtualProcessors')(partition_dom)[0].text = proc
             if proc_unit:
-                partition_dom.xpath('//SharedProcessorConfiguration/DesiredProcessingUnits')[0].text = proc_unit
+                compiled_xpath('//SharedProcessorConfiguration/DesiredProcessingUnits')(partition_dom)[0].text = proc_unit
         return partition_dom
 
     def updateProcSharingMode(self, partition_dom, sharingMode):
@@ -1533,51 +1810,51 @@ class HmcRestClient:
                        'uncapped': 'uncapped',
                        'capped': 'capped'
                        }
-        partition_dom.xpath('//SharingMode')[0].text = modeMapping[sharingMode]
+        compiled_xpath('//SharingMode')(partition_dom)[0].text = modeMapping[sharingMode]
         return partition_dom
 
     def getProcSharingMode(self, partition_dom):
-        return partition_dom.xpath('//CurrentSharingMode')[0].text
+        return compiled_xpath('//CurrentSharingMode')(partition_dom)[0].text
 
     def updateProcUncappedWeight(self, partition_dom, weight):
-        sharedProcElement = partition_dom.xpath('//UncappedWeight')
+        sharedProcElement = compiled_xpath('//UncappedWeight')(partition_dom)
         if isinstance(sharedProcElement, list) and len(sharedProcElement) > 0:
-            partition_dom.xpath('//UncappedWeight')[0].text = weight
+            compiled_xpath('//UncappedWeight')(partition_dom)[0].text = weight
         else:
             weightXml = '<UncappedWeight kxe="false" kb="CUD">{0}</UncappedWeight>'.format(weight)
-            sharedProcessorPoolIDElement = partition_dom.xpath('//SharedProcessorPoolID')[0]
+            sharedProcessorPoolIDElement = compiled_xpath('//SharedProcessorPoolID')(partition_dom)[0]
             sharedProcessorPoolIDElement.addnext(etree.XML(weightXml))
         return partition_dom
 
     def getProcUncappedWeight(self, partition_dom):
-        element = partition_dom.xpath('//UncappedWeight')
+        element = compiled_xpath('//UncappedWeight')(partition_dom)
         if isinstance(element, list) and len(element) > 0:
             return element[0].text
         else:
             return None
 
     def getProcPool(self, partition_dom):
-        return partition_dom.xpath('//CurrentSharedProcessorPoolID')[0].text
+        return compiled_xpath('//CurrentSharedProcessorPoolID')(partition_dom)[0].text
 
     def updateProcPool(self, partition_dom, poolId):
-        partition_dom.xpath('//SharedProcessorPoolID')[0].text = poolId
+        compiled_xpath('//SharedProcessorPoolID')(partition_dom)[0].text = poolId
         return partition_dom
 
     def getProcs(self, isDedicated, partition_dom):
         if isDedicated:
-            procs = partition_dom.xpath('//CurrentDedicatedProcessorConfiguration/CurrentProcessors')[0].text
+            procs = compiled_xpath('//CurrentDedicatedProcessorConfiguration/CurrentProcessors')(partition_dom)[0].text
         else:
-            procs = partition_dom.xpath('//CurrentSharedProcessorConfiguration/AllocatedVirtualProcessors')[0].text
+            procs = compiled_xpath('//CurrentSharedProcessorConfiguration/AllocatedVirtualProcessors')(partition_dom)[0].text
         return procs
 
     def getProcUnits(self, partition_dom):
-        return partition_dom.xpath('//CurrentSharedProcessorConfiguration/CurrentProcessingUnits')[0].text
+        return compiled_xpath('//CurrentSharedProcessorConfiguration/CurrentProcessingUnits')(partition_dom)[0].text
 
     def getMem(self, partition_dom):
-        return partition_dom.xpath('//CurrentMemory')[0].text
+        return compiled_xpath('//CurrentMemory')(partition_dom)[0].text
 
     def updateMem(self, partition_dom, mem):
-        partition_dom.xpath('//DesiredMemory')[0].text = mem
+        compiled_xpath('//DesiredMemory')(partition_dom)[0].text = mem
         return partition_dom
 
     def updateLogicalPartition(self, partition_dom, timeout=None):
@@ -1585,7 +1862,7 @@ class HmcRestClient:
                   'Accept': '*/*',
                   'Content-Type': 'application/vnd.ibm.powervm.uom+xml; type=LogicalPartition'}
 
-        partition_uuid = partition_dom.xpath('//AtomID')[0].text
+        partition_uuid = compiled_xpath('//AtomID')(partition_dom)[0].text
         timeout_in_sec = 3600
         if timeout:
             if timeout > 60:
@@ -1597,18 +1874,16 @@ class HmcRestClient:
             url = "https://{0}/rest/api/uom/LogicalPartition/{1}".format(
                   self.hmc_ip, partition_uuid)
 
-        partition_dom = partition_dom.xpath("//LogicalPartition")[0]
+        partition_dom = compiled_xpath("//LogicalPartition")(partition_dom)[0]
 
         partiton_xmlstr = etree.tostring(partition_dom)
         partiton_xmlstr = partiton_xmlstr.decode("utf-8").replace("LogicalPartition", LPAR_NS, 1)
         logger.debug("INPUT PAYLOAD: \n %s", partiton_xmlstr)
-        resp = open_url(url,
-                        headers=header,
-                        method='POST',
-                        data=partiton_xmlstr,
-                        validate_certs=False,
-                        force_basic_auth=True,
-                        timeout=timeout_in_sec)
+        resp = self._request(url,
+                             headers=header,
+                             method='POST',
+                             data=partiton_xmlstr,
+                             timeout=timeout_in_sec)
         if resp.code != 200:
             logger.debug("Post operation failed. Respsonse code: %d", resp.code)
             return None
@@ -1624,68 +1899,57 @@ class HmcRestClient:
         if vios_list:
             vios_dict = {vios['UUID']: vios['PartitionName'] for vios in vios_list}
         vnics_list = []
-        vnic_links = partition_dom.xpath('//DedicatedVirtualNICs//link')
+        vnic_links = compiled_xpath('//DedicatedVirtualNICs//link')(partition_dom)
         if vnic_links:
             for vnic_link_raw in vnic_links:
                 vnic_dict = {}
                 vnic_link = etree.ElementTree(vnic_link_raw)
-                href = vnic_link.xpath('./@href')[0]
+                href = compiled_xpath('./@href')(vnic_link)[0]
                 vnic_dom = self.generic_get(href)
-                vnic_dict['vnic_adapter_id'] = vnic_dom.xpath('//VirtualSlotNumber')[0].text
-                vnic_backing_devices = vnic_dom.xpath('//VirtualNICBackingDeviceChoice')
+                vnic_dict['vnic_adapter_id'] = compiled_xpath('//VirtualSlotNumber')(vnic_dom)[0].text
+                vnic_backing_devices = compiled_xpath('//VirtualNICBackingDeviceChoice')(vnic_dom)
                 bck_dvcs = []
                 for vnic_bck_dvc_raw in vnic_backing_devices:
                     bck_dvc_dict = {}
                     vnic_bck_dvc = etree.ElementTree(vnic_bck_dvc_raw)
-                    bck_dvc_dict['Capacity'] = vnic_bck_dvc.xpath('//CurrentCapacityPercentage')[0].text
-                    bck_dvc_dict['DeviceType'] = vnic_bck_dvc.xpath('//DeviceType')[0].text
-                    bck_dvc_dict['Status'] = vnic_bck_dvc.xpath('//Status')[0].text
-                    bck_dvc_dict['RelatedSRIOVAdapterID'] = vnic_bck_dvc.xpath('//RelatedSRIOVAdapterID')[0].text
-                    vios_href = vnic_bck_dvc.xpath('//AssociatedVirtualIOServer')[0].attrib['href']
+                    bck_dvc_dict['Capacity'] = compiled_xpath('//CurrentCapacityPercentage')(vnic_bck_dvc)[0].text
+                    bck_dvc_dict['DeviceType'] = compiled_xpath('//DeviceType')(vnic_bck_dvc)[0].text
+                    bck_dvc_dict['Status'] = compiled_xpath('//Status')(vnic_bck_dvc)[0].text
+                    bck_dvc_dict['RelatedSRIOVAdapterID'] = compiled_xpath('//RelatedSRIOVAdapterID')(vnic_bck_dvc)[0].text
+                    vios_href = compiled_xpath('//AssociatedVirtualIOServer')(vnic_bck_dvc)[0].attrib['href']
                     bck_dvc_dict['AssociatedVirtualIOServer'] = vios_dict[(vios_href.split('/'))[-1]]
-                    sriov_href = vnic_bck_dvc.xpath('//RelatedSRIOVLogicalPort')[0].attrib['href']
-                    bck_dvc_dict['RelatedSRIOVLocationCode'] = self.generic_get(sriov_href).xpath('//LocationCode')[0].text
+                    sriov_href = compiled_xpath('//RelatedSRIOVLogicalPort')(vnic_bck_dvc)[0].attrib['href']
+                    bck_dvc_dict['RelatedSRIOVLocationCode'] = compiled_xpath('//LocationCode')(self.generic_get(sriov_href))[0].text
                     bck_dvcs.append(bck_dvc_dict)
                 vnic_dict['backing_devices'] = bck_dvcs
                 vnics_list.append(vnic_dict)
         return vnics_list
 
     def fetchTaggedGroupItems(self):
+        """
+        Returns the names of the tagged groups of every partition, VIOS and managed system, indexed by their UUID
+        """
         url = "https://{0}/rest/api/uom/Group".format(self.hmc_ip)
         resp_dom = self.generic_get(url)
-        resp_dict = {}
+        groups_by_uuid = {}
         if resp_dom is not None:
-            group_dom_list = resp_dom.xpath("//Group")
-            for group_dom_raw in group_dom_list:
-                uuid_list = []
-                group_dom = etree.ElementTree(group_dom_raw)
-                group_name = group_dom.xpath("//GroupName")[0].text
-                assc_lpar_links = group_dom.xpath("//AssociatedLogicalPartitions//link")
-                assc_ms_links = group_dom.xpath("//AssociatedManagedSystems//link")
-                assc_vios_links = group_dom.xpath("//AssociatedVirtualIOServers//link")
-                for assc_raw_lpar in assc_lpar_links:
-                    assc_lpar = etree.ElementTree(assc_raw_lpar)
-                    lpar_uuid = (assc_lpar.xpath('./@href')[0]).split('/')[-1]
-                    uuid_list.append(lpar_uuid)
-                for assc_raw_ms in assc_ms_links:
-                    assc_ms = etree.ElementTree(assc_raw_ms)
-                    ms_uuid = (assc_ms.xpath('./@href')[0]).split('/')[-1]
-                    uuid_list.append(ms_uuid)
-                for assc_raw_vios in assc_vios_links:
-                    assc_vios = etree.ElementTree(assc_raw_vios)
-                    vios_uuid = (assc_vios.xpath('./@href')[0]).split('/')[-1]
-                    uuid_list.append(vios_uuid)
-                resp_dict[group_name] = uuid_list
-        return resp_dict
+            for group_dom in compiled_xpath("//Group")(resp_dom):
+                group_name = group_dom.find('GroupName').text
+                for path in GROUP_MEMBER_LINK_PATHS:
+                    for link in group_dom.iterfind(path):
+                        group_names = groups_by_uuid.setdefault(link.get('href').split('/')[-1], [])
+                        if group_name not in group_names:
+                            group_names.append(group_name)
+        return groups_by_uuid
 
     def fetchPVsFromVIOSDOM(self, vios_dom, vios_name):
         # Generate the list of PhysicalVolumes available in the VIOS DOM
         pvs_raw = []
         pvs = []
-        fc_ports_dom = vios_dom.xpath("//PhysicalFibreChannelPorts/PhysicalFibreChannelPort")
+        fc_ports_dom = compiled_xpath("//PhysicalFibreChannelPorts/PhysicalFibreChannelPort")(vios_dom)
         for fc_port_raw in fc_ports_dom:
             fc_port_dom = etree.ElementTree(fc_port_raw)
-            pvs_raw = pvs_raw + fc_port_dom.xpath("//PhysicalVolumes/PhysicalVolume")
+            pvs_raw = pvs_raw + compiled_xpath("//PhysicalVolumes/PhysicalVolume")(fc_port_dom)
         if pvs_raw:
             pvs = [etree.ElementTree(pv_raw) for pv_raw in pvs_raw]
         else:
@@ -1700,7 +1964,7 @@ class HmcRestClient:
         pv_payload = ""
 
         for pv_dom in pv_dom_list:
-            disk_name = pv_dom.xpath("//VolumeName")[0].text
+            disk_name = compiled_xpath("//VolumeName")(pv_dom)[0].text
             if disk_name == pv_setting['disk_name']:
                 pv_payload = pv_dom
                 break
@@ -1763,28 +2027,26 @@ class HmcRestClient:
 
         return payload.replace('\n\n', '').replace('\n', '')
 
-    def getVIOSSCSCIMappings_dictionary(self, vios_uuid):
+    def getVIOSSCSCIMappings_dictionary(self, vios_uuid, vios_scsi_xml=None):
         vscsis_pv = []
         vscsis_vod = []
         try:
-            vios_scsi_xml = self.getVirtualIOServer(vios_uuid, 'ViosSCSIMapping')
-            vios_scsis = vios_scsi_xml.xpath('//VirtualSCSIMapping')
-            for vios_scsi_raw in vios_scsis:
+            if vios_scsi_xml is None:
+                vios_scsi_xml = self.getVirtualIOServer(vios_uuid, 'ViosSCSIMapping')
+            for vios_scsi in compiled_xpath('//VirtualSCSIMapping')(vios_scsi_xml):
                 vscsi_dict = {}
-                vios_scsi = etree.ElementTree(vios_scsi_raw)
-                try:
-                    # Fills the vscsi_pv dictionary
-                    vscsi_dict['BackingDeviceName'] = vios_scsi.xpath('//ServerAdapter/BackingDeviceName')[0].text
-                    vscsi_dict['RemoteLogicalPartitionID'] = vios_scsi.xpath('//ServerAdapter/RemoteLogicalPartitionID')[0].text
-                    vscsis_pv.append(vscsi_dict)
-                except Exception:
-                    pass
-                try:
-                    # Fills the vscsi_vod dictionary
-                    vscsi_dict['TargetName'] = vios_scsi.xpath('//TargetDevice/VirtualOpticalTargetDevice/TargetName')[0].text
+                # Fills the vscsi_pv dictionary
+                server_adapter = vios_scsi.find('ServerAdapter')
+                if server_adapter is not None and server_adapter.find('BackingDeviceName') is not None:
+                    vscsi_dict['BackingDeviceName'] = server_adapter.find('BackingDeviceName').text
+                    if server_adapter.find('RemoteLogicalPartitionID') is not None:
+                        vscsi_dict['RemoteLogicalPartitionID'] = server_adapter.find('RemoteLogicalPartitionID').text
+                        vscsis_pv.append(vscsi_dict)
+                # Fills the vscsi_vod dictionary
+                target_name = vios_scsi.find('TargetDevice/VirtualOpticalTargetDevice/TargetName')
+                if target_name is not None:
+                    vscsi_dict['TargetName'] = target_name.text
                     vscsis_vod.append(vscsi_dict)
-                except Exception:
-                    pass
         except Exception:
             pass
         return vscsis_pv, vscsis_vod
@@ -1792,35 +2054,37 @@ class HmcRestClient:
     def updateVIOSwithSCSIMappings(self, vios_UUID, pv_settings_list, lpar_UUID, vios_name, partition_dom, timeout):
         payload = ""
         flag = False
-        vios_dom = self.getVirtualIOServer(vios_UUID)
-        vios_vscsi_dict = self.getVIOSSCSCIMappings_dictionary(vios_UUID)
+        vios_dom = self.getVirtualIOServer(vios_UUID, 'ViosStorage')
+        # Only the SCSI mappings group of the VIOS gets posted back
+        mappings_dom = self.getVirtualIOServer(vios_UUID, 'ViosSCSIMapping')
+        vios_vscsi_dict = self.getVIOSSCSCIMappings_dictionary(vios_UUID, mappings_dom)
         mapped_dvc_names = [item['BackingDeviceName'] for item in vios_vscsi_dict[0]]
         pv_dom_list = self.fetchPVsFromVIOSDOM(vios_dom, vios_name)
-        lpar_id = partition_dom.xpath("//PartitionID")[0].text
-        vios_id = vios_dom.xpath("//PartitionID")[0].text
+        lpar_id = compiled_xpath("//PartitionID")(partition_dom)[0].text
+        vios_id = compiled_xpath("//PartitionID")(vios_dom)[0].text
         for pv_settings in pv_settings_list:
             if pv_settings['disk_name'] not in mapped_dvc_names:
                 payload = self.build_SCSI_MappingPayload(pv_dom_list, pv_settings, lpar_UUID, lpar_id, vios_id)
-                vSCSIMappingsTag = vios_dom.xpath("//VirtualSCSIMappings")[0]
+                vSCSIMappingsTag = compiled_xpath("//VirtualSCSIMappings")(mappings_dom)[0]
                 vSCSIMappingsTag.append(etree.XML(payload))
                 flag = True
         if flag:
-            self.updateVirtualIOServer(vios_dom, timeout)
+            self.updateVirtualIOServer(mappings_dom, timeout, group='ViosSCSIMapping')
         return flag
 
     def fetchVIOSFcDetails(self, vios_dom):
         fc_ports_list = []
-        fc_ports = vios_dom.xpath("//PhysicalFibreChannelAdapter/PhysicalFibreChannelPorts/PhysicalFibreChannelPort")
+        fc_ports = compiled_xpath("//PhysicalFibreChannelAdapter/PhysicalFibreChannelPorts/PhysicalFibreChannelPort")(vios_dom)
         for fc_port_raw in fc_ports:
             fc_dict = {}
             fc_dict['AvailablePorts'] = "0"
             fc_dict['TotalPorts'] = "0"
             fc_port = etree.ElementTree(fc_port_raw)
             try:
-                fc_dict['PortName'] = fc_port.xpath("//PortName")[0].text
-                fc_dict['AvailablePorts'] = fc_port.xpath("//AvailablePorts")[0].text
-                fc_dict['TotalPorts'] = fc_port.xpath("//TotalPorts")[0].text
-                fc_dict['LocationCode'] = fc_port.xpath("//LocationCode")[0].text
+                fc_dict['PortName'] = compiled_xpath("//PortName")(fc_port)[0].text
+                fc_dict['AvailablePorts'] = compiled_xpath("//AvailablePorts")(fc_port)[0].text
+                fc_dict['TotalPorts'] = compiled_xpath("//TotalPorts")(fc_port)[0].text
+                fc_dict['LocationCode'] = compiled_xpath("//LocationCode")(fc_port)[0].text
             except Exception:
                 pass
             finally:
@@ -1891,16 +2155,18 @@ class HmcRestClient:
     def updateVIOSwithNPIVMappings(self, vios_UUID, npiv_settings_list, lpar_UUID, vios_name, partition_dom, timeout):
         payload = ""
         flag = False
-        vios_dom = self.getVirtualIOServer(vios_UUID)
+        vios_dom = self.getVirtualIOServer(vios_UUID, 'ViosStorage')
+        # Only the fibre channel mappings group of the VIOS gets posted back
+        mappings_dom = self.getVirtualIOServer(vios_UUID, 'ViosFCMapping')
         vios_npiv_dict_list = self.fetchVIOSFcDetails(vios_dom)
-        lpar_id = partition_dom.xpath("//PartitionID")[0].text
-        vios_id = vios_dom.xpath("//PartitionID")[0].text
+        lpar_id = compiled_xpath("//PartitionID")(partition_dom)[0].text
+        vios_id = compiled_xpath("//PartitionID")(vios_dom)[0].text
         for npiv_settings in npiv_settings_list:
             for vios_npiv_dict in vios_npiv_dict_list:
                 if npiv_settings['fc_port_name'] == vios_npiv_dict['PortName']:
                     if int(vios_npiv_dict['AvailablePorts']) > 0:
                         payload = self.build_FC_MappingPayload(vios_npiv_dict['LocationCode'], npiv_settings, lpar_UUID, lpar_id, vios_id)
-                        FCMappingsTag = vios_dom.xpath("//VirtualFibreChannelMappings")[0]
+                        FCMappingsTag = compiled_xpath("//VirtualFibreChannelMappings")(mappings_dom)[0]
                         FCMappingsTag.append(etree.XML(payload))
                         flag = True
                         break
@@ -1909,7 +2175,7 @@ class HmcRestClient:
             else:
                 raise HmcError("fc_port_name: {0} provided is not found in the vios: {1}".format(npiv_settings['fc_port_name'], vios_name, ))
         if flag:
-            self.updateVirtualIOServer(vios_dom, timeout)
+            self.updateVirtualIOServer(mappings_dom, timeout, group='ViosFCMapping')
         return flag
 
     def build_SCSI_VOD_MappingPayload(self, vod_setting, lpar_UUID, lpar_id, vios_id, vom_dict):
@@ -1984,65 +2250,70 @@ class HmcRestClient:
 
     def getVIOSVirtualOpticalMediaDetails(self, vios_dom):
         voms_dict = {}
-        if len(vios_dom.xpath("//MediaRepositories/VirtualMediaRepository/OpticalMedia/VirtualOpticalMedia")) >= 1:
-            voms = vios_dom.xpath("//MediaRepositories/VirtualMediaRepository/OpticalMedia/VirtualOpticalMedia")
+        if len(compiled_xpath("//MediaRepositories/VirtualMediaRepository/OpticalMedia/VirtualOpticalMedia")(vios_dom)) >= 1:
+            voms = compiled_xpath("//MediaRepositories/VirtualMediaRepository/OpticalMedia/VirtualOpticalMedia")(vios_dom)
             for vom_raw in voms:
                 vom_dict = {}
                 vom = etree.ElementTree(vom_raw)
-                media_name = vom.xpath('//MediaName')[0].text
-                vom_dict['MediaUDID'] = vom.xpath('//MediaUDID')[0].text
-                vom_dict['MountType'] = vom.xpath('//MountType')[0].text
-                vom_dict['Size'] = vom.xpath('//Size')[0].text
+                media_name = compiled_xpath('//MediaName')(vom)[0].text
+                vom_dict['MediaUDID'] = compiled_xpath('//MediaUDID')(vom)[0].text
+                vom_dict['MountType'] = compiled_xpath('//MountType')(vom)[0].text
+                vom_dict['Size'] = compiled_xpath('//Size')(vom)[0].text
                 voms_dict[media_name] = vom_dict
         return voms_dict
 
     def updateVIOSwithVODMappings(self, vios_UUID, vod_settings_list, lpar_UUID, partition_dom, timeout):
         payload = ""
         flag = False
-        vios_dom = self.getVirtualIOServer(vios_UUID)
-        vios_vscsi_dict = self.getVIOSSCSCIMappings_dictionary(vios_UUID)
+        vios_dom = self.getVirtualIOServer(vios_UUID, 'ViosStorage')
+        # Only the SCSI mappings group of the VIOS gets posted back
+        mappings_dom = self.getVirtualIOServer(vios_UUID, 'ViosSCSIMapping')
+        vios_vscsi_dict = self.getVIOSSCSCIMappings_dictionary(vios_UUID, mappings_dom)
         mapped_dvc_names = [item['TargetName'] for item in vios_vscsi_dict[1]]
-        lpar_id = partition_dom.xpath("//PartitionID")[0].text
-        vios_id = vios_dom.xpath("//PartitionID")[0].text
+        lpar_id = compiled_xpath("//PartitionID")(partition_dom)[0].text
+        vios_id = compiled_xpath("//PartitionID")(vios_dom)[0].text
         vom_dict = self.getVIOSVirtualOpticalMediaDetails(vios_dom)
         for vod_settings in vod_settings_list:
             if vod_settings['device_name'] not in mapped_dvc_names:
                 payload = self.build_SCSI_VOD_MappingPayload(vod_settings, lpar_UUID, lpar_id, vios_id, vom_dict)
-                vSCSIMappingsTag = vios_dom.xpath("//VirtualSCSIMappings")[0]
+                vSCSIMappingsTag = compiled_xpath("//VirtualSCSIMappings")(mappings_dom)[0]
                 vSCSIMappingsTag.append(etree.XML(payload))
                 flag = True
         if flag:
-            self.updateVirtualIOServer(vios_dom, timeout)
+            self.updateVirtualIOServer(mappings_dom, timeout, group='ViosSCSIMapping')
         return flag
 
-    def updateVirtualIOServer(self, vios_dom, timeout=None):
+    def updateVirtualIOServer(self, vios_dom, timeout=None, group=None):
+        """
+        Posts vios_dom back to the HMC. With group, vios_dom is the document of a GET of that group
+        and only the properties of the group get updated, which keeps the payload small.
+        """
         header = {'X-API-Session': self.session,
                   'Accept': '*/*',
                   'Content-Type': 'application/vnd.ibm.powervm.uom+xml; type=VirtualIOServer'}
 
-        vios_uuid = vios_dom.xpath('//AtomID')[0].text
+        vios_uuid = compiled_xpath('//AtomID')(vios_dom)[0].text
         timeout_in_sec = 3600
+        url = "https://{0}/rest/api/uom/VirtualIOServer/{1}".format(self.hmc_ip, vios_uuid)
+        query = []
+        if group:
+            query.append("group={0}".format(group))
         if timeout:
             if timeout > 60:
                 timeout_in_sec = timeout * 60
+            query.append("timeout={0}".format(timeout))
+        if query:
+            url = "{0}?{1}".format(url, '&'.join(query))
 
-            url = "https://{0}/rest/api/uom/VirtualIOServer/{1}?timeout={2}".format(
-                  self.hmc_ip, vios_uuid, timeout)
-        else:
-            url = "https://{0}/rest/api/uom/VirtualIOServer/{1}".format(
-                  self.hmc_ip, vios_uuid)
-
-        vios_dom = vios_dom.xpath("//VirtualIOServer")[0]
+        vios_dom = compiled_xpath("//VirtualIOServer")(vios_dom)[0]
         vios_xmlstr = etree.tostring(vios_dom)
         vios_xmlstr = vios_xmlstr.decode("utf-8").replace("VirtualIOServer", VIOS_NS, 1)
         logger.debug("INPUT PAYLOAD: \n %s", vios_xmlstr)
-        resp = open_url(url,
-                        headers=header,
-                        method='POST',
-                        data=vios_xmlstr,
-                        validate_certs=False,
-                        force_basic_auth=True,
-                        timeout=timeout_in_sec)
+        resp = self._request(url,
+                             headers=header,
+                             method='POST',
+                             data=vios_xmlstr,
+                             timeout=timeout_in_sec)
         if resp.code != 200:
             logger.debug("Post operation failed. Respsonse code: %d", resp.code)
             return None
@@ -2050,3 +2321,26 @@ class HmcRestClient:
         logger.debug("POST RESPONSE: \n %s", response)
         post_response = xml_strip_namespace(response)
         return post_response
+
+
+def event_rest_client(hmc_ip, username, password):
+    """
+    Opens a REST session following the HMC event feed, its waitForChange ends the waits of Hmc as soon as the HMC
+    reports a change of the awaited object. Returns None when the event feed is not enabled or the session could
+    not be opened, the waits then sleep their whole interval.
+    """
+    if not event_feed_enabled():
+        return None
+    try:
+        return HmcRestClient(hmc_ip, username, password, event_feed=True)
+    except Exception as error:
+        logger.debug("Unable to follow the HMC events of %s: %s", hmc_ip, parse_error_response(error))
+        return None
+
+
+def logoff_event_rest_client(rest_conn):
+    if rest_conn:
+        try:
+            rest_conn.logoff()
+        except Exception:
+            logger.debug("Logoff error")
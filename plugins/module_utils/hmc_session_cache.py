@@ -0,0 +1,123 @@
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+import hashlib
+import json
+import os
+import stat
+import tempfile
+import time
+
+import logging
+logger = logging.getLogger(__name__)
+
+# Session cache is opt-in, it gets enabled by pointing this environment variable to a directory
+SESSION_CACHE_DIR_ENV = 'POWER_HMC_SESSION_CACHE_DIR'
+SESSION_CACHE_TTL_ENV = 'POWER_HMC_SESSION_CACHE_TTL'
+# HMC expires idle REST sessions, do not hand out tokens older than this (in seconds)
+DEFAULT_SESSION_TTL = 1800
+
+
+def ensure_private_dir(cache_dir):
+    # Cache directories hold session tokens and HMC data, only use them when private to the current user
+    if not os.path.isdir(cache_dir):
+        os.makedirs(cache_dir, 0o700)
+    dir_stat = os.stat(cache_dir)
+    if dir_stat.st_uid != os.getuid():
+        logger.debug("Cache directory %s is not owned by the current user, ignoring it", cache_dir)
+        return False
+    if stat.S_IMODE(dir_stat.st_mode) & 0o077:
+        os.chmod(cache_dir, 0o700)
+    return True
+
+
+def write_private_file(path, content):
+    # Atomically replaces path with content, readable by the current user only
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as cache_file:
+            cache_file.write(content)
+        os.chmod(tmp_path, 0o600)
+        os.rename(tmp_path, path)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+
+
+class HmcSessionCache:
+    """
+    On-disk cache of HMC REST session tokens keyed by HMC host and user,
+    allows several module invocations against the same HMC to share a single logon
+    """
+    def __init__(self, cache_dir, ttl=DEFAULT_SESSION_TTL):
+        self.cache_dir = os.path.abspath(os.path.expanduser(cache_dir))
+        self.ttl = ttl
+
+    def _path(self, hmc, user):
+        key = hashlib.sha256(f"{hmc}\0{user}".encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _read(self, hmc, user):
+        path = self._path(hmc, user)
+        try:
+            if os.stat(path).st_uid != os.getuid():
+                return None
+            with open(path) as cache_file:
+                return json.load(cache_file)
+        except (IOError, OSError, ValueError):
+            return None
+
+    def _expired(self, entry):
+        return time.time() - entry.get('created', 0) > self.ttl
+
+    def load(self, hmc, user):
+        entry = self._read(hmc, user)
+        if entry is None:
+            return None
+        if self._expired(entry):
+            logger.debug("Cached session for %s@%s expired", user, hmc)
+            self.invalidate(hmc, user)
+            return None
+        return entry.get('session')
+
+    def take_expired(self, hmc, user):
+        """
+        Removes the cached session of hmc and user once older than the TTL and returns it,
+        the caller logs it off as the HMC would otherwise keep it open till its own idle timeout
+        """
+        entry = self._read(hmc, user)
+        if entry is None or not self._expired(entry):
+            return None
+        logger.debug("Cached session for %s@%s expired", user, hmc)
+        self.invalidate(hmc, user)
+        return entry.get('session')
+
+    def is_fresh(self, hmc, user, session):
+        return session is not None and self.load(hmc, user) == session
+
+    def store(self, hmc, user, session):
+        try:
+            if not ensure_private_dir(self.cache_dir):
+                return
+            entry = {'hmc': hmc, 'user': user, 'session': session, 'created': time.time()}
+            write_private_file(self._path(hmc, user), json.dumps(entry).encode('utf-8'))
+        except (IOError, OSError) as error:
+            logger.debug("Unable to cache the session for %s@%s: %s", user, hmc, error)
+
+    def invalidate(self, hmc, user, session=None):
+        if session is not None and self.load(hmc, user) != session:
+            return
+        try:
+            os.remove(self._path(hmc, user))
+        except OSError:
+            pass
+
+
+def session_cache_from_env():
+    cache_dir = os.environ.get(SESSION_CACHE_DIR_ENV)
+    if not cache_dir:
+        return None
+    try:
+        ttl = int(os.environ.get(SESSION_CACHE_TTL_ENV, DEFAULT_SESSION_TTL))
+    except ValueError:
+        ttl = DEFAULT_SESSION_TTL
+    return HmcSessionCache(cache_dir, ttl)
@@ -0,0 +1,195 @@
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+import select
+import socket
+import threading
+from ansible.module_utils.common.text.converters import to_native
+
+import logging
+logger = logging.getLogger(__name__)
+
+NEED_PARAMIKO = False
+try:
+    import paramiko
+except ImportError:
+    NEED_PARAMIKO = True
+else:
+    class UnknownHostKey(paramiko.SSHException):
+        '''Raised when the HMC host key is not in the known_hosts files.'''
+
+    class RejectUnknownHostKey(paramiko.MissingHostKeyPolicy):
+        def missing_host_key(self, client, hostname, key):
+            raise UnknownHostKey(f"Host key of {hostname} is unknown")
+
+DEFAULT_SSH_POOL_SIZE = 4
+SSH_PORT = 22
+SSH_CONNECT_TIMEOUT = 30
+# Channels only signal stdout data through their file descriptor, stderr data and the deadlines of
+# the streamed commands are polled at this interval
+CHANNEL_POLL_INTERVAL = 0.1
+READ_CHUNK_SIZE = 32 * 1024
+
+# Exit codes of sshpass and ssh, resolve_return_code describes them like for the ssh command line
+SSHPASS_INVALID_PASSWORD = 5
+SSHPASS_UNKNOWN_HOST_KEY = 6
+SSH_CONNECTION_ERROR = 255
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class SshConnectionError(Exception):
+    def __init__(self, status_code, stderr=''):
+        super(SshConnectionError, self).__init__(stderr)
+        self.status_code = status_code
+        self.stderr = stderr
+
+
+class HmcSshPool:
+    """
+    Pool of authenticated SSH connections towards a single HMC and user.
+    Every command runs over its own exec channel, at most pool_size commands are in flight at a time
+    and idle connections are reused so that only the first command pays for the key exchange and authentication.
+    """
+    def __init__(self, host, username, password, port=SSH_PORT, pool_size=DEFAULT_SSH_POOL_SIZE, check_host_key=True):
+        self.host = host
+        self.username = username
+        self.password = password
+        self.port = port
+        self.pool_size = pool_size
+        self.check_host_key = check_host_key
+        self._idle = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(pool_size)
+
+    def _new_connection(self):
+        logger.debug("Opening new SSH connection to %s@%s:%s", self.username, self.host, self.port)
+        client = paramiko.SSHClient()
+        client.load_system_host_keys()
+        client.set_missing_host_key_policy(RejectUnknownHostKey() if self.check_host_key else paramiko.AutoAddPolicy())
+        # Without a password the HMC is expected to accept the keys of the user, like the ssh command line
+        client.connect(self.host, port=self.port, username=self.username, password=self.password or None,
+                       timeout=SSH_CONNECT_TIMEOUT, allow_agent=not self.password, look_for_keys=not self.password)
+        return client
+
+    def _checkout(self):
+        with self._lock:
+            while self._idle:
+                client = self._idle.pop()
+                transport = client.get_transport()
+                if transport is not None and transport.is_active():
+                    return client, True
+                client.close()
+        return self._new_connection(), False
+
+    def _checkin(self, client):
+        with self._lock:
+            self._idle.append(client)
+
+    def _open_channel(self):
+        """
+        Returns an SSH connection of the pool and a new session channel on it.
+        Connection failures raise SshConnectionError with the exit codes of sshpass and ssh.
+        """
+        retry = True
+        while True:
+            try:
+                client, reused = self._checkout()
+            except paramiko.AuthenticationException:
+                raise SshConnectionError(SSHPASS_INVALID_PASSWORD)
+            except (UnknownHostKey, paramiko.BadHostKeyException) as error:
+                logger.debug("Host key check failed: %s", error)
+                raise SshConnectionError(SSHPASS_UNKNOWN_HOST_KEY)
+            except (paramiko.SSHException, socket.error, EOFError) as error:
+                raise SshConnectionError(SSH_CONNECTION_ERROR, f"ssh: connect to host {self.host} port {self.port}: {error}")
+            try:
+                return client, client.get_transport().open_session()
+            except (paramiko.SSHException, socket.error, EOFError) as error:
+                # The command did not start yet, a connection closed by the HMC is retried once on a new one
+                client.close()
+                if reused and retry:
+                    logger.debug("Reused SSH connection to %s was closed by peer, retrying", self.host)
+                    retry = False
+                    continue
+                raise SshConnectionError(SSH_CONNECTION_ERROR, to_native(error))
+
+    def stream(self, cmd):
+        """
+        Runs cmd on the HMC and yields (None, stdout, stderr) with the output bytes as they arrive, empty ones
+        every poll interval while the command is silent, then (exit code, b'', stderr) once it exited.
+        Closing the generator before the end interrupts the command.
+        """
+        self._slots.acquire()
+        try:
+            try:
+                client, channel = self._open_channel()
+            except SshConnectionError as error:
+                yield error.status_code, b'', error.stderr.encode('utf-8')
+                return
+            try:
+                channel.exec_command(cmd)
+                while True:
+                    stdout = channel.recv(READ_CHUNK_SIZE) if channel.recv_ready() else b''
+                    stderr = channel.recv_stderr(READ_CHUNK_SIZE) if channel.recv_stderr_ready() else b''
+                    if stdout or stderr:
+                        yield None, stdout, stderr
+                    elif channel.exit_status_ready() and channel.eof_received:
+                        break
+                    else:
+                        select.select([channel], [], [], CHANNEL_POLL_INTERVAL)
+                        yield None, b'', b''
+                status_code = channel.recv_exit_status()
+            except (paramiko.SSHException, socket.error, EOFError) as error:
+                client.close()
+                yield SSH_CONNECTION_ERROR, b'', to_native(error).encode('utf-8')
+                return
+            except GeneratorExit:
+                # Interrupted by the caller, closing the channel leaves the connection usable
+                self._checkin(client)
+                raise
+            finally:
+                channel.close()
+            self._checkin(client)
+            yield status_code, b'', b''
+        finally:
+            self._slots.release()
+
+    def run(self, cmd):
+        """
+        Runs cmd on the HMC and returns its exit code, stdout and stderr like module.run_command.
+        Connection failures are reported with the exit codes of sshpass and ssh.
+        """
+        stdout = []
+        stderr = []
+        for status_code, out, err in self.stream(cmd):
+            stdout.append(out)
+            stderr.append(err)
+        return (status_code, to_native(b''.join(stdout), errors='surrogate_or_strict'),
+                to_native(b''.join(stderr), errors='surrogate_or_strict'))
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for client in idle:
+            client.close()
+
+
+def get_ssh_pool(host, username, password, check_host_key=True, port=SSH_PORT, pool_size=DEFAULT_SSH_POOL_SIZE):
+    """
+    Returns the SSH connection pool shared by all the HmcCliConnection towards host with these credentials
+    """
+    key = (host, port, username, password, check_host_key)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = HmcSshPool(host, username, password, port=port, pool_size=pool_size, check_host_key=check_host_key)
+            _pools[key] = pool
+        return pool
+
+
+def close_ssh_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
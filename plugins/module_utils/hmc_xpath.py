@@ -0,0 +1,82 @@
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+import re
+import threading
+NEED_LXML = False
+try:
+    from lxml import etree
+except ImportError:
+    NEED_LXML = True
+
+# Namespaces of the HMC REST API documents
+NSMAP = {'atom': 'http://www.w3.org/2005/Atom',
+         'uom': 'http://www.ibm.com/xmlns/systems/power/firmware/uom/mc/2012_10/',
+         'web': 'http://www.ibm.com/xmlns/systems/power/firmware/web/mc/2012_10/',
+         'tmpl': 'http://www.ibm.com/xmlns/systems/power/firmware/templates/mc/2012_10/'}
+
+# A leading //Name step, rewritten to descendant-or-self::Name for trees wrapping a subelement
+LEADING_DESCENDANT_STEP = re.compile(r'^//((?:[A-Za-z_][\w.-]*:)?(?:[A-Za-z_][\w.-]*|\*))(?=$|[/\[])')
+
+_compiled = {}
+_compiled_lock = threading.Lock()
+
+
+class CompiledXPath:
+    """
+    Precompiled XPath expression, evaluated like element.xpath(expr) and tree.xpath(expr).
+    etree.XPath evaluates absolute paths against the whole document even when given an ElementTree
+    wrapping a subelement, while tree.xpath() only searches the subtree. The subtree scope
+    is kept by evaluating the leading //Name step as descendant-or-self::Name from the subelement.
+    """
+    def __init__(self, expr):
+        self.path = expr
+        self._xpath = etree.XPath(expr, namespaces=NSMAP)
+        self._scoped = None
+        if '|' not in expr and LEADING_DESCENDANT_STEP.match(expr):
+            self._scoped = etree.XPath(LEADING_DESCENDANT_STEP.sub(r'descendant-or-self::\1', expr), namespaces=NSMAP)
+
+    def __call__(self, node, **variables):
+        if isinstance(node, etree._ElementTree):
+            root = node.getroot()
+            if root is not None and root.getparent() is not None:
+                if self._scoped is None:
+                    return node.xpath(self.path, namespaces=NSMAP, **variables)
+                return self._scoped(root, **variables)
+        return self._xpath(node, **variables)
+
+
+def compiled_xpath(expr):
+    """
+    Returns the CompiledXPath of expr, every expression is compiled once per process.
+    Unprefixed names match the documents stripped by xml_strip_namespace, the NSMAP prefixes
+    match the documents as received from the HMC.
+    """
+    try:
+        return _compiled[expr]
+    except KeyError:
+        pass
+    with _compiled_lock:
+        if expr not in _compiled:
+            _compiled[expr] = CompiledXPath(expr)
+        return _compiled[expr]
+
+
+def parse_xml(xml_str):
+    # Parses a response keeping its namespaces, for documents which are only queried through the NSMAP prefixes
+    parser = etree.XMLParser(recover=True, encoding='utf-8')
+    return etree.fromstring(xml_str, parser)
+
+
+if not NEED_LXML:
+    # Lookups on the documents HmcRestClient consumes itself, these skip the namespace strip pass
+    SESSION_TOKEN = compiled_xpath('//web:X-API-Session/text()')
+    JOB_ID = compiled_xpath('//web:JobID/text()')
+    JOB_STATUS = compiled_xpath('//web:Status/text()')
+    JOB_OPERATION_NAME = compiled_xpath('//web:OperationName/text()')
+    JOB_PARAMETER = compiled_xpath('//web:ParameterName[text()=$name]/following-sibling::web:ParameterValue/text()')
+    JOB_ERROR_MESSAGE = compiled_xpath("//*[local-name()='ResponseException']//*[local-name()='Message']/text()")
+    ERROR_MESSAGE = compiled_xpath("//*[local-name()='Message']/text()")
+    EVENTS = compiled_xpath('//uom:Event')
+    EVENT_TYPE = compiled_xpath('string(uom:EventType)')
+    EVENT_DATA = compiled_xpath('string(uom:EventData)')
+    TEMPLATE_UUID_BY_NAME = compiled_xpath('//tmpl:partitionTemplateName[text()=$name]/preceding-sibling::tmpl:Metadata//tmpl:AtomID/text()')
@@ -213,6 +213,8 @@ from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_resource import
 from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_exceptions import HmcError
 from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_rest_client import parse_error_response
 from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_rest_client import HmcRestClient
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_rest_client import event_rest_client
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_rest_client import logoff_event_rest_client
 from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_exceptions import ParameterError
 
 
@@ -282,6 +284,24 @@ def validate_parameters(params):
             raise ParameterError("unsupported parameters: %s" % (', '.join(collate)))
 
 
+def system_event_rest_client(hmc_host, hmc_user, password, system_name):
+    # REST session following the HMC event feed while waiting for the system state change, it reuses
+    # the session shared through the session cache when enabled. Returns it with the UUID of the system
+    # whose events end the waits early.
+    rest_conn = event_rest_client(hmc_host, hmc_user, password)
+    if not rest_conn:
+        return None, None
+    try:
+        system_uuid = rest_conn.getManagedSystem(system_name)[0]
+    except Exception as error:
+        logger.debug("Unable to follow the HMC events of %s: %s", system_name, parse_error_response(error))
+        system_uuid = None
+    if not system_uuid:
+        logoff_event_rest_client(rest_conn)
+        return None, None
+    return rest_conn, system_uuid
+
+
 def powerOnManagedSys(module, params):
     hmc_host = params['hmc_host']
     hmc_user = params['hmc_auth']['username']
@@ -290,7 +310,8 @@ def powerOnManagedSys(module, params):
     changed = False
     validate_parameters(params)
     hmc_conn = HmcCliConnection(module, hmc_host, hmc_user, password)
-    hmc = Hmc(hmc_conn)
+    rest_conn, system_uuid = system_event_rest_client(hmc_host, hmc_user, password, system_name)
+    hmc = Hmc(hmc_conn, rest_conn.waitForChange if rest_conn else None)
 
     try:
         res = hmc.getManagedSystemDetails(system_name)
@@ -299,13 +320,15 @@ def powerOnManagedSys(module, params):
             changed = False
         else:
             hmc.managedSystemPowerON(system_name)
-            if hmc.checkManagedSysState(system_name, ['Operating', 'Standby']):
+            if hmc.checkManagedSysState(system_name, ['Operating', 'Standby'], uuid=system_uuid):
                 changed = True
             else:
                 changed = False
 
     except HmcError as on_system_error:
         return False, repr(on_system_error), None
+    finally:
+        logoff_event_rest_client(rest_conn)
 
     return changed, None, None
 
@@ -318,7 +341,8 @@ def powerOffManagedSys(module, params):
     changed = False
     validate_parameters(params)
     hmc_conn = HmcCliConnection(module, hmc_host, hmc_user, password)
-    hmc = Hmc(hmc_conn)
+    rest_conn, system_uuid = system_event_rest_client(hmc_host, hmc_user, password, system_name)
+    hmc = Hmc(hmc_conn, rest_conn.waitForChange if rest_conn else None)
 
     try:
         res = hmc.getManagedSystemDetails(system_name)
@@ -327,12 +351,14 @@ def powerOffManagedSys(module, params):
             changed = False
         else:
             hmc.managedSystemShutdown(system_name)
-            if hmc.checkManagedSysState(system_name, ['Power Off']):
+            if hmc.checkManagedSysState(system_name, ['Power Off'], uuid=system_uuid):
                 changed = True
             else:
                 changed = False
     except HmcError as on_system_error:
         return False, repr(on_system_error), None
+    finally:
+        logoff_event_rest_client(rest_conn)
 
     return changed, None, None
 
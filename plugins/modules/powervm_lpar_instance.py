@@ -595,8 +595,11 @@ from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_exceptions impor
 from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_exceptions import ProcMemValidationError
 from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_rest_client import parse_error_response
 from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_rest_client import HmcRestClient
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_rest_client import event_rest_client
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_rest_client import logoff_event_rest_client
 from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_rest_client import add_taggedIO_details
 from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_rest_client import add_physical_io
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_rest_client import map_bounded
 from random import randint
 from collections import OrderedDict
 from decimal import Decimal
@@ -811,11 +814,13 @@ def identifyFreeVolume(rest_conn, system_uuid, volume_name=None, volume_size=0,
     keys_list = []
     unique_keys = []
     pvs_in_use = []
-    for vios_uuid, viosname in vios_uuid_list:
+    # The GetFreePhysicalVolumes jobs and storage lookups of the VIOSes run concurrently
+    vios_volumes = map_bounded(lambda vios: (rest_conn.getFreePhyVolume(vios[0]), fetchAllInUsePhyVolumes(rest_conn, vios[0])),
+                               vios_uuid_list, rest_conn.pool_size)
+    for (vios_uuid, viosname), (pv_xml_list, vios_pvs_in_use) in zip(vios_uuid_list, vios_volumes):
         logger.debug(vios_uuid)
         each_vios_pv_complex = {}
-        pv_xml_list = rest_conn.getFreePhyVolume(vios_uuid)
-        pvs_in_use += fetchAllInUsePhyVolumes(rest_conn, vios_uuid)
+        pvs_in_use += vios_pvs_in_use
         logger.debug(len(pv_xml_list))
         for each in pv_xml_list:
 
@@ -1001,13 +1006,15 @@ def fetch_virt_networks(rest_conn, system_uuid, virt_nw_config_list, max_slot_no
 
 def get_MS_names_by_lpar_name(hmc_obj, lpar_name):
     mss = hmc_obj.list_all_managed_system_details("name,state")
-    ms_list = []
+    operating_mss = []
     for ms in mss:
         ms_name, state = ms.split(',')
         if state == 'Operating':
-            lpar_names = hmc_obj.list_all_lpars_details(ms_name, "name")
-            if lpar_name in lpar_names:
-                ms_list.append(ms_name)
+            operating_mss.append(ms_name)
+    ms_list = []
+    for ms_name, lpar_names in zip(operating_mss, hmc_obj.list_lpars_details_of_systems(operating_mss, "name")):
+        if lpar_name in lpar_names:
+            ms_list.append(ms_name)
     return ms_list
 
 
@@ -1566,7 +1573,9 @@ def install_aix_os(module, params):
     vm_property = None
 
     hmc_conn = HmcCliConnection(module, hmc_host, hmc_user, password)
-    hmc = Hmc(hmc_conn)
+    # The wait for the partition to boot ends as soon as the HMC reports its change, when the event feed is enabled
+    rest_conn = event_rest_client(hmc_host, hmc_user, password)
+    hmc = Hmc(hmc_conn, rest_conn.waitForChange if rest_conn else None)
 
     if location_code and vm_mac:
         module.fail_json(msg="One of location_code/vm_mac should be specified to install AIX/Linux OS respectively")
@@ -1607,6 +1616,8 @@ def install_aix_os(module, params):
             module.fail_json(msg="AIX/Linux Installation failed even after waiting for " + str(timeout) + " mins and the reference code is " + ref_code)
     except HmcError as install_error:
         return False, repr(install_error), None
+    finally:
+        logoff_event_rest_client(rest_conn)
 
     return changed, vm_property, warn_msg
 
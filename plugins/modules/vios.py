@@ -219,6 +219,8 @@ from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_exceptions impor
 from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_exceptions import ParameterError
 from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_rest_client import parse_error_response
 from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_rest_client import HmcRestClient
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_rest_client import event_rest_client
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_rest_client import logoff_event_rest_client
 import sys
 import json
 
@@ -443,7 +445,9 @@ def installVios(module, params):
     timeout = params['timeout'] or 60
     validate_parameters(params)
     hmc_conn = HmcCliConnection(module, hmc_host, hmc_user, password)
-    hmc = Hmc(hmc_conn)
+    # The wait for the partition to boot ends as soon as the HMC reports its change, when the event feed is enabled
+    rest_conn = event_rest_client(hmc_host, hmc_user, password)
+    hmc = Hmc(hmc_conn, rest_conn.waitForChange if rest_conn else None)
     changed = False
     vios_property = None
     warn_msg = None
@@ -475,6 +479,8 @@ def installVios(module, params):
             module.fail_json(msg="VIOS Installation failed even after waiting for " + str(timeout) + " mins and the reference code is " + ref_code)
     except HmcError as install_error:
         return False, repr(install_error), None
+    finally:
+        logoff_event_rest_client(rest_conn)
 
     return changed, vios_property, warn_msg
 
@@ -343,9 +343,8 @@ def ensure_present(module, params):
 
     vios_name = attributes['vios_name'] or attributes['vios_id'] or attributes['vios_uuid']
     m_system = attributes['system']
-    sys_list = (
-        hmc_conn.execute("lssyscfg -r sys -F name").splitlines() + hmc_conn.execute("lssyscfg -r sys -F type_model*serial_num").splitlines()
-    )
+    sys_names, sys_mtms = hmc_conn.execute_many(["lssyscfg -r sys -F name", "lssyscfg -r sys -F type_model*serial_num"])
+    sys_list = sys_names.splitlines() + sys_mtms.splitlines()
     if m_system not in sys_list:
         module.fail_json(msg="The managed system is not available in HMC")
     else:
@@ -405,9 +404,8 @@ def ensure_restore(module, params):
     if attributes['types'] not in ['viosioconfig', 'ssp']:
         module.fail_json(msg="For restore the type can be either viosioconfig or ssp")
     m_system = attributes['system']
-    sys_list = (
-        hmc_conn.execute("lssyscfg -r sys -F name").splitlines() + hmc_conn.execute("lssyscfg -r sys -F type_model*serial_num").splitlines()
-    )
+    sys_names, sys_mtms = hmc_conn.execute_many(["lssyscfg -r sys -F name", "lssyscfg -r sys -F type_model*serial_num"])
+    sys_list = sys_names.splitlines() + sys_mtms.splitlines()
     if m_system not in sys_list:
         module.fail_json(msg="The managed system is not available in HMC")
     else:
@@ -457,9 +455,8 @@ def ensure_absent(module, params):
 
     vios_name = attributes['vios_name'] or attributes['vios_id'] or attributes['vios_uuid']
     m_system = attributes['system']
-    sys_list = (
-        hmc_conn.execute("lssyscfg -r sys -F name").splitlines() + hmc_conn.execute("lssyscfg -r sys -F type_model*serial_num").splitlines()
-    )
+    sys_names, sys_mtms = hmc_conn.execute_many(["lssyscfg -r sys -F name", "lssyscfg -r sys -F type_model*serial_num"])
+    sys_list = sys_names.splitlines() + sys_mtms.splitlines()
     if m_system not in sys_list:
         module.fail_json(msg="The managed system is not available in HMC")
     else:
@@ -516,9 +513,8 @@ def ensure_modify(module, params):
 
     vios_name = attributes['vios_name'] or attributes['vios_id'] or attributes['vios_uuid']
     m_system = attributes['system']
-    sys_list = (
-        hmc_conn.execute("lssyscfg -r sys -F name").splitlines() + hmc_conn.execute("lssyscfg -r sys -F type_model*serial_num").splitlines()
-    )
+    sys_names, sys_mtms = hmc_conn.execute_many(["lssyscfg -r sys -F name", "lssyscfg -r sys -F type_model*serial_num"])
+    sys_list = sys_names.splitlines() + sys_mtms.splitlines()
     if m_system not in sys_list:
         module.fail_json(msg="The managed system is not available in HMC")
     else:
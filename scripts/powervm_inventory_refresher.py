@@ -0,0 +1,40 @@
+"""
+Refresher of the snapshot of a powervm_inventory source, see the snapshot_path option of the plugin.
+
+Installs the Ansible collection loader over the collections path holding this collection, then runs
+the refresher of the plugin, which loads the plugin by name the way ansible-inventory does:
+
+    python <collection path>/scripts/powervm_inventory_refresher.py <inventory source> [--interval <seconds>] [--once]
+"""
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import os
+import sys
+
+
+def collections_path():
+    # Directory holding ansible_collections/ibm/power_hmc/scripts
+    return os.path.abspath(os.path.join(os.path.dirname(__file__), *[os.pardir] * 4))
+
+
+def init_collection_loader(paths):
+    try:
+        from ansible.plugins.loader import init_plugin_loader
+    except ImportError:
+        # ansible-core 2.14 has no init_plugin_loader, its CLIs install the collection finder themselves
+        from ansible import constants as C
+        from ansible.utils.collection_loader._collection_finder import _AnsibleCollectionFinder
+        _AnsibleCollectionFinder(paths=paths + list(C.COLLECTIONS_PATHS))._install()
+    else:
+        init_plugin_loader(paths)
+
+
+def main(argv=None):
+    init_collection_loader([collections_path()])
+    from ansible_collections.ibm.power_hmc.plugins.inventory.powervm_inventory import main as refresh
+    return refresh(argv)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""
+Time and memory benchmark of the advanced_fields parsing of the powervm_inventory plugin.
+
+Compares the former ElementTree load of the whole feed flattened by a recursive walk against
+the streamed entries flattened by the iterative get_tag_text of the plugin, on a synthetic
+LogicalPartition feed. Every variant runs in its own process, its RSS gets sampled while it parses the feed.
+Run from the directory holding ansible_collections:
+
+    python ansible_collections/ibm/power_hmc/tests/benchmark/bench_inventory.py [partitions]
+"""
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import xml.etree.ElementTree as ET
+
+from bench_xpath import lpar_feed
+from ansible_collections.ibm.power_hmc.plugins.inventory.powervm_inventory import InventoryModule
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_rest_client import iter_feed_entries
+
+VARIANTS = ('elementtree+recursive', 'streamed+iterative')
+
+
+def recursive_tag_text(e):
+    # get_tag_text as it was before the iterative walk
+    lpar_data = {}
+    for child in e:
+        if child.text is None or child.text.strip() == "":
+            lpar_data.update(recursive_tag_text(child))
+        else:
+            tag = child.tag.split("}")[-1]
+            lpar_data[tag] = child.text
+    return lpar_data
+
+
+def parse_elementtree(feed):
+    root = ET.fromstring(feed)
+    return [recursive_tag_text(entry) for entry in root.findall("{http://www.w3.org/2005/Atom}entry")]
+
+
+def parse_streamed(feed):
+    inventory = InventoryModule()
+    return [inventory.get_tag_text(entry) for entry in iter_feed_entries(feed, strip_namespaces=False)]
+
+
+def current_rss():
+    # Resident set size in KB, read from procfs as ru_maxrss also covers the imports of the benchmark
+    with open('/proc/self/statm') as statm:
+        return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+
+
+class RssSampler(threading.Thread):
+    def __init__(self):
+        super(RssSampler, self).__init__()
+        self.peak = current_rss()
+        self.done = threading.Event()
+
+    def run(self):
+        while not self.done.wait(0.001):
+            self.peak = max(self.peak, current_rss())
+
+
+def run_variant(variant, feed_path, partitions):
+    # The feed is built by the parent process, building it here would raise the peak RSS before parsing
+    with open(feed_path, 'rb') as feed_file:
+        feed = feed_file.read()
+    parse = parse_elementtree if variant == VARIANTS[0] else parse_streamed
+    rss_before = current_rss()
+    sampler = RssSampler()
+    sampler.start()
+    start = time.perf_counter()
+    lpars = parse(feed)
+    elapsed = time.perf_counter() - start
+    sampler.done.set()
+    sampler.join()
+    assert len(lpars) == partitions
+    print(f"{elapsed} {max(sampler.peak, current_rss()) - rss_before} {current_rss() - rss_before}")
+
+
+def main():
+    if len(sys.argv) > 2 and sys.argv[1] == '--variant':
+        run_variant(sys.argv[2], sys.argv[3], int(sys.argv[4]))
+        return
+    partitions = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    with tempfile.NamedTemporaryFile(suffix='.xml') as feed_file:
+        feed_file.write(lpar_feed(partitions))
+        feed_file.flush()
+        print(f"LogicalPartition feed of {partitions} partitions, {os.path.getsize(feed_file.name) // 1024} KB")
+        print(f"{'':<24} {'time':>10} {'peak RSS growth':>16} {'retained RSS':>16}")
+        for variant in VARIANTS:
+            command = [sys.executable, os.path.abspath(__file__), '--variant', variant, feed_file.name, str(partitions)]
+            elapsed, peak_growth, retained = subprocess.check_output(command).decode().split()
+            print(f"{variant:<24} {float(elapsed) * 1000:>7.0f} ms {int(peak_growth) / 1024.0:>13.1f} MB {int(retained) / 1024.0:>13.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+Microbenchmark of the response parsing paths of HmcRestClient.
+
+Compares the namespace strip pass plus ad-hoc xpath() string queries against
+the precompiled XPath registry on payloads shaped like the HMC responses.
+Run from the directory holding ansible_collections:
+
+    python ansible_collections/ibm/power_hmc/tests/benchmark/bench_xpath.py [partitions]
+"""
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import sys
+import timeit
+
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_rest_client import xml_strip_namespace
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_xpath import compiled_xpath
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_xpath import parse_xml
+from ansible_collections.ibm.power_hmc.plugins.module_utils import hmc_xpath
+
+UOM_NS = 'http://www.ibm.com/xmlns/systems/power/firmware/uom/mc/2012_10/'
+WEB_NS = 'http://www.ibm.com/xmlns/systems/power/firmware/web/mc/2012_10/'
+
+LPAR_ENTRY = '''<entry><id>{0}</id><title type="text">LogicalPartition</title>
+<content type="application/vnd.ibm.powervm.uom+xml; type=LogicalPartition">
+<LogicalPartition:LogicalPartition xmlns:LogicalPartition="{ns}" xmlns="{ns}" schemaVersion="V1_0">
+<Metadata><Atom><AtomID>{0}</AtomID><AtomCreated>1600000000000</AtomCreated></Atom></Metadata>
+<PartitionID kb="COD" kxe="false">{1}</PartitionID><PartitionName kb="CUR" kxe="false">lpar{1}</PartitionName>
+<PartitionState kb="ROO" kxe="false">running</PartitionState><PartitionType kb="COD" kxe="false">AIX/Linux</PartitionType>
+<PartitionMemoryConfiguration kb="CUD" kxe="false" schemaVersion="V1_0"><Metadata><Atom/></Metadata>
+<DesiredMemory kb="CUD" kxe="false">8192</DesiredMemory><MaximumMemory kb="CUD" kxe="false">16384</MaximumMemory>
+<MinimumMemory kb="CUD" kxe="false">2048</MinimumMemory></PartitionMemoryConfiguration>
+<PartitionProcessorConfiguration kb="CUD" kxe="false" schemaVersion="V1_0"><Metadata><Atom/></Metadata>
+<HasDedicatedProcessors kb="CUD" kxe="false">false</HasDedicatedProcessors>
+<SharedProcessorConfiguration kb="CUD" kxe="false" schemaVersion="V1_0"><Metadata><Atom/></Metadata>
+<DesiredProcessingUnits kb="CUD" kxe="false">0.5</DesiredProcessingUnits>
+<DesiredVirtualProcessors kb="CUD" kxe="false">2</DesiredVirtualProcessors></SharedProcessorConfiguration>
+</PartitionProcessorConfiguration>
+<ResourceMonitoringIPAddress kb="ROO" kxe="false">10.0.{2}.{3}</ResourceMonitoringIPAddress>
+</LogicalPartition:LogicalPartition></content></entry>'''
+
+JOB_STATUS = '''<entry xmlns="http://www.w3.org/2005/Atom"><content type="application/vnd.ibm.powervm.web+xml; type=JobResponse">
+<JobResponse:JobResponse xmlns:JobResponse="{ns}" xmlns="{ns}" schemaVersion="V1_0">
+<Metadata><Atom/></Metadata><RequestURL kb="ROR" kxe="false" href="LogicalPartition/1234/do/PowerOn" rel="via" title="PowerOn"/>
+<TargetUuid kb="ROR" kxe="false">1234</TargetUuid><JobID kb="ROR" kxe="false">1600000000001</JobID>
+<TimeStarted kb="ROR" kxe="false">1600000000000</TimeStarted><Status kxe="false" kb="ROR">RUNNING</Status>
+<JobRequestInstance kb="ROR" kxe="false" schemaVersion="V1_0"><Metadata><Atom/></Metadata>
+<RequestedOperation kb="CUR" kxe="false" schemaVersion="V1_0"><Metadata><Atom/></Metadata>
+<OperationName kb="ROR" kxe="false">PowerOn</OperationName><GroupName kb="ROR" kxe="false">LogicalPartition</GroupName>
+</RequestedOperation></JobRequestInstance></JobResponse:JobResponse></content></entry>'''
+
+LPAR_LOOKUPS = ['//PartitionID', '//PartitionName', '//PartitionState', '//HasDedicatedProcessors',
+                '//SharedProcessorConfiguration/DesiredVirtualProcessors', '//PartitionMemoryConfiguration/DesiredMemory']
+
+
+def lpar_feed(count):
+    entries = ''.join(LPAR_ENTRY.format(f'uuid-{i}', i, i // 250, i % 250, ns=UOM_NS) for i in range(count))
+    return f'<feed xmlns="http://www.w3.org/2005/Atom">{entries}</feed>'.encode()
+
+
+def report(name, old, new, number):
+    old_time = min(timeit.repeat(old, number=number, repeat=3)) / number
+    new_time = min(timeit.repeat(new, number=number, repeat=3)) / number
+    print(f"{name:<40} {old_time * 1000:>10.3f} ms {new_time * 1000:>10.3f} ms {old_time / new_time:>7.1f}x")
+
+
+def main():
+    partitions = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    feed = lpar_feed(partitions)
+    job = JOB_STATUS.format(ns=WEB_NS).encode()
+    print(f"LogicalPartition feed of {partitions} partitions, {len(feed) // 1024} KB")
+    print(f"{'':<40} {'strip+xpath':>13} {'precompiled':>13} {'speedup':>8}")
+
+    def job_status_old():
+        doc = xml_strip_namespace(job)
+        return doc.xpath('//Status')[0].text
+
+    def job_status_new():
+        return hmc_xpath.JOB_STATUS(parse_xml(job))[0]
+
+    report('job status poll', job_status_old, job_status_new, 2000)
+
+    # getLogicalPartition hands out one document per partition
+    partitions_dom = [xml_strip_namespace(LPAR_ENTRY.format(f'uuid-{i}', i, 0, i, ns=UOM_NS).encode()) for i in range(partitions)]
+
+    def lookups_old():
+        return [partition.xpath(expr) for partition in partitions_dom for expr in LPAR_LOOKUPS]
+
+    def lookups_new():
+        return [compiled_xpath(expr)(partition) for partition in partitions_dom for expr in LPAR_LOOKUPS]
+
+    report('partition field lookups', lookups_old, lookups_new, 20)
+
+    def feed_old():
+        doc = xml_strip_namespace(feed)
+        return [partition.xpath('PartitionName')[0].text for partition in doc.xpath('//LogicalPartition')]
+
+    def feed_new():
+        doc = parse_xml(feed)
+        return [str(name) for name in compiled_xpath('//uom:LogicalPartition/uom:PartitionName/text()')(doc)]
+
+    report('feed parse and scan', feed_old, feed_new, 3)
+
+
+if __name__ == '__main__':
+    main()
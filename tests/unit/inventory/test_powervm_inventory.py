@@ -0,0 +1,466 @@
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+import yaml
+
+from ansible import constants as C
+from ansible.inventory.data import InventoryData
+from ansible.parsing.dataloader import DataLoader
+from ansible.plugins import loader as loader_module
+from ansible.plugins.loader import fragment_loader
+from ansible.utils.plugin_docs import get_docstring
+import ansible.module_utils.six.moves.urllib.error as urllib_error
+from ansible_collections.ibm.power_hmc.plugins.inventory import powervm_inventory
+from ansible_collections.ibm.power_hmc.plugins.inventory.powervm_inventory import InventoryModule
+
+UOM_NS = 'http://www.ibm.com/xmlns/systems/power/firmware/uom/mc/2012_10/'
+PARTITION_TYPES = ('AIX/Linux', 'OS400', 'AIX/Linux', 'AIX/Linux')
+MEMORY_SIZES = (2048, 4096, 8192)
+
+
+def make_partitions(system, count, partition_type=None):
+    partitions = []
+    for index in range(count):
+        partitions.append({
+            'UUID': '{0}-{1}'.format(system, index),
+            'PartitionName': '{0}-lpar{1}'.format(system, index),
+            'PartitionType': partition_type or PARTITION_TYPES[index % len(PARTITION_TYPES)],
+            'PartitionState': 'not activated' if index % 5 == 4 else 'running',
+            'CurrentMemory': MEMORY_SIZES[index % len(MEMORY_SIZES)],
+            'ResourceMonitoringIPAddress': '10.1.{0}.{1}'.format(system[-1], index),
+            'ProcessorMode': 'shared',
+            'ProcessorCompatibilityMode': 'POWER9',
+            'OperatingSystemVersion': 'AIX 7.3',
+        })
+    return partitions
+
+
+def partitions_feed(kind):
+    # Renders partitions as the Atom feed of the full XML API
+    def render(partitions):
+        entries = ''.join(
+            '<entry><id>{0}</id><content type="application/vnd.ibm.powervm.uom+xml; type={1}"><{1}:{1} xmlns:{1}="{2}" xmlns="{2}">'
+            '{3}</{1}:{1}></content></entry>'.format(partition['UUID'], kind, UOM_NS,
+                                                     ''.join('<{0}>{1}</{0}>'.format(key, value) for key, value in partition.items()))
+            for partition in partitions)
+        return '<feed xmlns="http://www.w3.org/2005/Atom">{0}</feed>'.format(entries).encode()
+    return render
+
+
+class FakeHmc:
+    """
+    HMC answering the quick REST API requests of the inventory plugin, it records the requests
+    and the highest number of partition requests in flight at a time
+    """
+    def __init__(self, system_uuids=('ms1', 'ms2')):
+        self.systems = [{'UUID': uuid, 'SystemName': 'sys' + uuid[2:], 'IPAddress': '10.0.0.' + uuid[2:], 'State': 'operating'}
+                        for uuid in system_uuids]
+        self.lpars = dict((uuid, make_partitions(uuid, 30 if uuid == 'ms1' else 12)) for uuid in system_uuids)
+        self.vios = dict((uuid, make_partitions(uuid + 'v', 2, 'Virtual IO Server') if uuid == 'ms1' else []) for uuid in system_uuids)
+        self.tagged_groups = {'ms1-0': ['prod'], 'ms1-3': ['prod', 'web'], 'ms1': ['prod']}
+        self.requests = []
+        self.logons = 0
+        self.logoffs = 0
+        self.unreachable = False
+        self.failing_systems = set()
+        self.delay = 0
+        self.systems_barrier = None
+        self.peak = 0
+        self._running = 0
+        self._lock = threading.Lock()
+
+    def client(self, hmc_ip, username, password, pool_size=None):
+        if self.unreachable:
+            raise urllib_error.URLError('[Errno 113] No route to host')
+        self.logons += 1
+        return FakeRestClient(self)
+
+    def partitions(self, kind, system_uuid, partitions, render=json.dumps):
+        with self._lock:
+            self.requests.append((kind, system_uuid))
+            self._running += 1
+            self.peak = max(self.peak, self._running)
+        try:
+            time.sleep(self.delay)
+            if system_uuid in self.failing_systems:
+                raise urllib_error.URLError('timed out')
+            return render(partitions[system_uuid])
+        finally:
+            with self._lock:
+                self._running -= 1
+
+
+class FakeRestClient:
+    def __init__(self, hmc):
+        self.hmc = hmc
+
+    def logoff(self):
+        self.hmc.logoffs += 1
+
+    def getManagedSystemsQuick(self):
+        self.hmc.requests.append(('ManagedSystem', None))
+        if self.hmc.systems_barrier:
+            self.hmc.systems_barrier.wait()
+        return json.dumps(self.hmc.systems)
+
+    def fetchTaggedGroupItems(self):
+        return dict((uuid, list(groups)) for uuid, groups in self.hmc.tagged_groups.items())
+
+    def getLogicalPartitionsQuick(self, system_uuid):
+        return self.hmc.partitions('LogicalPartition', system_uuid, self.hmc.lpars)
+
+    def getVirtualIOServersQuick(self, system_uuid):
+        return self.hmc.partitions('VirtualIOServer', system_uuid, self.hmc.vios)
+
+    def getLogicalPartitions(self, system_uuid, stream=False):
+        feed = self.hmc.partitions('LogicalPartitionAdvanced', system_uuid, self.hmc.lpars, partitions_feed('LogicalPartition'))
+        return streamed(feed) if stream else feed
+
+    def getVirtualIOServers(self, system_uuid, group='Advanced', stream=False):
+        feed = self.hmc.partitions('VirtualIOServerAdvanced', system_uuid, self.hmc.vios, partitions_feed('VirtualIOServer'))
+        return streamed(feed) if stream else feed
+
+
+def streamed(feed, chunk_size=64):
+    # Chunks of the feed the way HmcConnectionPool.stream yields them
+    return iter([feed[i:i + chunk_size] for i in range(0, len(feed), chunk_size)])
+
+
+@pytest.fixture(scope='module', autouse=True)
+def plugin_options():
+    # Done by the plugin loader when the plugin gets loaded by name
+    doc = get_docstring(powervm_inventory.__file__, fragment_loader)[0]
+    C.config.initialize_plugin_configuration_definitions('inventory', InventoryModule.NAME, doc['options'])
+
+
+@pytest.fixture
+def hmc(mocker):
+    fake_hmc = FakeHmc()
+    mocker.patch.object(powervm_inventory, 'HmcRestClient', side_effect=fake_hmc.client)
+    return fake_hmc
+
+
+def write_source(tmp_path, **config):
+    source = tmp_path / 'test.power_hmc.yml'
+    config = dict({'plugin': InventoryModule.NAME, 'hmc_hosts': [{'hmc': 'hmc1', 'user': 'hscroot', 'password': 'passw0rd'}]}, **config)
+    source.write_text(yaml.safe_dump(config))
+    return str(source)
+
+
+def load_plugin(name=InventoryModule.NAME):
+    # Instance the plugin loader would return
+    plugin = InventoryModule()
+    plugin._load_name = name
+    return plugin
+
+
+def parse(source, cache=True, memoize=True):
+    plugin = load_plugin()
+    if not memoize:
+        # Every expression is then evaluated by Constructable as is
+        plugin.memoized = lambda expression, variables, evaluate: evaluate()
+    inventory = InventoryData()
+    plugin.parse(inventory, DataLoader(), source, cache=cache)
+    if hasattr(plugin, '_cache'):
+        # Done by the inventory manager once the source got parsed
+        plugin.update_cache_if_changed()
+    return plugin, inventory
+
+
+def summary(inventory, skipped=()):
+    # Groups and host variables of the inventory, but the skipped ones
+    groups = dict((name, sorted(host.name for host in group.hosts)) for name, group in inventory.groups.items() if name not in skipped)
+    hostvars = dict((name, dict((key, value) for key, value in host.vars.items() if key not in skipped))
+                    for name, host in inventory.hosts.items())
+    return groups, hostvars
+
+
+CONSTRUCTED = {
+    'compose': {'memory_gb': 'CurrentMemory // 1024', 'nodes': "[PartitionName, SystemName]",
+                'rand': 'range(1000) | ansible.builtin.random', 'label': "'%s/%s' % (SystemName, PartitionType)"},
+    'groups': {'large': 'CurrentMemory > 4096', 'tagged_prod': "'prod' in AssociatedGroups",
+               'first_of_sys1': "inventory_hostname.endswith('-lpar1')", 'lucky': '(range(2) | random) == 1'},
+    'keyed_groups': [{'key': 'PartitionType', 'prefix': 'type'}, {'key': 'memory_gb', 'prefix': 'memory'}],
+    'system_compose': {'state': 'State | upper'},
+    'system_groups': {'operating': "State == 'operating'"},
+    'group_lpars_by_managed_system': False,
+}
+
+
+@pytest.mark.parametrize('expression, inputs', [
+    ('CurrentMemory > 4096', ('CurrentMemory',)),
+    ("[PartitionName, SystemName] | join('-')", ('PartitionName', 'SystemName')),
+    ('range(10) | random', None),
+    ('range(10) | ansible.builtin.random', None),
+    ('PartitionName | community.general.random_mac', None),
+    ("lookup('env', 'HOME')", None),
+    ('CurrentMemory >', None),
+])
+def test_memoizable_inputs(expression, inputs):
+    assert powervm_inventory.memoizable_inputs(expression) == inputs
+
+
+def test_constructed_inventory_matches_plain_constructable(tmp_path, hmc):
+    source = write_source(tmp_path, **CONSTRUCTED)
+    memoized_plugin, memoized = parse(source)
+    dummy, plain = parse(source, memoize=False)
+
+    assert summary(memoized, ('rand', 'lucky')) == summary(plain, ('rand', 'lucky'))
+    groups, hostvars = summary(memoized)
+    assert groups['tagged_prod'] == ['ms1-lpar0', 'ms1-lpar3']
+    assert groups['operating'] == ['sys1', 'sys2']
+    assert hostvars['ms1-lpar2']['label'] == 'sys1/AIX/Linux'
+    # Random filters are evaluated for every host
+    assert len(set(host['rand'] for host in hostvars.values() if 'rand' in host)) > 1
+    assert 0 < len(groups['lucky']) < len(hostvars) - 2
+    # Hosts do not share mutable variables
+    assert memoized.get_host('ms1-lpar0').vars['nodes'] is not memoized.get_host('ms1-lpar4').vars['nodes']
+    assert memoized_plugin.expression_inputs['CurrentMemory > 4096'] == ('CurrentMemory',)
+
+
+def test_per_host_expressions_are_not_memoized(tmp_path, hmc, mocker):
+    mocker.patch.object(powervm_inventory, 'MEMO_PROBE_SIZE', 8)
+    plugin, inventory = parse(write_source(tmp_path, **CONSTRUCTED))
+
+    assert plugin.expression_inputs["inventory_hostname.endswith('-lpar1')"] is None
+    assert plugin.expression_inputs['[PartitionName, SystemName]'] is None
+    assert plugin.expression_inputs['CurrentMemory // 1024'] == ('CurrentMemory',)
+    assert len(plugin.expression_results['CurrentMemory // 1024']) == len(MEMORY_SIZES)
+    assert inventory.get_host('ms2-lpar1') in inventory.groups['first_of_sys1'].hosts
+
+
+def test_snapshot_is_written_and_served(tmp_path, hmc, monkeypatch):
+    monkeypatch.setenv('POWERVM_TEST_HMC', 'hmc1')
+    snapshot_path = str(tmp_path / 'snapshot.json')
+    hmc_hosts = [{'hmc': "{{ lookup('env', 'POWERVM_TEST_HMC') }}", 'user': 'hscroot', 'password': 'passw0rd'}]
+    source = write_source(tmp_path, hmc_hosts=hmc_hosts, snapshot_path=snapshot_path, hostvar_fields=['ProcessorMode'])
+    dummy, fetched = parse(source)
+    with open(snapshot_path) as snapshot_file:
+        snapshot = json.load(snapshot_file)
+    assert snapshot['hmc_hosts'] == ['hmc1']
+    assert sorted(snapshot['digests']['hmc1']) == ['ms1', 'ms2']
+    assert [system['SystemName'] for system in snapshot['systems']] == ['sys1', 'sys2']
+
+    hmc.requests = []
+    dummy, served = parse(source)
+    assert hmc.requests == []
+    assert summary(served) == summary(fetched)
+
+
+def test_stale_or_mismatching_snapshot_is_not_served(tmp_path, hmc):
+    snapshot_path = str(tmp_path / 'snapshot.json')
+    parse(write_source(tmp_path, snapshot_path=snapshot_path, snapshot_max_age=60))
+
+    hmc.requests = []
+    parse(write_source(tmp_path, snapshot_path=snapshot_path, snapshot_max_age=60, hostvar_fields=['ProcessorMode']))
+    assert ('ManagedSystem', None) in hmc.requests
+
+    hmc.requests = []
+    with open(snapshot_path) as snapshot_file:
+        snapshot = json.load(snapshot_file)
+    snapshot['generated'] = time.time() - 120
+    with open(snapshot_path, 'w') as snapshot_file:
+        json.dump(snapshot, snapshot_file)
+    parse(write_source(tmp_path, snapshot_path=snapshot_path, snapshot_max_age=60, hostvar_fields=['ProcessorMode']))
+    assert ('ManagedSystem', None) in hmc.requests
+
+
+def test_refresher_updates_the_snapshot_incrementally(tmp_path, hmc, mocker):
+    mocker.patch.object(powervm_inventory, 'inventory_loader').get.side_effect = load_plugin
+    snapshot_path = str(tmp_path / 'snapshot.json')
+    source = write_source(tmp_path, snapshot_path=snapshot_path, incremental_refresh=True, advanced_fields=True)
+    assert powervm_inventory.main([source, '--once']) == 0
+    assert fetched_systems(hmc, advanced=True) == ['ms1', 'ms2']
+
+    hmc.requests = []
+    hmc.lpars['ms2'] = hmc.lpars['ms2'][:3]
+    assert powervm_inventory.main([source, '--once']) == 0
+    assert fetched_systems(hmc, advanced=True) == ['ms2']
+    with open(snapshot_path) as snapshot_file:
+        snapshot = json.load(snapshot_file)
+    assert [len(system['lpars']) for system in snapshot['systems']] == [32, 3]
+    assert hmc.logons == hmc.logoffs == 2
+
+
+def test_failed_refresh_keeps_the_snapshot(tmp_path, hmc, mocker):
+    mocker.patch.object(powervm_inventory, 'inventory_loader').get.side_effect = load_plugin
+    snapshot_path = str(tmp_path / 'snapshot.json')
+    source = write_source(tmp_path, snapshot_path=snapshot_path)
+    assert powervm_inventory.main([source, '--once']) == 0
+    with open(snapshot_path) as snapshot_file:
+        snapshot = snapshot_file.read()
+
+    hmc.systems = []
+    assert powervm_inventory.main([source, '--once']) == 1
+    with open(snapshot_path) as snapshot_file:
+        assert snapshot_file.read() == snapshot
+    assert powervm_inventory.main([write_source(tmp_path), '--once']) == 1
+
+
+def test_refresher_updates_the_inventory_cache(tmp_path, hmc, mocker):
+    mocker.patch.object(powervm_inventory, 'inventory_loader').get.side_effect = load_plugin
+    snapshot_path = tmp_path / 'snapshot.json'
+    source = write_source(tmp_path, snapshot_path=str(snapshot_path), cache=True, cache_plugin='jsonfile',
+                          cache_connection=str(tmp_path / 'cache'))
+    assert powervm_inventory.main([source, '--once']) == 0
+
+    # Served from the inventory cache once the snapshot is gone
+    snapshot_path.unlink()
+    hmc.requests = []
+    dummy, inventory = parse(source)
+    assert hmc.requests == []
+    assert summary(inventory) == summary(parse(source, cache=False)[1])
+
+
+def load_refresher_script():
+    path = os.path.join(os.path.dirname(powervm_inventory.__file__), os.pardir, os.pardir, 'scripts', 'powervm_inventory_refresher.py')
+    spec = importlib.util.spec_from_file_location('powervm_inventory_refresher', path)
+    script = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(script)
+    return script
+
+
+def test_refresher_script_loads_the_plugin_by_name(tmp_path):
+    # Nothing listens on the port, the refresh fails once the plugin got loaded through the collection loader
+    source = write_source(tmp_path, snapshot_path=str(tmp_path / 'snapshot.json'),
+                          hmc_hosts=[{'hmc': '127.0.0.1:1', 'user': 'hscroot', 'password': 'passw0rd'}])
+    result = subprocess.run([sys.executable, load_refresher_script().__file__, source, '--once'], stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE, universal_newlines=True, timeout=60)
+    assert result.returncode == 1
+    assert 'Snapshot of %s could not be refreshed: There are no systems' % source in result.stderr
+
+
+def test_refresher_script_installs_the_collection_finder_of_ansible_2_14(mocker, monkeypatch):
+    script = load_refresher_script()
+    monkeypatch.delattr(loader_module, 'init_plugin_loader', raising=False)
+    finder = mocker.patch('ansible.utils.collection_loader._collection_finder._AnsibleCollectionFinder')
+
+    script.init_collection_loader(['/collections'])
+    finder.assert_called_once_with(paths=['/collections'] + list(C.COLLECTIONS_PATHS))
+    finder.return_value._install.assert_called_once_with()
+
+
+def fetched_systems(hmc, advanced=False):
+    # Systems whose partitions got fetched, through the full XML API with advanced
+    return sorted(set(system for kind, system in hmc.requests if kind != 'ManagedSystem' and kind.endswith('Advanced') == advanced))
+
+
+def test_hmcs_are_queried_in_parallel_and_merged_in_order(tmp_path, hmc, mocker):
+    hmcs = {'hmc1': hmc, 'hmc2': FakeHmc(('ms3',)), 'hmc3': FakeHmc(('ms4',))}
+    hmcs['hmc3'].unreachable = True
+    # Both HMCs are answered only once both got asked, which times out when they are queried one after the other
+    hmc.systems_barrier = hmcs['hmc2'].systems_barrier = threading.Barrier(2, timeout=5)
+    mocker.patch.object(powervm_inventory, 'HmcRestClient', side_effect=lambda hmc_ip, *args, **kwargs: hmcs[hmc_ip].client(hmc_ip, *args, **kwargs))
+    hmc_hosts = [{'hmc': name, 'user': 'hscroot', 'password': 'passw0rd'} for name in sorted(hmcs)]
+    dummy, inventory = parse(write_source(tmp_path, hmc_hosts=hmc_hosts, max_concurrency=3))
+
+    assert [name for name in inventory.groups if name.startswith('sys')] == ['sys1', 'sys2', 'sys3']
+    assert inventory.get_host('ms3-lpar0').vars['ansible_host'] == '10.1.3.0'
+    assert (hmc.logons, hmc.logoffs) == (1, 1)
+
+
+def test_partitions_of_an_hmc_are_fetched_concurrently(tmp_path, hmc):
+    hmc.delay = 0.1
+    hmc.failing_systems.add('ms2')
+    plugin, inventory = parse(write_source(tmp_path, system_concurrency=2))
+
+    assert hmc.peak == 2
+    assert fetched_systems(hmc) == ['ms1', 'ms2']
+    assert 'ms1-lpar0' in inventory.hosts and 'ms2-lpar0' not in inventory.hosts
+    # The partitions of ms2 are fetched again on the next refresh
+    assert list(plugin.system_digests['hmc1']) == ['ms1']
+
+
+def test_inventory_cache_is_served_without_hmc_requests(tmp_path, hmc):
+    cache = dict(cache=True, cache_plugin='jsonfile', cache_connection=str(tmp_path / 'cache'))
+    source = write_source(tmp_path, **cache)
+    dummy, fetched = parse(source)
+    assert fetched_systems(hmc) == ['ms1', 'ms2']
+
+    hmc.requests = []
+    dummy, cached = parse(source)
+    assert hmc.requests == []
+    assert summary(cached) == summary(fetched)
+
+    # A refresh (meta: refresh_inventory) queries the HMCs and updates the cache
+    hmc.lpars['ms2'] = hmc.lpars['ms2'][:1]
+    dummy, refreshed = parse(source, cache=False)
+    assert fetched_systems(hmc) == ['ms1', 'ms2']
+    hmc.requests = []
+    dummy, cached = parse(source)
+    assert hmc.requests == []
+    assert 'ms2-lpar0' in cached.hosts and 'ms2-lpar1' not in cached.hosts
+
+    # The partitions were cached with other hostvar_fields
+    parse(write_source(tmp_path, hostvar_fields=['ProcessorMode'], **cache))
+    assert fetched_systems(hmc) == ['ms1', 'ms2']
+
+
+def test_incremental_refresh_fetches_the_changed_systems(tmp_path, hmc):
+    cache = dict(cache=True, cache_plugin='jsonfile', cache_connection=str(tmp_path / 'cache'), incremental_refresh=True,
+                 advanced_fields=True, groups={'tagged_prod': "'prod' in AssociatedGroups"})
+    source = write_source(tmp_path, **cache)
+    parse(source)
+    assert fetched_systems(hmc, advanced=True) == ['ms1', 'ms2']
+
+    # Unchanged systems keep their cached partitions, the tagged groups are fetched again
+    hmc.requests = []
+    hmc.tagged_groups['ms1-1'] = ['prod']
+    dummy, inventory = parse(source)
+    assert fetched_systems(hmc) == ['ms1', 'ms2']
+    assert fetched_systems(hmc, advanced=True) == []
+    assert sorted(host.name for host in inventory.groups['tagged_prod'].hosts) == ['ms1-lpar0', 'ms1-lpar1', 'ms1-lpar3']
+
+    # Changed system
+    hmc.requests = []
+    hmc.systems[1]['State'] = 'standby'
+    dummy, inventory = parse(source)
+    assert fetched_systems(hmc, advanced=True) == ['ms2']
+
+    # New inactive partition and renamed partition, the properties of their system are left untouched
+    hmc.requests = []
+    hmc.lpars['ms2'].append(dict(make_partitions('ms2', 13)[12], PartitionState='not activated'))
+    dummy, inventory = parse(source)
+    assert fetched_systems(hmc, advanced=True) == ['ms2']
+    assert inventory.get_host('ms2-lpar12') is not None
+    hmc.requests = []
+    hmc.lpars['ms1'][2]['PartitionName'] = 'renamed'
+    dummy, inventory = parse(source)
+    assert fetched_systems(hmc, advanced=True) == ['ms1']
+    assert 'renamed' in inventory.hosts and 'ms1-lpar2' not in inventory.hosts
+
+    # Removed system
+    hmc.requests = []
+    del hmc.systems[0]
+    dummy, inventory = parse(source)
+    assert fetched_systems(hmc, advanced=True) == []
+    assert 'ms1-lpar0' not in inventory.hosts and 'ms2-lpar12' in inventory.hosts
+
+    # Digests of the cached systems were computed with other settings
+    hmc.requests = []
+    hmc.systems = FakeHmc().systems
+    parse(write_source(tmp_path, hostvar_fields=['ProcessorMode'], **cache))
+    assert fetched_systems(hmc, advanced=True) == ['ms1', 'ms2']
+
+
+def test_hostvar_fields_keep_the_used_properties(tmp_path, hmc):
+    source = write_source(tmp_path, hostvar_fields=['Processor*'], compose={'memory_gb': 'CurrentMemory // 1024'},
+                          filters={'PartitionState': 'running'}, keyed_groups=[{'key': 'SystemName', 'prefix': 'on'}])
+    plugin, inventory = parse(source)
+    assert inventory.get_host('ms1-lpar1').vars['memory_gb'] == 4
+    assert 'ms1-lpar4' not in inventory.hosts
+    assert len(inventory.groups['on_sys1'].hosts) == 26
+
+    lpar = plugin.get_systems(source)[0]['lpars'][0]
+    assert sorted(lpar) == ['AssociatedGroups', 'AssociatedHMC', 'AssociatedHMCUserName', 'CurrentMemory', 'PartitionName',
+                            'PartitionState', 'PartitionType', 'ProcessorCompatibilityMode', 'ProcessorMode',
+                            'ResourceMonitoringIPAddress', 'SystemName', 'UUID']
@@ -0,0 +1,108 @@
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import io
+
+import pytest
+
+from ansible import constants as C
+from ansible.errors import AnsibleLookupError
+from ansible.plugins.loader import fragment_loader
+from ansible.utils.plugin_docs import get_docstring
+import ansible.module_utils.six.moves.urllib.error as urllib_error
+from ansible_collections.ibm.power_hmc.plugins.lookup import powervm_advanced
+from ansible_collections.ibm.power_hmc.plugins.lookup.powervm_advanced import LookupModule
+from ansible_collections.ibm.power_hmc.plugins.module_utils import hmc_rest_client
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_connection_pool import HmcResponse
+
+LOOKUP_NAME = 'ibm.power_hmc.powervm_advanced'
+HMC_AUTH = {'username': 'hscroot', 'password': 'passw0rd'}
+LOGON_RESPONSE = b'''<LogonResponse xmlns="http://www.ibm.com/xmlns/systems/power/firmware/web/mc/2012_10/" schemaVersion="V1_0">
+<X-API-Session kb="ROR" kxe="false">session1</X-API-Session></LogonResponse>'''
+PARTITION = '''<entry xmlns="http://www.w3.org/2005/Atom"><id>{0}</id>
+<content type="application/vnd.ibm.powervm.uom+xml; type=LogicalPartition">
+<LogicalPartition:LogicalPartition xmlns:LogicalPartition="http://www.ibm.com/xmlns/systems/power/firmware/uom/mc/2012_10/"
+ xmlns="http://www.ibm.com/xmlns/systems/power/firmware/uom/mc/2012_10/" schemaVersion="V1_0">
+<PartitionName kb="CUR" kxe="false">{1}</PartitionName><PartitionUUID kb="ROO" kxe="false">{0}</PartitionUUID>
+<PartitionProcessorConfiguration kb="CUD" kxe="false" schemaVersion="V1_0">
+<CurrentProcessors kb="ROR" kxe="false">2</CurrentProcessors></PartitionProcessorConfiguration>
+</LogicalPartition:LogicalPartition></content></entry>'''
+PARTITIONS = {'uuid1': 'lpar1', 'uuid2': 'lpar2'}
+
+
+class FakePool:
+    def __init__(self, unreachable=False):
+        self.unreachable = unreachable
+        self.requests = []
+
+    def request(self, method, url, headers=None, data=None, timeout=300):
+        self.requests.append((method, url.split('/rest/api/')[1]))
+        if self.unreachable:
+            raise urllib_error.URLError('[Errno 113] No route to host')
+        if url.endswith('/rest/api/web/Logon'):
+            if method == 'PUT':
+                return HmcResponse(url, 200, 'OK', {}, LOGON_RESPONSE)
+            return HmcResponse(url, 204, 'No Content', {}, b'')
+        partition_uuid = url.split('?')[0].split('/')[-1]
+        if partition_uuid not in PARTITIONS:
+            raise urllib_error.HTTPError(url, 404, 'Not Found', {}, io.BytesIO(b''))
+        return HmcResponse(url, 200, 'OK', {}, PARTITION.format(partition_uuid, PARTITIONS[partition_uuid]).encode())
+
+    def logons(self):
+        return [method for method, path in self.requests if path == 'web/Logon']
+
+
+@pytest.fixture(scope='module', autouse=True)
+def plugin_options():
+    # Done by the plugin loader when the plugin gets loaded by name
+    doc = get_docstring(powervm_advanced.__file__, fragment_loader)[0]
+    C.config.initialize_plugin_configuration_definitions('lookup', LOOKUP_NAME, doc['options'])
+
+
+@pytest.fixture
+def memo_dir(tmp_path, mocker):
+    mocker.patch.object(powervm_advanced.C, 'DEFAULT_LOCAL_TMP', str(tmp_path))
+    mocker.patch.dict(powervm_advanced._fetched, clear=True)
+    return tmp_path
+
+
+def lookup(pool, mocker, *terms, **kwargs):
+    mocker.patch.object(hmc_rest_client, 'get_connection_pool', return_value=pool)
+    lookup_module = LookupModule()
+    lookup_module._load_name = LOOKUP_NAME
+    variables = {'powervm_hmc': 'hmc1', 'powervm_partition_uuid': 'uuid1'}
+    return lookup_module.run(list(terms), variables, hmc_auth=HMC_AUTH, **kwargs)
+
+
+def test_partitions_are_fetched_over_a_single_session(memo_dir, mocker):
+    pool = FakePool()
+    properties = lookup(pool, mocker, 'uuid1', 'uuid2')
+
+    assert [partition['PartitionName'] for partition in properties] == ['lpar1', 'lpar2']
+    assert properties[0]['CurrentProcessors'] == '2'
+    assert pool.logons() == ['PUT', 'DELETE']
+
+
+def test_memo_hit_does_not_log_on(memo_dir, mocker):
+    lookup(FakePool(), mocker, 'uuid1')
+    pool = FakePool()
+    assert lookup(pool, mocker)[0]['PartitionName'] == 'lpar1'
+    assert pool.requests == []
+
+    # Another process of the run finds the properties in the run directory
+    powervm_advanced._fetched.clear()
+    properties = lookup(pool, mocker, 'uuid1', 'uuid2')
+    assert [partition['PartitionName'] for partition in properties] == ['lpar1', 'lpar2']
+    assert pool.requests == [('PUT', 'web/Logon'), ('GET', 'uom/LogicalPartition/uuid2?group=Advanced'), ('DELETE', 'web/Logon')]
+
+
+def test_http_error_is_a_lookup_error(memo_dir, mocker):
+    pool = FakePool()
+    with pytest.raises(AnsibleLookupError, match='HTTP Error 404: Not Found'):
+        lookup(pool, mocker, 'missing')
+    assert pool.logons() == ['PUT', 'DELETE']
+
+
+def test_unreachable_hmc_is_a_lookup_error(memo_dir, mocker):
+    with pytest.raises(AnsibleLookupError, match='Could not log on to hmc1.*No route to host'):
+        lookup(FakePool(unreachable=True), mocker, 'uuid1')
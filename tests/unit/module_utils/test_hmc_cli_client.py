@@ -0,0 +1,156 @@
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import os
+import shlex
+import stat
+import subprocess
+import time
+
+import pytest
+
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_cli_client import HmcCliConnection
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_cli_client import progress_reporter
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_exceptions import HmcError
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_resource import Hmc
+
+
+@pytest.fixture
+def module(mocker):
+    module = mocker.Mock()
+    module.run_command.return_value = (0, 'output', '')
+    return module
+
+
+def test_commands_share_a_control_socket(module, monkeypatch, tmp_path):
+    control_dir = tmp_path / 'cp'
+    monkeypatch.setenv('POWER_HMC_SSH_CONTROL_PERSIST', '120')
+    monkeypatch.setenv('POWER_HMC_SSH_CONTROL_DIR', str(control_dir))
+    hmc_conn = HmcCliConnection(module, 'hmc1', 'hscroot', 'passw0rd')
+
+    assert hmc_conn.execute('lssyscfg -r sys -F name') == 'output'
+    hmc_conn.execute('lshmc -V')
+    commands = [call[0][0] for call in module.run_command.call_args_list]
+    options = "-o ControlMaster=auto -o ControlPersist=120 -o 'ControlPath={0}' ".format(os.path.join(str(control_dir), '%C'))
+    assert all(options in command for command in commands)
+    assert commands[0].endswith("'lssyscfg -r sys -F name'")
+    assert stat.S_IMODE(os.stat(str(control_dir)).st_mode) == 0o700
+
+
+def test_multiplexing_is_opt_in(module, monkeypatch):
+    monkeypatch.delenv('POWER_HMC_SSH_CONTROL_PERSIST', raising=False)
+    HmcCliConnection(module, 'hmc1', 'hscroot', None).execute('lshmc -V')
+    HmcCliConnection(module, 'hmc1', 'hscroot', None, control_persist=0).execute('lshmc -V')
+
+    assert all('Control' not in call[0][0] for call in module.run_command.call_args_list)
+
+
+def test_failed_command_raises(module):
+    module.run_command.return_value = (5, '', '')
+
+    with pytest.raises(HmcError, match='Invalid/incorrect password'):
+        HmcCliConnection(module, 'hmc1', 'hscroot', 'wrong').execute('lshmc -V')
+
+
+@pytest.fixture
+def shell_module(module):
+    # Runs the remote part of the ssh command line in a local shell, standing in for the HMC one
+    def run_command(ssh_hmc_cmd, use_unsafe_shell=False):
+        result = subprocess.run(['sh', '-c', shlex.split(ssh_hmc_cmd)[-1]], stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                universal_newlines=True)
+        return result.returncode, result.stdout, result.stderr
+    module.run_command.side_effect = run_command
+    return module
+
+
+def test_execute_many_splits_the_outputs(shell_module):
+    hmc_conn = HmcCliConnection(shell_module, 'hmc1', 'hscroot', 'passw0rd')
+    cmds = ['echo sys1; echo sys2', 'printf "9080-HEX*1234"', 'true', 'echo "lpar1,Running"']
+
+    assert hmc_conn.execute_many(cmds) == ['sys1\nsys2\n', '9080-HEX*1234', '', 'lpar1,Running\n']
+    assert shell_module.run_command.call_count == 1
+
+
+def test_execute_many_stops_at_the_failing_command(shell_module, tmp_path):
+    hmc_conn = HmcCliConnection(shell_module, 'hmc1', 'hscroot', 'passw0rd')
+    marker = tmp_path / 'ran'
+    cmds = ['echo sys1', 'sh -c "echo HSCL8012 The managed system cannot be found. 1>&2; exit 1"', 'touch {0}'.format(marker)]
+
+    with pytest.raises(HmcError, match='HSCL8012 The managed system cannot be found.'):
+        hmc_conn.execute_many(cmds)
+    assert not marker.exists()
+
+
+def test_lpars_of_systems_are_listed_like_one_system(mocker):
+    outputs = {'sys1': 'lpar1,Running\nlpar2,Power Off\n', 'sys2': 'lpar3,Not Activated\n'}
+    hmc_conn = mocker.Mock()
+    hmc_conn.execute.side_effect = lambda cmd: outputs[cmd.split(' -m ')[1].split()[0]]
+    hmc_conn.execute_many.side_effect = lambda cmds: [hmc_conn.execute(cmd) for cmd in cmds]
+    hmc = Hmc(hmc_conn)
+
+    lpars = hmc.list_lpars_details_of_systems(['sys1', 'sys2'], 'name,state')
+    assert lpars == [hmc.list_all_lpars_details('sys1', 'name,state'), hmc.list_all_lpars_details('sys2', 'name,state')]
+    assert lpars[0] == ['lpar1,Running', 'lpar2,Off']
+    assert hmc_conn.execute_many.call_args[0][0] == [call[0][0] for call in hmc_conn.execute.call_args_list[:2]]
+
+
+def test_long_running_commands_are_streamed(module, mocker):
+    hmc_conn = mocker.Mock(module=module)
+    output = []
+
+    def execute_stream(cmd, progress=None):
+        for line in output:
+            progress(line)
+            yield line
+    hmc_conn.execute_stream.side_effect = execute_stream
+    hmc = Hmc(hmc_conn)
+
+    output[:] = ['# Connecting to lpar1', 'ent U78AA.001-P1-C7-T1 fa:ce:b0:0c:00:01 /vdevice/l-lan@30000002 successful virtual']
+    details = hmc.fetchIODetailsForNetboot('10.0.0.1', '10.0.0.254', '10.0.0.2', 'lpar1', 'default_profile', 'sys1', '255.255.255.0')
+    assert [(detail['Location Code'], detail['Ping Result']) for detail in details] == [('U78AA.001-P1-C7-T1', 'successful')]
+
+    output[:] = ['Migration started', 'HSCLA27C WARNING: the partition has no virtual adapters', 'Migration completed']
+    hmc.migratePartitions('m', 'sys1', 'sys2', lparNames='lpar1')
+    assert hmc_conn.execute_stream.call_args[0][0].startswith('migrlpar -o m -m sys1 -t sys2')
+    module.warn.assert_called_once_with('HSCLA27C WARNING: the partition has no virtual adapters')
+    assert not hmc_conn.execute.called
+
+
+@pytest.fixture
+def local_conn(module):
+    # The streamed commands run in a local shell in place of the ssh command line
+    hmc_conn = HmcCliConnection(module, 'hmc1', 'hscroot', 'passw0rd')
+    hmc_conn.openssh_command = lambda cmd: cmd
+    return hmc_conn
+
+
+def test_execute_stream_stops_on_match(local_conn):
+    progress = []
+    start = time.time()
+    lines = list(local_conn.execute_stream('echo Booting; printf "lpar1 login: "; sleep 30', stop_patterns=[r'login:\s*$'],
+                                           progress=progress.append))
+
+    assert lines == ['Booting', 'lpar1 login: ']
+    assert progress == lines
+    assert time.time() - start < 10
+
+
+def test_execute_stream_stops_on_timeout(local_conn):
+    start = time.time()
+    assert list(local_conn.execute_stream('echo started; sleep 30', timeout=0.5)) == ['started']
+    assert time.time() - start < 10
+
+
+def test_execute_stream_failures(local_conn):
+    with pytest.raises(HmcError, match='HSCL1234 migration failed'):
+        list(local_conn.execute_stream('echo HSCL1234 migration failed; sleep 30', fail_patterns=['^HSCL']))
+    with pytest.raises(HmcError, match='partial ERROR MSG => oops'):
+        list(local_conn.execute_stream('echo partial; echo oops 1>&2; exit 3'))
+
+
+def test_progress_reporter_warns_on_patterns(module):
+    report = progress_reporter(module, warn_patterns=['^WARNING'])
+    report('Copying 10%')
+    report('WARNING disk almost full')
+
+    module.warn.assert_called_once_with('WARNING disk almost full')
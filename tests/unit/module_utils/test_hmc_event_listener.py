@@ -0,0 +1,131 @@
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import socket
+import threading
+import time
+
+from ansible.module_utils.six.moves import http_client
+from ansible.module_utils.six.moves import queue
+from ansible_collections.ibm.power_hmc.plugins.module_utils import hmc_connection_pool
+from ansible_collections.ibm.power_hmc.plugins.module_utils import hmc_event_listener
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_event_listener import HmcEventListener
+from ansible_collections.ibm.power_hmc.plugins.module_utils import hmc_resource
+from ansible_collections.ibm.power_hmc.plugins.module_utils import hmc_rest_client
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_resource import Hmc
+
+JOB_URI = "https://hmc1:12443/rest/api/uom/jobs/1000"
+
+
+class FakeRestConn:
+    hmc_ip = 'hmc1'
+    session = 'session'
+
+    def __init__(self, error=None):
+        self.events = queue.Queue()
+        self.error = error
+
+    def getEvents(self, timeout, pool=None):
+        if self.error:
+            raise self.error
+        return [self.events.get()]
+
+
+def test_waiter_is_woken_by_event():
+    rest_conn = FakeRestConn()
+    listener = HmcEventListener(rest_conn)
+    assert listener.start()
+    result = []
+    waiter = threading.Thread(target=lambda: result.append(listener.wait('1000', 30)))
+    waiter.start()
+    while '1000' not in listener._waiters:
+        time.sleep(0.01)
+    rest_conn.events.put(('MODIFY_URI', JOB_URI))
+    waiter.join(10)
+    assert result == [True]
+    listener.stop()
+
+
+def test_event_seen_before_wait_is_not_missed():
+    listener = HmcEventListener(FakeRestConn())
+    listener.available = True
+    listener._dispatch([('MODIFY_URI', JOB_URI)])
+    assert listener.wait('1000', 30, since=0)
+
+
+def test_unavailable_feed_falls_back_to_sleep(mocker):
+    sleep = mocker.patch.object(hmc_event_listener.time, 'sleep')
+    listener = HmcEventListener(FakeRestConn(error=IOError('404 Not Found')))
+    listener.start()
+    listener._thread.join(10)
+    assert not listener.available
+    assert not listener.wait('1000', 5)
+    sleep.assert_called_once_with(5)
+
+
+def test_waiter_ignores_the_events_of_other_objects():
+    listener = HmcEventListener(FakeRestConn())
+    listener.available = True
+    listener._dispatch([('MODIFY_URI', "https://hmc1:12443/rest/api/uom/ManagedSystem/other-uuid")])
+    assert listener.wait('other-uuid', 30, since=0)
+    assert not listener.wait('system-uuid', 0.1, since=0)
+
+
+def test_stop_interrupts_the_long_poll(mocker):
+    hmc_side, client_side = socket.socketpair()
+
+    class HeldConnection:
+        # The HMC holds the event request, reading the response blocks till the socket gets shut down
+        def __init__(self, host, port, timeout=None, context=None):
+            self.sock = client_side
+
+        def request(self, method, path, body=None, headers=None):
+            pass
+
+        def getresponse(self):
+            self.sock.recv(1)
+            raise http_client.BadStatusLine("''")
+
+        def close(self):
+            pass
+
+    class PollingRestConn(FakeRestConn):
+        def getEvents(self, timeout, pool=None):
+            return pool.request('GET', "https://hmc1/rest/api/uom/Event", timeout=timeout)
+
+    mocker.patch.object(hmc_connection_pool.http_client, 'HTTPSConnection', HeldConnection)
+    listener = HmcEventListener(PollingRestConn())
+    listener.start()
+    while not listener._pool._busy:
+        time.sleep(0.01)
+    listener.stop()
+    listener._thread.join(10)
+    assert not listener._thread.is_alive()
+    hmc_side.close()
+    client_side.close()
+
+
+def test_os_boot_wait_ends_on_partition_events(mocker):
+    sleep = mocker.patch.object(hmc_resource.time, 'sleep')
+    waiter = mocker.Mock()
+    hmc = Hmc(None, change_waiter=waiter)
+    configs = [{'rmc_state': 'inactive', 'uuid': 'LPAR-UUID'}, {'rmc_state': 'active', 'uuid': 'LPAR-UUID'}]
+    mocker.patch.object(hmc, 'getPartitionConfig', side_effect=configs)
+
+    assert hmc.checkForOSToBootUpFully('sys1', 'lpar1', timeoutInMin=20)[0]
+    waiter.assert_called_once_with('LPAR-UUID', 30)
+    # Only the wait before the polling starts sleeps
+    sleep.assert_called_once_with(600)
+
+
+def test_event_rest_client_is_opt_in(mocker, monkeypatch):
+    client = mocker.patch.object(hmc_rest_client, 'HmcRestClient')
+    monkeypatch.delenv(hmc_event_listener.EVENT_FEED_ENV, raising=False)
+    assert hmc_rest_client.event_rest_client('hmc1', 'hscroot', 'passw0rd') is None
+
+    monkeypatch.setenv(hmc_event_listener.EVENT_FEED_ENV, 'true')
+    assert hmc_rest_client.event_rest_client('hmc1', 'hscroot', 'passw0rd') is client.return_value
+    client.assert_called_once_with('hmc1', 'hscroot', 'passw0rd', event_feed=True)
+
+    client.side_effect = IOError('No route to host')
+    assert hmc_rest_client.event_rest_client('hmc1', 'hscroot', 'passw0rd') is None
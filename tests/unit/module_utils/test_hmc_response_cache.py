@@ -0,0 +1,114 @@
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import os
+import stat
+
+import pytest
+
+from ansible_collections.ibm.power_hmc.plugins.module_utils import hmc_rest_client
+from ansible_collections.ibm.power_hmc.plugins.module_utils import hmc_response_cache
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_rest_client import HmcRestClient
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_response_cache import HmcResponseCache
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_connection_pool import HmcResponse
+
+VIOS_RESPONSE = b'''<VirtualIOServer:VirtualIOServer xmlns:VirtualIOServer="http://www.ibm.com/xmlns/systems/power/firmware/uom/mc/2012_10/"
+ xmlns="http://www.ibm.com/xmlns/systems/power/firmware/uom/mc/2012_10/" schemaVersion="V1_0">
+<PartitionName kb="CUR" kxe="false">vios1</PartitionName></VirtualIOServer:VirtualIOServer>'''
+VIOS_URL = 'https://hmc1/rest/api/uom/VirtualIOServer/1234'
+
+
+class FakePool:
+    """
+    Answers GETs with the current version of the VIOS, honouring If-None-Match
+    """
+    def __init__(self):
+        self.version = 1
+        self.requests = []
+
+    def request(self, method, url, headers=None, data=None, timeout=300):
+        self.requests.append((method, url, dict(headers or {})))
+        if method != 'GET':
+            self.version += 1
+            return HmcResponse(url, 200, 'OK', {}, b'')
+        etag = '"{0}"'.format(self.version)
+        if headers.get('If-None-Match') == etag:
+            return HmcResponse(url, 304, 'Not Modified', {'ETag': etag}, b'')
+        return HmcResponse(url, 200, 'OK', {'ETag': etag}, VIOS_RESPONSE)
+
+
+@pytest.fixture
+def pool(mocker):
+    pool = FakePool()
+    mocker.patch.object(hmc_rest_client, 'get_connection_pool', return_value=pool)
+    mocker.patch.object(HmcRestClient, 'logon', return_value='session')
+    return pool
+
+
+def test_not_modified_response_reuses_parsed_dom(pool, mocker):
+    rest_conn = HmcRestClient('hmc1', 'hscroot', 'passw0rd', session_cache=False, response_cache=HmcResponseCache())
+    parse = mocker.spy(hmc_rest_client, 'xml_strip_namespace')
+
+    first = rest_conn.getVirtualIOServer('1234')
+    first.xpath('//PartitionName')[0].text = 'modified'
+    second = rest_conn.getVirtualIOServer('1234')
+
+    assert second.xpath('//PartitionName')[0].text == 'vios1'
+    assert parse.call_count == 1
+    assert 'If-None-Match' not in pool.requests[0][2]
+    assert pool.requests[1][2]['If-None-Match'] == '"1"'
+
+
+def test_changed_resource_is_fetched_again(pool):
+    rest_conn = HmcRestClient('hmc1', 'hscroot', 'passw0rd', session_cache=False, response_cache=HmcResponseCache())
+    rest_conn.getVirtualIOServer('1234')
+    rest_conn._request(VIOS_URL, headers={'X-API-Session': 'session'}, method='POST', data='<VirtualIOServer/>')
+    assert rest_conn.response_cache.size == 0
+
+    rest_conn.getVirtualIOServer('1234')
+    assert 'If-None-Match' not in pool.requests[-1][2]
+    assert rest_conn.response_cache.size == len(VIOS_RESPONSE)
+
+
+def test_cache_is_bounded_by_size():
+    cache = HmcResponseCache(max_bytes=10)
+    cache.put('first', '"1"', b'12345')
+    cache.put('second', '"1"', b'12345')
+    assert cache.get('first') is not None
+    cache.put('third', '"1"', b'12345')
+    assert cache.get('second') is None
+    assert cache.get('first') is not None
+    assert cache.size == 10
+    cache.put('huge', '"1"', b'12345678901')
+    assert cache.get('huge') is None
+
+
+def test_entries_are_persisted(tmp_path, pool):
+    cache_dir = str(tmp_path / 'responses')
+    HmcRestClient('hmc1', 'hscroot', 'passw0rd', session_cache=False,
+                  response_cache=HmcResponseCache(cache_dir=cache_dir)).getVirtualIOServer('1234')
+    for name in os.listdir(cache_dir):
+        assert stat.S_IMODE(os.stat(os.path.join(cache_dir, name)).st_mode) == 0o600
+
+    rest_conn = HmcRestClient('hmc1', 'hscroot', 'passw0rd', session_cache=False, response_cache=HmcResponseCache(cache_dir=cache_dir))
+    vios_dom = rest_conn.getVirtualIOServer('1234')
+    assert pool.requests[-1][2]['If-None-Match'] == '"1"'
+    assert vios_dom.xpath('//PartitionName')[0].text == 'vios1'
+
+
+def test_cache_is_opt_in(tmp_path, monkeypatch):
+    monkeypatch.setattr(hmc_response_cache, '_shared_cache', None)
+    monkeypatch.delenv(hmc_response_cache.RESPONSE_CACHE_SIZE_ENV, raising=False)
+    monkeypatch.delenv(hmc_response_cache.RESPONSE_CACHE_DIR_ENV, raising=False)
+    assert hmc_response_cache.response_cache_from_env() is None
+    monkeypatch.setenv(hmc_response_cache.RESPONSE_CACHE_SIZE_ENV, '0')
+    assert hmc_response_cache.response_cache_from_env() is None
+
+    monkeypatch.setenv(hmc_response_cache.RESPONSE_CACHE_SIZE_ENV, '8')
+    assert hmc_response_cache.response_cache_from_env().max_bytes == 8 * 1024 * 1024
+
+    monkeypatch.setattr(hmc_response_cache, '_shared_cache', None)
+    monkeypatch.delenv(hmc_response_cache.RESPONSE_CACHE_SIZE_ENV)
+    monkeypatch.setenv(hmc_response_cache.RESPONSE_CACHE_DIR_ENV, str(tmp_path))
+    cache = hmc_response_cache.response_cache_from_env()
+    assert (cache.max_bytes, cache.cache_dir) == (64 * 1024 * 1024, str(tmp_path))
@@ -0,0 +1,263 @@
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import threading
+import time
+
+import pytest
+
+from ansible_collections.ibm.power_hmc.plugins.module_utils import hmc_connection_pool
+from ansible_collections.ibm.power_hmc.plugins.module_utils import hmc_rest_client
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_rest_client import HmcRestClient
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_connection_pool import HmcResponse
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_exceptions import HmcError
+
+JOB_RESPONSE = '''<entry xmlns="http://www.w3.org/2005/Atom"><content type="application/vnd.ibm.powervm.web+xml; type=JobResponse">
+<JobResponse:JobResponse xmlns:JobResponse="http://www.ibm.com/xmlns/systems/power/firmware/web/mc/2012_10/"
+ xmlns="http://www.ibm.com/xmlns/systems/power/firmware/web/mc/2012_10/" schemaVersion="V1_0">
+<JobID kb="ROR" kxe="false">1000</JobID><Status kxe="false" kb="ROR">{0}</Status>
+<JobRequestInstance schemaVersion="V1_0"><RequestedOperation schemaVersion="V1_0">
+<OperationName kb="ROR" kxe="false">GetFreePhysicalVolumes</OperationName></RequestedOperation></JobRequestInstance>
+</JobResponse:JobResponse></content></entry>'''
+
+
+@pytest.fixture
+def rest_client(mocker):
+    mocker.patch.object(HmcRestClient, 'logon', return_value='session')
+    return HmcRestClient('hmc1', 'hscroot', 'passw0rd', session_cache=False)
+
+
+def job_responses(mocker, rest_client, statuses):
+    responses = [HmcResponse('', 200, 'OK', {}, JOB_RESPONSE.format(status).encode()) for status in statuses]
+    mocker.patch.object(rest_client, '_request', side_effect=responses)
+
+
+def test_poll_intervals_backoff_is_capped():
+    intervals = hmc_rest_client.poll_intervals(0.5, 4, 2)
+    assert [next(intervals) for dummy in range(6)] == [0.5, 1, 2, 4, 4, 4]
+
+
+def test_job_status_polled_with_backoff(mocker, rest_client):
+    sleep = mocker.patch.object(hmc_rest_client.time, 'sleep')
+    job_responses(mocker, rest_client, ['NOT_STARTED', 'RUNNING', 'RUNNING', 'COMPLETED_OK'])
+    doc = rest_client.fetchJobStatus('1000')
+    assert doc.xpath('//Status')[0].text == 'COMPLETED_OK'
+    assert [call[0][0] for call in sleep.call_args_list] == [0.5, 1, 2, 4]
+
+
+def test_job_timeout_is_based_on_elapsed_time(mocker, rest_client):
+    mocker.patch.object(hmc_rest_client.time, 'sleep')
+    mocker.patch.object(hmc_rest_client.time, 'time', side_effect=[0, 30, 61])
+    job_responses(mocker, rest_client, ['RUNNING', 'RUNNING'])
+    with pytest.raises(HmcError) as error:
+        rest_client.fetchJobStatus('1000', timeout_in_min=1)
+    assert 'GetFreePhysicalVolumes timed out' in str(error.value)
+
+
+VIOS_FEED = '''<feed xmlns="http://www.w3.org/2005/Atom" xmlns:ns2="http://a9.com/-/spec/opensearch/1.1/">
+<id>feed</id><!-- VIOS feed -->
+{0}
+</feed>'''
+VIOS_ENTRY = '''<entry><id>{0}</id><content type="application/vnd.ibm.powervm.uom+xml; type=VirtualIOServer">
+<VirtualIOServer:VirtualIOServer xmlns:VirtualIOServer="http://www.ibm.com/xmlns/systems/power/firmware/uom/mc/2012_10/"
+ xmlns="http://www.ibm.com/xmlns/systems/power/firmware/uom/mc/2012_10/" schemaVersion="V1_0">
+<PartitionID>{1}</PartitionID><PartitionName>vios{1}</PartitionName>
+<VirtualFibreChannelMappings>{2}</VirtualFibreChannelMappings>
+<VirtualSCSIMappings>{3}</VirtualSCSIMappings>
+</VirtualIOServer:VirtualIOServer></content></entry>'''
+FC_MAPPING = '''<VirtualFibreChannelMapping>
+<ClientAdapter><LocalPartitionID>{0}</LocalPartitionID><ConnectingPartitionID>{1}</ConnectingPartitionID>
+<VirtualSlotNumber>{2}</VirtualSlotNumber><ConnectingVirtualSlotNumber>{3}</ConnectingVirtualSlotNumber><WWPNs>c0507 c0508</WWPNs></ClientAdapter>
+<ServerAdapter><PhysicalPort><LocationCode>U78-P1-C{1}-T1</LocationCode><PortName>fcs{3}</PortName></PhysicalPort></ServerAdapter>
+</VirtualFibreChannelMapping>'''
+SCSI_PV_MAPPING = '''<VirtualSCSIMapping>
+<ClientAdapter><LocalPartitionID>{0}</LocalPartitionID><RemoteLogicalPartitionID>{1}</RemoteLogicalPartitionID>
+<VirtualSlotNumber>{2}</VirtualSlotNumber><RemoteSlotNumber>{3}</RemoteSlotNumber></ClientAdapter>
+<Storage><PhysicalVolume><VolumeCapacity>10240</VolumeCapacity><VolumeName>hdisk{3}</VolumeName><VolumeUniqueID>{4}</VolumeUniqueID></PhysicalVolume></Storage>
+<TargetDevice><PhysicalVolumeVirtualTargetDevice><TargetName>vtscsi{3}</TargetName></PhysicalVolumeVirtualTargetDevice></TargetDevice>
+</VirtualSCSIMapping>'''
+SCSI_VOD_MAPPING = '''<VirtualSCSIMapping>
+<ClientAdapter><LocalPartitionID>{0}</LocalPartitionID><RemoteLogicalPartitionID>{1}</RemoteLogicalPartitionID>
+<VirtualSlotNumber>{2}</VirtualSlotNumber><RemoteSlotNumber>{3}</RemoteSlotNumber></ClientAdapter>
+<Storage><VirtualOpticalMedia><MediaName>aix.iso</MediaName><MountType>r</MountType><Size>4.5</Size></VirtualOpticalMedia></Storage>
+<TargetDevice><VirtualOpticalTargetDevice><TargetName>vtopt0</TargetName></VirtualOpticalTargetDevice></TargetDevice>
+</VirtualSCSIMapping>'''
+STALE_SCSI_MAPPING = '<VirtualSCSIMapping><ServerAdapter><AdapterName>vhost9</AdapterName></ServerAdapter></VirtualSCSIMapping>'
+VIOS_LIST = [{'PartitionID': 1, 'PartitionName': 'vios1'}, {'PartitionID': 2, 'PartitionName': 'vios2'}]
+
+
+def vios_feed():
+    vios1 = VIOS_ENTRY.format('a1', 1, FC_MAPPING.format(5, 1, 10, 20) + FC_MAPPING.format(6, 1, 10, 21),
+                              SCSI_PV_MAPPING.format(5, 1, 3, 30, 'pvid1') + STALE_SCSI_MAPPING + SCSI_VOD_MAPPING.format(5, 1, 4, 31))
+    vios2 = VIOS_ENTRY.format('a2', 2, FC_MAPPING.format(5, 2, 11, 22),
+                              SCSI_PV_MAPPING.format(5, 2, 3, 32, 'pvid1') + SCSI_PV_MAPPING.format(6, 2, 3, 33, 'pvid2'))
+    return VIOS_FEED.format(vios1 + vios2).encode()
+
+
+def test_feed_entries_are_streamed_and_cleared():
+    entries = []
+    for entry in hmc_rest_client.iter_feed_entries(vios_feed(), chunk_size=64):
+        entries.append(entry)
+        assert entry.tag == 'entry'
+        assert entry.find('content/VirtualIOServer/PartitionName').text == 'vios{0}'.format(len(entries))
+    assert len(entries) == 2
+    assert len(entries[0]) == 0
+
+
+def test_fc_details_from_vios(mocker, rest_client):
+    mocker.patch.object(rest_client, 'getVirtualIOServers', return_value=vios_feed())
+    assert rest_client.fetchFCDetailsFromVIOS('sys', 5, VIOS_LIST) == [
+        {'PortName': 'fcs20', 'vios': 'vios1', 'LocationCode': 'U78-P1-C1-T1', 'WWPNs': 'c0507 c0508',
+         'ClientVirtualSlotNumber': '10', 'ServerVirtualSlotNumber': '20'},
+        {'PortName': 'fcs22', 'vios': 'vios2', 'LocationCode': 'U78-P1-C2-T1', 'WWPNs': 'c0507 c0508',
+         'ClientVirtualSlotNumber': '11', 'ServerVirtualSlotNumber': '22'}]
+
+
+def test_scsi_details_from_vios(mocker, rest_client):
+    mocker.patch.object(rest_client, 'getVirtualIOServers', return_value=vios_feed())
+    assert rest_client.fetchSCSIDetailsFromVIOS('sys', 5, VIOS_LIST) == [
+        {'VolumeUniqueID': 'pvid1', 'Volume': [{'vios': 'vios1', 'name': 'hdisk30'}, {'vios': 'vios2', 'name': 'hdisk32'}],
+         'ClientVirtualSlotNumber': '3', 'ServerVirtualSlotNumber': '30', 'TargetDeviceName': 'vtscsi30', 'VolumeCapacity': '10240'},
+        {'ClientVirtualSlotNumber': '4', 'ServerVirtualSlotNumber': '31', 'TargetName': 'vtopt0',
+         'MediaName': 'aix.iso', 'MountType': 'r', 'Size': '4.5'}]
+
+
+def test_scsi_mappings_indexed_by_partition():
+    vios_dict = {1: 'vios1', 2: 'vios2'}
+    vscsis = hmc_rest_client.index_scsi_mappings(hmc_rest_client.iter_feed_entries(vios_feed()), vios_dict)
+    assert sorted(vscsis) == ['5', '6']
+    assert [vscsi['Volume'] for vscsi in vscsis['6']] == [[{'vios': 'vios2', 'name': 'hdisk33'}]]
+    assert len(hmc_rest_client.index_fc_mappings(hmc_rest_client.iter_feed_entries(vios_feed()), vios_dict)['6']) == 1
+
+
+SRIOV_PORT = '''<{0}><ConfiguredEthernetLogicalPorts>{1}</ConfiguredEthernetLogicalPorts>
+<ConfiguredMaxEthernetLogicalPorts>4</ConfiguredMaxEthernetLogicalPorts><LocationCode>U78-P1-C{2}-T1</LocationCode>
+<PhysicalPortID>{2}</PhysicalPortID><LinkStatus>true</LinkStatus><AllocatedCapacity>2.0%</AllocatedCapacity></{0}>'''
+SRIOV_ADAPTER = '''<SRIOVAdapter><SRIOVAdapterID>1</SRIOVAdapterID>
+<ConvergedEthernetPhysicalPorts>{0}</ConvergedEthernetPhysicalPorts><EthernetPhysicalPorts>{1}</EthernetPhysicalPorts>
+</SRIOVAdapter>'''
+
+
+def test_sriov_collection_lists_ports_with_free_logical_ports(rest_client):
+    adapter = SRIOV_ADAPTER.format(SRIOV_PORT.format('SRIOVConvergedNetworkAdapterPhysicalPort', 1, 0),
+                                   SRIOV_PORT.format('SRIOVEthernetPhysicalPort', 4, 1) + SRIOV_PORT.format('SRIOVEthernetPhysicalPort', 0, 2))
+    assert rest_client.create_sriov_collection([hmc_rest_client.etree.XML(adapter)]) == [
+        {'RelatedSRIOVAdapterID': '1', 'LocationCode': 'U78-P1-C0-T1', 'RelatedSRIOVPhysicalPortID': '0', 'LinkStatus': 'true', 'AllocatedCapacity': '2.0'},
+        {'RelatedSRIOVAdapterID': '1', 'LocationCode': 'U78-P1-C2-T1', 'RelatedSRIOVPhysicalPortID': '2', 'LinkStatus': 'true', 'AllocatedCapacity': '2.0'}]
+
+
+GROUP_FEED = '''<feed xmlns="http://www.w3.org/2005/Atom"><entry><content type="application/vnd.ibm.powervm.uom+xml; type=Group">
+<Group:Group xmlns:Group="http://www.ibm.com/xmlns/systems/power/firmware/uom/mc/2012_10/"
+ xmlns="http://www.ibm.com/xmlns/systems/power/firmware/uom/mc/2012_10/" schemaVersion="V1_0"><GroupName>prod</GroupName>
+<AssociatedManagedSystems><link href="https://hmc1/rest/api/uom/ManagedSystem/ms1"/></AssociatedManagedSystems>
+<AssociatedLogicalPartitions><link href="https://hmc1/rest/api/uom/LogicalPartition/lpar1"/>
+<link href="https://hmc1/rest/api/uom/LogicalPartition/lpar2"/></AssociatedLogicalPartitions>
+</Group:Group></content></entry><entry><content type="application/vnd.ibm.powervm.uom+xml; type=Group">
+<Group:Group xmlns:Group="http://www.ibm.com/xmlns/systems/power/firmware/uom/mc/2012_10/"
+ xmlns="http://www.ibm.com/xmlns/systems/power/firmware/uom/mc/2012_10/" schemaVersion="V1_0"><GroupName>web</GroupName>
+<AssociatedLogicalPartitions><link href="https://hmc1/rest/api/uom/LogicalPartition/lpar1"/></AssociatedLogicalPartitions>
+</Group:Group></content></entry></feed>'''
+
+
+def test_tagged_group_items(mocker, rest_client):
+    mocker.patch.object(rest_client, 'generic_get', return_value=hmc_rest_client.xml_strip_namespace(GROUP_FEED.encode()))
+    assert rest_client.fetchTaggedGroupItems() == {'lpar1': ['prod', 'web'], 'lpar2': ['prod'], 'ms1': ['prod']}
+
+
+VIOS_GROUP_RESPONSE = '''<entry xmlns="http://www.w3.org/2005/Atom"><content type="application/vnd.ibm.powervm.uom+xml; type=VirtualIOServer">
+<VirtualIOServer:VirtualIOServer xmlns:VirtualIOServer="http://www.ibm.com/xmlns/systems/power/firmware/uom/mc/2012_10/"
+ xmlns="http://www.ibm.com/xmlns/systems/power/firmware/uom/mc/2012_10/" schemaVersion="V1_0">
+<Metadata><Atom><AtomID>vios-uuid</AtomID></Atom></Metadata><PartitionID>1</PartitionID>{0}
+</VirtualIOServer:VirtualIOServer></content></entry>'''
+VIOS_STORAGE = '''<PhysicalFibreChannelAdapter><PhysicalFibreChannelPorts><PhysicalFibreChannelPort><PhysicalVolumes>
+<PhysicalVolume><VolumeName>hdisk0</VolumeName></PhysicalVolume><PhysicalVolume><VolumeName>hdisk1</VolumeName></PhysicalVolume>
+</PhysicalVolumes></PhysicalFibreChannelPort></PhysicalFibreChannelPorts></PhysicalFibreChannelAdapter>'''
+VIOS_SCSI_MAPPINGS = '''<VirtualSCSIMappings><VirtualSCSIMapping><ServerAdapter><BackingDeviceName>hdisk0</BackingDeviceName>
+<RemoteLogicalPartitionID>4</RemoteLogicalPartitionID></ServerAdapter></VirtualSCSIMapping></VirtualSCSIMappings>'''
+
+
+def test_scsi_mapping_posts_only_the_mapping_group(mocker, rest_client):
+    groups = {'ViosStorage': VIOS_STORAGE, 'ViosSCSIMapping': VIOS_SCSI_MAPPINGS}
+    mocker.patch.object(rest_client, 'getVirtualIOServer',
+                        side_effect=lambda uuid, group: hmc_rest_client.xml_strip_namespace(VIOS_GROUP_RESPONSE.format(groups[group]).encode()))
+    post = mocker.patch.object(rest_client, '_request', return_value=HmcResponse('', 200, 'OK', {}, b'<VirtualIOServer/>'))
+    partition_dom = hmc_rest_client.etree.XML('<LogicalPartition><PartitionID>5</PartitionID></LogicalPartition>')
+    pv_settings = [{'disk_name': name, 'vios_name': 'vios1', 'target_name': None, 'server_adapter_id': None, 'client_adapter_id': None}
+                   for name in ('hdisk0', 'hdisk1')]
+
+    assert rest_client.updateVIOSwithSCSIMappings('vios-uuid', pv_settings, 'lpar-uuid', 'vios1', partition_dom, None)
+    url = post.call_args[0][0]
+    payload = post.call_args[1]['data']
+    assert url == 'https://hmc1/rest/api/uom/VirtualIOServer/vios-uuid?group=ViosSCSIMapping'
+    mappings = hmc_rest_client.xml_strip_namespace(payload.encode()).findall('VirtualSCSIMappings/VirtualSCSIMapping')
+    assert [mapping.findtext('Storage/PhysicalVolume/VolumeName') for mapping in mappings] == [None, 'hdisk1']
+    assert 'PhysicalFibreChannelAdapter' not in payload
+
+
+LPAR_ENTRY = '''<entry xmlns="http://www.w3.org/2005/Atom"><id>lpar-uuid</id><content>
+<LogicalPartition xmlns="http://www.ibm.com/xmlns/systems/power/firmware/uom/mc/2012_10/"><PartitionName>lpar1</PartitionName>
+<PartitionIOConfiguration><ProfileIOSlots/><CurrentMaximumVirtualIOSlots>20</CurrentMaximumVirtualIOSlots></PartitionIOConfiguration>
+<PartitionState>running</PartitionState></LogicalPartition></content></entry>'''
+
+
+def test_flatten_entry(mocker, rest_client):
+    request = mocker.patch.object(rest_client, '_request', return_value=HmcResponse('', 200, 'OK', {}, LPAR_ENTRY.encode()))
+    rest_client.session = 'session'
+    dummy, partition_dom = rest_client.getLogicalPartition(None, partition_uuid='lpar-uuid', group='Advanced')
+
+    assert request.call_args[0][0] == 'https://hmc1/rest/api/uom/LogicalPartition/lpar-uuid?group=Advanced'
+    assert hmc_rest_client.flatten_entry(partition_dom) == \
+        {'id': 'lpar-uuid', 'PartitionName': 'lpar1', 'CurrentMaximumVirtualIOSlots': '20', 'PartitionState': 'running'}
+    assert hmc_rest_client.flatten_entry(hmc_rest_client.etree.XML(LPAR_ENTRY), fields=lambda tag: tag.startswith('Partition')) == \
+        {'PartitionName': 'lpar1', 'PartitionState': 'running'}
+
+
+def test_map_bounded_runs_concurrently_within_the_bound():
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def fetch(vios_uuid):
+        with lock:
+            running.append(vios_uuid)
+            peak.append(len(running))
+        time.sleep(0.2)
+        with lock:
+            running.remove(vios_uuid)
+        return vios_uuid.upper()
+
+    start = time.time()
+    assert hmc_rest_client.map_bounded(fetch, ['vios1', 'vios2', 'vios3', 'vios4'], 2) == ['VIOS1', 'VIOS2', 'VIOS3', 'VIOS4']
+    assert max(peak) == 2
+    assert time.time() - start < 0.7
+
+
+def test_map_bounded_raises_the_errors_of_the_calls():
+    def fetch(vios_uuid):
+        if vios_uuid == 'vios2':
+            raise HmcError("Job failed")
+        return vios_uuid
+
+    with pytest.raises(HmcError, match='Job failed'):
+        hmc_rest_client.map_bounded(fetch, ['vios1', 'vios2', 'vios3'])
+
+
+def test_logoff_of_the_last_client_closes_the_connection_pools_of_the_hmc(mocker):
+    mocker.patch.dict(hmc_connection_pool._clients, clear=True)
+    mocker.patch.object(HmcRestClient, 'logon', return_value='session')
+    mocker.patch.object(HmcRestClient, '_request')
+    rest_client = HmcRestClient('hmc1', 'hscroot', 'passw0rd', session_cache=False)
+    other_client = HmcRestClient('hmc1', 'hscroot', 'passw0rd', session_cache=False)
+    pool = hmc_connection_pool.get_connection_pool('https://hmc1/rest/api/web/Logon')
+    close = mocker.patch.object(pool, 'close')
+    try:
+        rest_client.logoff()
+        rest_client.logoff()
+        close.assert_not_called()
+        assert hmc_connection_pool.get_connection_pool('https://hmc1/rest/api/web/Logon') is pool
+
+        other_client.logoff()
+        close.assert_called_once_with()
+        assert hmc_connection_pool.get_connection_pool('https://hmc1/rest/api/web/Logon') is not pool
+    finally:
+        hmc_connection_pool.close_connection_pools()
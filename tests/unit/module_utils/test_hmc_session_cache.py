@@ -0,0 +1,85 @@
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import io
+import os
+import stat
+import time
+
+import ansible.module_utils.six.moves.urllib.error as urllib_error
+from ansible_collections.ibm.power_hmc.plugins.module_utils import hmc_rest_client
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_session_cache import HmcSessionCache
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_connection_pool import HmcResponse
+
+LOGON_RESPONSE = b'''<LogonResponse xmlns="http://www.ibm.com/xmlns/systems/power/firmware/web/mc/2012_10/" schemaVersion="V1_0">
+<X-API-Session kb="ROR" kxe="false">{0}</X-API-Session></LogonResponse>'''
+
+
+class FakePool:
+    def __init__(self, valid_sessions):
+        self.valid_sessions = valid_sessions
+        self.requests = []
+        self.logons = 0
+
+    def request(self, method, url, headers=None, data=None, timeout=300):
+        self.requests.append((method, url, dict(headers or {})))
+        if url.endswith('/rest/api/web/Logon'):
+            if method == 'PUT':
+                self.logons += 1
+                session = 'session{0}'.format(self.logons)
+                self.valid_sessions.add(session)
+                return HmcResponse(url, 200, 'OK', {}, LOGON_RESPONSE.replace(b'{0}', session.encode()))
+            return HmcResponse(url, 204, 'No Content', {}, b'')
+        if headers.get('X-API-Session') not in self.valid_sessions:
+            raise urllib_error.HTTPError(url, 401, 'Unauthorized', {}, io.BytesIO(b''))
+        return HmcResponse(url, 200, 'OK', {}, b'[]')
+
+
+def test_cache_files_are_private(tmp_path):
+    cache = HmcSessionCache(str(tmp_path / 'sessions'))
+    cache.store('hmc1', 'hscroot', 'token')
+    assert cache.load('hmc1', 'hscroot') == 'token'
+    assert cache.load('hmc1', 'other') is None
+    assert stat.S_IMODE(os.stat(str(tmp_path / 'sessions')).st_mode) == 0o700
+    for name in os.listdir(str(tmp_path / 'sessions')):
+        assert stat.S_IMODE(os.stat(str(tmp_path / 'sessions' / name)).st_mode) == 0o600
+
+
+def test_expired_entry_is_dropped(tmp_path, mocker):
+    cache = HmcSessionCache(str(tmp_path), ttl=10)
+    cache.store('hmc1', 'hscroot', 'token')
+    mocker.patch.object(time, 'time', return_value=time.time() + 20)
+    assert cache.load('hmc1', 'hscroot') is None
+
+
+def test_client_reuses_cached_session_and_relogs_on_401(tmp_path, mocker):
+    pool = FakePool(set())
+    mocker.patch.object(hmc_rest_client, 'get_connection_pool', return_value=pool)
+    cache = HmcSessionCache(str(tmp_path))
+
+    first = hmc_rest_client.HmcRestClient('hmc1', 'hscroot', 'passw0rd', session_cache=cache)
+    first.logoff()
+    second = hmc_rest_client.HmcRestClient('hmc1', 'hscroot', 'passw0rd', session_cache=cache)
+    assert second.session == first.session
+    assert pool.logons == 1
+    assert not [req for req in pool.requests if req[0] == 'DELETE']
+
+    # Session got expired on the HMC side
+    pool.valid_sessions.clear()
+    assert second.getManagedSystemsQuick() == b'[]'
+    assert pool.logons == 2
+    assert cache.load('hmc1', 'hscroot') == second.session == 'session2'
+
+
+def test_expired_cached_session_is_logged_off(tmp_path, mocker):
+    pool = FakePool({'session0'})
+    mocker.patch.object(hmc_rest_client, 'get_connection_pool', return_value=pool)
+    cache = HmcSessionCache(str(tmp_path), ttl=10)
+    cache.store('hmc1', 'hscroot', 'session0')
+    mocker.patch.object(time, 'time', return_value=time.time() + 20)
+
+    client = hmc_rest_client.HmcRestClient('hmc1', 'hscroot', 'passw0rd', session_cache=cache)
+    assert client.session == 'session1'
+    logoffs = [req for req in pool.requests if req[0] == 'DELETE']
+    assert [req[2]['X-API-Session'] for req in logoffs] == ['session0']
+    assert cache.load('hmc1', 'hscroot') == 'session1'
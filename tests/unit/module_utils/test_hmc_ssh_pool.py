@@ -0,0 +1,163 @@
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import functools
+import socket
+import threading
+import time
+
+import pytest
+
+paramiko = pytest.importorskip('paramiko')
+
+from ansible_collections.ibm.power_hmc.plugins.module_utils import hmc_cli_client
+from ansible_collections.ibm.power_hmc.plugins.module_utils import hmc_ssh_pool
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_cli_client import HmcCliConnection
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_exceptions import HmcError
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_resource import Hmc
+
+USER = 'hscroot'
+PASSWORD = 'passw0rd'
+# Canned HMC answers, command: (exit status, stdout, stderr)
+COMMANDS = {
+    'lshmc -V': (0, '"version= Version: 10\n Release: 3\n"\n', ''),
+    'lssyscfg -r sys -F name': (0, 'sys1\nsys2\n', ''),
+    'chsysstate -m missing -r sys -o on': (1, '', 'HSCL8012 The managed system cannot be found.\n'),
+    'rmvterm -m sys1 -p lpar1': (0, '', ''),
+}
+# Console of a partition being installed, kept open till the client closes it
+CONSOLE = {
+    'mkvterm -m sys1 -p lpar1': ['Booting from network\n', 'Installing\n', 'lpar1 login: '],
+}
+
+
+class HmcServer(paramiko.ServerInterface):
+    def __init__(self, stand_in):
+        self.stand_in = stand_in
+
+    def get_allowed_auths(self, username):
+        return 'password'
+
+    def check_auth_password(self, username, password):
+        self.stand_in.authentications += 1
+        if (username, password) == (USER, PASSWORD):
+            return paramiko.AUTH_SUCCESSFUL
+        return paramiko.AUTH_FAILED
+
+    def check_channel_request(self, kind, chanid):
+        return paramiko.OPEN_SUCCEEDED if kind == 'session' else paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+    def check_channel_exec_request(self, channel, command):
+        # Answered once paramiko acknowledged the exec request, which it only does after this returns
+        threading.Timer(0.05, self.stand_in.answer, args=(channel, command.decode())).start()
+        return True
+
+
+class SshdStandIn:
+    """
+    Minimal SSH server answering the canned HMC commands, one exec channel per command
+    """
+    def __init__(self):
+        self.host_key = paramiko.RSAKey.generate(2048)
+        self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.listener.bind(('127.0.0.1', 0))
+        self.listener.listen(8)
+        self.port = self.listener.getsockname()[1]
+        self.authentications = 0
+        self.commands = []
+        self.transports = []
+        threading.Thread(target=self.accept, daemon=True).start()
+
+    def accept(self):
+        while True:
+            try:
+                sock, dummy = self.listener.accept()
+            except OSError:
+                return
+            transport = paramiko.Transport(sock)
+            transport.add_server_key(self.host_key)
+            transport.start_server(server=HmcServer(self))
+            self.transports.append(transport)
+
+    def answer(self, channel, command):
+        self.commands.append(command)
+        if command in CONSOLE:
+            for chunk in CONSOLE[command]:
+                channel.sendall(chunk.encode())
+                time.sleep(0.1)
+            while not channel.closed:
+                time.sleep(0.05)
+            return
+        status, stdout, stderr = COMMANDS.get(command, (1, '', 'sh: {0}: not found\n'.format(command)))
+        channel.sendall(stdout.encode())
+        channel.sendall_stderr(stderr.encode())
+        channel.send_exit_status(status)
+        channel.shutdown_write()
+        channel.close()
+
+    def close(self):
+        self.listener.close()
+        for transport in self.transports:
+            transport.close()
+
+
+@pytest.fixture
+def sshd(monkeypatch):
+    stand_in = SshdStandIn()
+    monkeypatch.setenv('POWER_HMC_SSH_BACKEND', 'paramiko')
+    monkeypatch.setenv('ANSIBLE_HOST_KEY_CHECKING', 'False')
+    monkeypatch.setattr(hmc_cli_client, 'get_ssh_pool', functools.partial(hmc_ssh_pool.get_ssh_pool, port=stand_in.port))
+    yield stand_in
+    hmc_ssh_pool.close_ssh_pools()
+    stand_in.close()
+
+
+def test_commands_share_an_authenticated_connection(sshd):
+    module = object()
+    assert HmcCliConnection(module, '127.0.0.1', USER, PASSWORD).execute('lshmc -V') == COMMANDS['lshmc -V'][1]
+    assert HmcCliConnection(module, '127.0.0.1', USER, PASSWORD).execute('lssyscfg -r sys -F name') == 'sys1\nsys2\n'
+
+    assert sshd.commands == ['lshmc -V', 'lssyscfg -r sys -F name']
+    assert sshd.authentications == 1
+    assert len(sshd.transports) == 1
+
+
+def test_failed_command_raises_its_stderr(sshd):
+    with pytest.raises(HmcError, match='HSCL8012 The managed system cannot be found.'):
+        HmcCliConnection(None, '127.0.0.1', USER, PASSWORD).execute('chsysstate -m missing -r sys -o on')
+
+
+def test_wrong_password(sshd):
+    with pytest.raises(HmcError, match='Invalid/incorrect password'):
+        HmcCliConnection(None, '127.0.0.1', USER, 'wrong').execute('lshmc -V')
+
+
+def test_unknown_host_key(sshd, monkeypatch):
+    monkeypatch.setenv('ANSIBLE_HOST_KEY_CHECKING', 'True')
+    with pytest.raises(HmcError, match='Host public key is unknown'):
+        HmcCliConnection(None, '127.0.0.1', USER, PASSWORD).execute('lshmc -V')
+
+
+def test_connection_closed_by_hmc_is_reopened(sshd):
+    hmc_conn = HmcCliConnection(None, '127.0.0.1', USER, PASSWORD)
+    hmc_conn.execute('lshmc -V')
+    sshd.transports[0].close()
+
+    assert hmc_conn.execute('lssyscfg -r sys -F name') == 'sys1\nsys2\n'
+    assert sshd.authentications == 2
+
+
+def test_console_is_followed_till_the_login_prompt(sshd):
+    start = time.time()
+    Hmc(None).checkconsolelog(None, '10.0.0.2', '127.0.0.1', USER, PASSWORD, 'sys1', 'lpar1')
+
+    assert time.time() - start < 30
+    assert sshd.commands == ['rmvterm -m sys1 -p lpar1', 'mkvterm -m sys1 -p lpar1']
+    # The interrupted console leaves the connection usable
+    assert HmcCliConnection(None, '127.0.0.1', USER, PASSWORD).execute('lshmc -V') == COMMANDS['lshmc -V'][1]
+    assert sshd.authentications == 1
+
+
+def test_unsupported_backend():
+    with pytest.raises(HmcError, match='Unsupported SSH backend'):
+        HmcCliConnection(None, 'hmc1', USER, PASSWORD, backend='telnet')
@@ -0,0 +1,36 @@
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+from lxml import etree
+
+from ansible_collections.ibm.power_hmc.plugins.module_utils import hmc_xpath
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_xpath import compiled_xpath
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_xpath import parse_xml
+
+MAPPINGS = b'''<VirtualSCSIMappings>
+<VirtualSCSIMapping><ClientAdapter><LocalPartitionID>5</LocalPartitionID></ClientAdapter></VirtualSCSIMapping>
+<VirtualSCSIMapping><ClientAdapter><LocalPartitionID>6</LocalPartitionID></ClientAdapter></VirtualSCSIMapping>
+</VirtualSCSIMappings>'''
+
+
+def test_expressions_are_compiled_once():
+    assert compiled_xpath('//PartitionID') is compiled_xpath('//PartitionID')
+
+
+def test_subtree_scope_matches_tree_xpath():
+    root = etree.fromstring(MAPPINGS)
+    for mapping in root:
+        tree = etree.ElementTree(mapping)
+        for expr in ('//ClientAdapter/LocalPartitionID', '//VirtualSCSIMapping', 'ClientAdapter', '//*', '//A | //LocalPartitionID'):
+            assert compiled_xpath(expr)(tree) == tree.xpath(expr)
+    assert [elem.text for elem in compiled_xpath('//LocalPartitionID')(root[1])] == ['5', '6']
+
+
+def test_namespaced_lookups_on_unstripped_documents():
+    doc = parse_xml(b'''<PartitionTemplates xmlns="http://www.ibm.com/xmlns/systems/power/firmware/templates/mc/2012_10/">
+<PartitionTemplate><Metadata><Atom><AtomID>uuid-1</AtomID></Atom></Metadata><partitionTemplateName>it's</partitionTemplateName></PartitionTemplate>
+<PartitionTemplate><Metadata><Atom><AtomID>uuid-2</AtomID></Atom></Metadata><partitionTemplateName>base</partitionTemplateName></PartitionTemplate>
+</PartitionTemplates>''')
+    assert hmc_xpath.TEMPLATE_UUID_BY_NAME(doc, name='base') == ['uuid-2']
+    assert hmc_xpath.TEMPLATE_UUID_BY_NAME(doc, name="it's") == ['uuid-1']
+    assert hmc_xpath.TEMPLATE_UUID_BY_NAME(doc, name='missing') == []